@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Local snapshot of per-video analysis status for incremental audits.
+
+The snapshot holds one VideoRow (presence flags, no JSONB) per video plus two
+high-water marks: the newest videos.created_at and the newest
+video_analysis.updated_at seen so far (the table's update trigger bumps it on
+every change, and inserts default it to now()). A later run only fetches rows
+past those marks, merges them in, and rebuilds the report locally.
+
+Rows are re-fetched from a little before each mark (WATERMARK_OVERLAP) so a
+transaction that committed late with an older timestamp is still picked up;
+merging the same row twice is harmless. Deleted videos are not detected, so
+rebuild the snapshot from a full scan now and then.
+
+Used by query_videos_rest_fixed.py --incremental.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from video_categories import VideoRow, categorize
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_PATH = os.getenv('AUDIT_SNAPSHOT_PATH', './.audit_snapshot.json')
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def parse_timestamp(value):
+    """Parse a PostgREST timestamptz string, or return None."""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def since_filter(watermark, overlap=WATERMARK_OVERLAP):
+    """PostgREST filter value for rows at or after the watermark minus the overlap."""
+    timestamp = parse_timestamp(watermark)
+    if timestamp is None:
+        return None
+    return f"gte.{(timestamp - overlap).isoformat()}"
+
+
+def _later(current, candidate):
+    """Return whichever timestamp string is newer (None-safe)."""
+    candidate_ts = parse_timestamp(candidate)
+    if candidate_ts is None:
+        return current
+    current_ts = parse_timestamp(current)
+    if current_ts is None or candidate_ts > current_ts:
+        return candidate
+    return current
+
+
+class AuditSnapshot:
+    """Per-video rows plus created_at/updated_at watermarks for one Supabase project."""
+
+    def __init__(self, source, rows=None, videos_watermark=None, analysis_watermark=None):
+        self.source = source
+        self.rows = rows or {}
+        self.videos_watermark = videos_watermark
+        self.analysis_watermark = analysis_watermark
+        self.orphans = 0
+
+    @property
+    def is_empty(self):
+        return not self.rows
+
+    @classmethod
+    def load(cls, path, source):
+        """Load a snapshot for `source`, or return an empty one if there is none usable."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(source)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable snapshot {path}: {e}")
+            return cls(source)
+
+        if data.get('version') != SNAPSHOT_VERSION or data.get('source') != source:
+            print(f"⚠️  Snapshot {path} is for a different project or format, starting over")
+            return cls(source)
+
+        rows = {row['id']: VideoRow(**row) for row in data.get('rows', [])}
+        return cls(source, rows, data.get('videos_watermark'), data.get('analysis_watermark'))
+
+    def save(self, path):
+        """Persist the snapshot atomically (write to a temp file, then rename)."""
+        data = {
+            'version': SNAPSHOT_VERSION,
+            'source': self.source,
+            'saved_at': datetime.now().isoformat(),
+            'videos_watermark': self.videos_watermark,
+            'analysis_watermark': self.analysis_watermark,
+            'rows': [row.as_dict() for row in self.rows.values()]
+        }
+        with open(path + ".tmp", 'w') as f:
+            json.dump(data, f, default=str)
+        os.replace(path + ".tmp", path)
+
+    def merge_video(self, video):
+        """Add a new video, or refresh the video fields of a known one."""
+        existing = self.rows.get(video['id'])
+        if existing is None:
+            self.rows[video['id']] = VideoRow.from_records(video)
+        else:
+            existing.project_id = video.get('project_id')
+            existing.original_name = video.get('original_name')
+            existing.file_path = video.get('file_path')
+            existing.status = video.get('status')
+            existing.created_at = video.get('created_at')
+        self.videos_watermark = _later(self.videos_watermark, video.get('created_at'))
+
+    def merge_analysis(self, record):
+        """Apply an analysis record (raw JSONB or presence flags) to its video."""
+        self.analysis_watermark = _later(self.analysis_watermark, record.get('updated_at'))
+
+        row = self.rows.get(record['video_id'])
+        if row is None:
+            # Video not in the snapshot (deleted, or outside the overlap window)
+            self.orphans += 1
+            return
+        self.rows[row.id] = VideoRow.from_records(row.as_dict(), record)
+
+    def report(self, rules, keep):
+        """Categorize every row in the snapshot."""
+        return categorize(self.rows.values(), rules, keep)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the video audit checkers against the PostgREST stand-in.
+
+For each dataset size, starts benchmarks/postgrest_standin.py in its own
+process, seeded with that many synthetic videos (JSONB columns carry
+gemini_parsed.json), and runs every checker variant against it in a fresh
+subprocess, reporting wall time, peak RSS of the checker process, bytes the
+stand-in sent and the number of requests it served. The stand-in runs
+separately because Linux children inherit the parent's peak RSS; keeping
+the driver small keeps the checkers' numbers their own.
+
+Variants that need the supabase client (the fixed checker imports it even
+for --async) are skipped when it is not installed;
+query_incomplete_videos.py talks to Postgres directly and is not covered.
+
+Usage:
+    python benchmarks/checker_load.py [1k] [10k] [100k] [1m] [--timeout SECONDS]
+"""
+
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STANDIN = os.path.join(ROOT, 'benchmarks', 'postgrest_standin.py')
+STATS_PATH = '/_standin/stats'
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+DEFAULT_SIZES = ['1k', '10k']
+DEFAULT_TIMEOUT = 1800
+
+# (label, script, args, needs supabase client)
+VARIANTS = [
+    ('rest', 'query_videos_rest_fixed.py', [], False),
+    ('rest --stream', 'query_videos_rest_fixed.py', ['--stream'], False),
+    ('rest --stream -p', 'query_videos_rest_fixed.py', ['--stream', '--presence'], False),
+    ('fixed', 'query_incomplete_videos_fixed.py', [], True),
+    ('fixed -p', 'query_incomplete_videos_fixed.py', ['--presence'], True),
+    ('fixed --async', 'query_incomplete_videos_fixed.py', ['--async'], True),
+    ('fixed --async -p', 'query_incomplete_videos_fixed.py', ['--async', '--presence'], True),
+    ('simple', 'query_incomplete_videos_simple.py', [], True)
+]
+
+# Any well-formed JWT; the stand-in does not check it
+STANDIN_KEY = 'eyJhbGciOiJIUzI1NiJ9.e30.x'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _stats(url, reset=False):
+    with urlopen(f"{url}{STATS_PATH}{'?reset' if reset else ''}", timeout=10) as response:
+        return json.load(response)
+
+
+def start_standin_process(videos):
+    """Launch the stand-in in its own process and wait until it answers."""
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, STANDIN, str(port), str(videos)], stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            _stats(url)
+            return proc, url
+        except (URLError, ConnectionError):
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"stand-in did not start on {url}")
+
+
+def run_variant(url, script, args, timeout):
+    """Run one checker against the stand-in; returns (wall s, peak RSS MB, exit code)."""
+    env = dict(os.environ, SUPABASE_URL=url, SUPABASE_SERVICE_ROLE_KEY=STANDIN_KEY)
+    _stats(url, reset=True)
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, script), *args],
+        cwd=ROOT, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        # wait4 gives this child's own rusage; RUSAGE_CHILDREN would be the max over all runs
+        _, status, usage = os.wait4(proc.pid, 0)
+    finally:
+        timer.cancel()
+    elapsed = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KB on Linux
+    return elapsed, usage.ru_maxrss / 1024, proc.returncode
+
+
+def has_supabase_client():
+    """True if the supabase package is installed (not just the migrations directory)."""
+    spec = importlib.util.find_spec('supabase')
+    return spec is not None and spec.origin is not None
+
+
+def _timeout():
+    if '--timeout' not in sys.argv:
+        return DEFAULT_TIMEOUT
+    try:
+        return float(sys.argv[sys.argv.index('--timeout') + 1])
+    except (IndexError, ValueError):
+        print("❌ --timeout expects a number of seconds")
+        sys.exit(1)
+
+
+def main():
+    timeout = _timeout()
+    labels = [arg.lower() for arg in sys.argv[1:] if arg.lower() in SIZES] or DEFAULT_SIZES
+    has_supabase = has_supabase_client()
+    if not has_supabase:
+        print("⚠️  supabase client not installed; skipping the variants that need it")
+
+    print(f"{'variant':<18} {'rows':>8} {'wall s':>8} {'RSS MB':>8} {'MB sent':>9} {'requests':>9}  exit")
+    for label in labels:
+        standin, url = start_standin_process(SIZES[label])
+        try:
+            for name, script, args, needs_supabase in VARIANTS:
+                if needs_supabase and not has_supabase:
+                    print(f"{name:<18} {label:>8} {'skipped':>8}")
+                    continue
+                elapsed, peak_mb, code = run_variant(url, script, args, timeout)
+                stats = _stats(url)
+                status = 'timeout' if elapsed >= timeout else code
+                print(f"{name:<18} {label:>8} {elapsed:>8.2f} {peak_mb:>8.1f} "
+                      f"{stats['bytes_sent'] / (1024 ** 2):>9.1f} {stats['requests']:>9}  {status}")
+        finally:
+            standin.terminate()
+            standin.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark chunked `in.(...)` filters against the local PostgREST stand-in.
+
+Looks up every video by ID, once with a single unchunked filter (which the
+stand-in rejects with 414 like a real proxy would) and then through
+postgrest_filters.fetch_in_chunks at several parallelism levels, checking
+that the chunked results come back complete and in order. Exits non-zero
+if any run returns incomplete or reordered rows, so it doubles as the
+50k-ID regression check for the chunked lookups.
+
+Each response is delayed by LATENCY (20 ms) to stand in for the round trip
+to a hosted project; that wait is what parallel chunks overlap.
+
+Usage:
+    python benchmarks/in_filter_chunks.py [ids]
+"""
+
+import os
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.postgrest_standin import SyntheticDataset, start_standin, video_id  # noqa: E402
+from postgrest_filters import chunk_ids, fetch_in_chunks, in_filter  # noqa: E402
+
+PARALLELISM = [1, 4, 8]
+LATENCY = 0.02
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    # Lift the max-rows cap so the unchunked request is refused only for its URL
+    server = start_standin(SyntheticDataset(count), max_rows=count, latency=LATENCY)
+    ids = [video_id(index) for index in range(count)]
+    session = requests.Session()
+
+    def fetch(chunk):
+        response = session.get(
+            f"{server.url}/rest/v1/videos",
+            params={'select': 'id,file_path', 'id': in_filter(chunk)},
+            timeout=60
+        )
+        response.raise_for_status()
+        return response.json()
+
+    started = time.perf_counter()
+    try:
+        fetch(ids)
+        print(f"single filter:  OK in {time.perf_counter() - started:.2f}s")
+    except requests.HTTPError as e:
+        print(f"single filter:  {e.response.status_code} after {time.perf_counter() - started:.2f}s "
+              f"(URL would be {len(in_filter(ids)) // 1024} KB)")
+
+    chunks = list(chunk_ids(ids))
+    print(f"chunked:        {len(chunks)} requests of up to {max(len(chunk) for chunk in chunks)} IDs")
+
+    mismatches = []
+    try:
+        for max_parallel in PARALLELISM:
+            # Fresh session per run so earlier keep-alive connections do not skew it
+            session = requests.Session()
+            server.reset_counters()
+            started = time.perf_counter()
+            rows = fetch_in_chunks(fetch, ids, max_parallel=max_parallel)
+            elapsed = time.perf_counter() - started
+
+            complete = [row['id'] for row in rows] == ids
+            if not complete:
+                mismatches.append(max_parallel)
+            print(f"parallel={max_parallel}:     {elapsed:.2f}s, {server.requests} requests, "
+                  f"{server.bytes_sent / (1024 ** 2):.1f} MB, {'complete' if complete else 'MISMATCH'}")
+    finally:
+        server.shutdown()
+
+    if mismatches:
+        print(f"❌ Chunked results incomplete or out of order at parallel={mismatches}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Local PostgREST stand-in for benchmarking the video checkers.
+
+Serves /rest/v1/videos, /rest/v1/video_analysis and
+/rest/v1/video_analysis_presence from a synthetic dataset, with the parts of
+PostgREST the checkers rely on: `select`, `order`, `limit`/`offset`, the
+`Range` request header and `Content-Range` response header,
+`Prefer: count=exact`, the eq/neq/gt/gte/lt/lte/in/is filters and flat
+`or=(...)` groups of them (with SQL NULL semantics: a comparison against
+NULL never matches), a max-rows cap, and a 414 for request URLs over
+MAX_URL_BYTES (what a proxy in front of Supabase would do).
+
+Rows are generated on demand from their index, so a million-row dataset
+costs no memory. IDs are UUID-shaped and sort in index order, which makes
+keyset pages (`id=gt.X&order=id.asc`) and `in.(...)` lookups on id or
+video_id direct index operations. llm_response and video_analysis carry the
+payload from gemini_parsed.json (~10 KB each), like real Gemini output.
+
+`latency` adds a fixed delay to every response to emulate the round trip
+to a hosted project. GET /_standin/stats returns the request and byte
+counters (add `?reset` to zero them), for drivers running the stand-in in
+another process.
+
+Usage:
+    python benchmarks/postgrest_standin.py [port] [videos] [latency_ms]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PORT = 54321
+DEFAULT_MAX_ROWS = 1000
+MAX_URL_BYTES = 8192
+STATS_PATH = '/_standin/stats'
+
+VIDEO_PREFIX = '00000001'
+ANALYSIS_PREFIX = '00000002'
+PROJECT_PREFIX = '00000003'
+BASE_TIMESTAMP = 1735689600  # 2025-01-01T00:00:00Z
+STATUSES = ['completed', 'completed', 'completed', 'processing', 'failed']
+
+
+def row_id(prefix, index):
+    """UUID-shaped ID that sorts in index order."""
+    return f"{prefix}-0000-4000-8000-{index:012x}"
+
+
+def row_index(prefix, value):
+    """Inverse of row_id; None if the value is not an ID with this prefix."""
+    if not isinstance(value, str) or not value.startswith(prefix + '-') or len(value) != 36:
+        return None
+    try:
+        return int(value[-12:], 16)
+    except ValueError:
+        return None
+
+
+def video_id(index):
+    return row_id(VIDEO_PREFIX, index)
+
+
+def _timestamp(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(seconds))
+
+
+def load_payload():
+    """The sample Gemini response, shared by every row's JSONB columns."""
+    try:
+        with open(os.path.join(ROOT, 'gemini_parsed.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'segments': 'x' * 10000}
+
+
+class VirtualTable:
+    """Rows 0..size-1 built by make_row(index); make_row returns None for gaps."""
+
+    def __init__(self, size, make_row, keys):
+        self.size = size
+        self.make_row = make_row
+        # column -> ID prefix, for columns whose values map back to a row index
+        self.keys = keys
+
+    def scan(self, start=0):
+        for index in range(max(start, 0), self.size):
+            row = self.make_row(index)
+            if row is not None:
+                yield row
+
+    def lookup(self, column, values):
+        prefix = self.keys[column]
+        for value in values:
+            index = row_index(prefix, value)
+            if index is not None and 0 <= index < self.size:
+                row = self.make_row(index)
+                if row is not None:
+                    yield row
+
+    def seek(self, column, op, operand):
+        """Start index for a gt/gte filter on a key column."""
+        index = row_index(self.keys[column], operand)
+        if index is None:
+            return 0
+        return index + 1 if op == 'gt' else index
+
+
+class SyntheticDataset:
+    """Videos plus one analysis row for 80% of them (every fifth video has none)."""
+
+    def __init__(self, videos=10000, payload=None):
+        self.videos = videos
+        self.payload = load_payload() if payload is None else payload
+        self.transcription = {'text': 'lorem ipsum ' * 200}
+        keys = {'id': ANALYSIS_PREFIX, 'video_id': VIDEO_PREFIX}
+        self.tables = {
+            'videos': VirtualTable(videos, self.video, {'id': VIDEO_PREFIX}),
+            'video_analysis': VirtualTable(videos, self.analysis, keys),
+            'video_analysis_presence': VirtualTable(videos, self.presence, keys)
+        }
+
+    def video(self, index):
+        created_at = _timestamp(BASE_TIMESTAMP + index * 60)
+        return {
+            'id': video_id(index),
+            'project_id': row_id(PROJECT_PREFIX, index % 50),
+            'file_name': f"video_{index}.mp4",
+            'original_name': f"IMG_{index:07d}.MOV",
+            'file_path': f"uploads/video_{index}.mp4",
+            'processed_file_path': None,
+            'status': 'uploaded',
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+
+    def _analysis_base(self, index):
+        if index % 5 == 0:
+            return None
+        return {
+            'id': row_id(ANALYSIS_PREFIX, index),
+            'video_id': video_id(index),
+            'project_id': row_id(PROJECT_PREFIX, index % 50),
+            'status': STATUSES[index % len(STATUSES)],
+            'created_at': _timestamp(BASE_TIMESTAMP + index * 60 + 30),
+            'updated_at': _timestamp(BASE_TIMESTAMP + index * 60 + 3600)
+        }
+
+    def analysis(self, index):
+        row = self._analysis_base(index)
+        if row is not None:
+            row['transcription'] = self.transcription
+            row['llm_response'] = self.payload if index % 7 else None
+            row['video_analysis'] = self.payload
+        return row
+
+    def presence(self, index):
+        row = self._analysis_base(index)
+        if row is not None:
+            row['has_transcription'] = True
+            row['has_llm_response'] = bool(index % 7)
+            row['has_video_analysis'] = True
+        return row
+
+
+def _matches(value, op, operand):
+    if op == 'in':
+        return str(value) in operand
+    if op == 'is':
+        return value is None if operand == 'null' else str(value).lower() == operand
+    if value is None:
+        # As in SQL, e.g. status=neq.completed does not match a NULL status
+        return False
+    if isinstance(value, bool):
+        value = str(value).lower()
+    else:
+        value = str(value)
+    if op == 'eq':
+        return value == operand
+    if op == 'neq':
+        return value != operand
+    if op == 'gt':
+        return value > operand
+    if op == 'gte':
+        return value >= operand
+    if op == 'lt':
+        return value < operand
+    if op == 'lte':
+        return value <= operand
+    raise ValueError(f"unsupported operator {op}")
+
+
+def _parse_filter(value):
+    """Split a filter like `neq.completed` or `in.(a,b)` into (op, operand)."""
+    op, _, operand = value.partition('.')
+    if op == 'in':
+        operand = [item.strip('"') for item in operand.strip('()').split(',')]
+    return op, operand
+
+
+def _parse_or(value):
+    """Parse `(col.op.value,...)` into (column, op, operand) conditions; no nesting or in-lists."""
+    conditions = []
+    for condition in value.strip('()').split(','):
+        column, _, rest = condition.partition('.')
+        if not rest:
+            raise ValueError(f"invalid or condition {condition!r}")
+        conditions.append((column, *_parse_filter(rest)))
+    return conditions
+
+
+def _row_matches(row, column, op, operand):
+    if op == 'or':
+        return any(_row_matches(row, *condition) for condition in operand)
+    return _matches(row.get(column), op, operand)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; without this, delayed ACKs add ~40 ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.server.record(len(payload))
+        self.wfile.write(payload)
+
+    def _send_stats(self, query):
+        stats = {'requests': self.server.requests, 'bytes_sent': self.server.bytes_sent}
+        if 'reset' in query:
+            self.server.reset_counters()
+        payload = json.dumps(stats).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.startswith(STATS_PATH):
+            # Not recorded, so polling the counters does not change them
+            self._send_stats(urlsplit(self.path).query)
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if len(self.path) > MAX_URL_BYTES:
+            self._send(414, {'message': 'URI Too Long'})
+            return
+
+        url = urlsplit(self.path)
+        table_name = url.path.rsplit('/', 1)[-1]
+        table = self.server.dataset.tables.get(table_name)
+        if table is None:
+            self._send(404, {'message': f'relation "public.{table_name}" does not exist'})
+            return
+
+        select = None
+        order = None
+        offset = 0
+        limit = self.server.max_rows
+        filters = []
+        try:
+            for key, value in parse_qsl(url.query):
+                if key == 'select':
+                    select = [column.strip() for column in value.split(',')]
+                elif key == 'order':
+                    order = value.split('.')
+                elif key == 'limit':
+                    limit = min(int(value), self.server.max_rows)
+                elif key == 'offset':
+                    offset = int(value)
+                elif key == 'or':
+                    filters.append((None, 'or', _parse_or(value)))
+                else:
+                    filters.append((key, *_parse_filter(value)))
+
+            requested_range = self.headers.get('Range')
+            if requested_range:
+                first, _, last = requested_range.partition('-')
+                offset = int(first)
+                if last:
+                    limit = min(limit, int(last) - offset + 1)
+        except ValueError as e:
+            self._send(400, {'message': str(e)})
+            return
+
+        # Pick the cheapest source: an index lookup or a seek on a key column
+        natural_order = order is None or (order[0] == 'id' and order[-1] != 'desc')
+        source = None
+        for position, (column, op, operand) in enumerate(filters):
+            if column in table.keys and op == 'in':
+                source = table.lookup(column, operand)
+            elif column == 'id' and op in ('gt', 'gte') and natural_order:
+                source = table.scan(table.seek(column, op, operand))
+            else:
+                continue
+            del filters[position]
+            break
+        if source is None:
+            source = table.scan()
+
+        want_count = 'count=exact' in self.headers.get('Prefer', '')
+        page = []
+        total = 0
+        try:
+            rows = (row for row in source if all(_row_matches(row, c, op, v) for c, op, v in filters))
+            if not natural_order:
+                rows = iter(sorted(rows, key=lambda row: str(row.get(order[0])), reverse=order[-1] == 'desc'))
+
+            for row in rows:
+                if offset <= total < offset + limit:
+                    page.append(row)
+                total += 1
+                if total >= offset + limit and not want_count:
+                    break
+        except ValueError as e:
+            self._send(400, {'message': str(e)})
+            return
+
+        if select and select != ['*']:
+            page = [{column: row.get(column) for column in select} for row in page]
+
+        content_range = f"{offset}-{offset + len(page) - 1}" if page else '*'
+        self._send(200, page, {'Content-Range': f"{content_range}/{total if want_count else '*'}"})
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=DEFAULT_PORT, dataset=None, max_rows=DEFAULT_MAX_ROWS, latency=0.0):
+        super().__init__(('127.0.0.1', port), StandinHandler)
+        self.dataset = dataset if dataset is not None else SyntheticDataset()
+        self.max_rows = max_rows
+        # Seconds added to every response, to emulate the round trip to Supabase
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, size):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += size
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+
+def start_standin(dataset=None, max_rows=DEFAULT_MAX_ROWS, port=0, latency=0.0):
+    """Start a stand-in on a background thread (port 0 = any free port)."""
+    server = StandinServer(port, dataset, max_rows, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    videos = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    server = StandinServer(port, SyntheticDataset(videos), latency=latency_ms / 1000)
+    print(f"PostgREST stand-in with {videos} videos on {server.url} (+{latency_ms:g} ms per response)")
+    server.serve_forever()
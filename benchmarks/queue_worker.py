@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark video_queue_worker.py against a local Postgres.
+
+Builds a scratch schema holding the queue columns of video_analysis, the
+get_next_queue_position() function and the queue-position trigger from
+20250703000000_add_video_queue_system.sql (as amended by
+20250716000000_defer_queue_position_renumber.sql), seeds it with queued jobs,
+and drains it with one or more worker replicas whose Lambda call is replaced
+by a fixed delay (with a small failure rate to exercise requeues). Reports
+jobs/minute, claim conflicts and the deadlocks Postgres detected, and
+verifies no job attempt was dispatched twice, next to the cron's ceiling of
+MAX_CONCURRENT_PROCESSING jobs per one-minute tick.
+
+With --renumber-on-claim the trigger renumbers the queue inside every claim,
+as it did before the deferral migration, for comparison.
+
+The scratch schema is dropped afterwards; nothing outside it is touched.
+
+Usage:
+    DATABASE_URL=postgresql://localhost/postgres python benchmarks/queue_worker.py [jobs] [latency_ms] [--renumber-on-claim]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from video_queue_worker import DEFAULT_SLOTS, QueueWorker, psycopg2  # noqa: E402
+from psycopg2.extensions import make_dsn  # noqa: E402
+
+SCHEMA = 'queue_worker_bench'
+# (replicas, slots per replica); one connection per slot, so stay under max_connections
+SCENARIOS = [(1, 3), (1, 10), (3, 10), (3, 20)]
+FAILURE_RATE = 0.05
+CRON_JOBS_PER_MINUTE = DEFAULT_SLOTS
+
+# The trigger's renumbering, with and without the deferral the worker sets
+RENUMBER_CONDITION = {
+    False: "AND current_setting('video_queue.defer_renumber', true) IS DISTINCT FROM 'on'",
+    True: ""
+}
+
+SETUP_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+SET search_path = {SCHEMA};
+
+CREATE TABLE video_analysis (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    video_id UUID NOT NULL DEFAULT gen_random_uuid(),
+    project_id UUID NOT NULL DEFAULT gen_random_uuid(),
+    status TEXT NOT NULL,
+    error_message TEXT,
+    is_converting BOOLEAN DEFAULT false,
+    queue_position INTEGER,
+    queued_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    processing_started_at TIMESTAMP WITH TIME ZONE,
+    processing_completed_at TIMESTAMP WITH TIME ZONE,
+    max_retries INTEGER DEFAULT 3,
+    retry_count INTEGER DEFAULT 0
+);
+
+CREATE TABLE storyboard_content (
+    project_id UUID,
+    text_content TEXT
+);
+
+CREATE INDEX idx_video_analysis_queue ON video_analysis(status, queue_position)
+WHERE status = 'queued';
+
+CREATE FUNCTION get_next_queue_position()
+RETURNS INTEGER AS $$
+DECLARE
+    max_position INTEGER;
+BEGIN
+    SELECT COALESCE(MAX(queue_position), 0) + 1 INTO max_position
+    FROM video_analysis
+    WHERE status IN ('queued', 'processing');
+
+    RETURN max_position;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION update_queue_positions()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF OLD.status = 'queued' AND NEW.status IN ('processing', 'completed', 'failed')
+       {{renumber_condition}} THEN
+        UPDATE video_analysis
+        SET queue_position = queue_position - 1
+        WHERE status = 'queued'
+        AND queue_position > OLD.queue_position;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_update_queue_positions
+AFTER UPDATE OF status ON video_analysis
+FOR EACH ROW
+EXECUTE FUNCTION update_queue_positions();
+
+CREATE FUNCTION compact_queue_positions()
+RETURNS INTEGER AS $$
+DECLARE
+    renumbered INTEGER;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('compact_queue_positions')) THEN
+        RETURN 0;
+    END IF;
+
+    UPDATE video_analysis va
+    SET queue_position = ranked.position
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY queue_position NULLS LAST, queued_at)::INTEGER AS position
+        FROM video_analysis
+        WHERE status = 'queued'
+    ) ranked
+    WHERE va.id = ranked.id
+      AND va.status = 'queued'
+      AND va.queue_position IS DISTINCT FROM ranked.position;
+
+    GET DIAGNOSTICS renumbered = ROW_COUNT;
+    RETURN renumbered;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+SEED_SQL = f"""
+TRUNCATE {SCHEMA}.video_analysis;
+INSERT INTO {SCHEMA}.video_analysis (status, queue_position)
+SELECT 'queued', position FROM generate_series(1, %s) AS position;
+"""
+
+STATUS_SQL = f"SELECT status, COUNT(*) FROM {SCHEMA}.video_analysis GROUP BY status"
+
+# Cumulative; statistics reach pg_stat_database shortly after each transaction ends
+DEADLOCKS_SQL = "SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()"
+
+
+class FakeLambda:
+    """Stands in for the TranscribeAudio call: fixed latency, occasional failure."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.attempts = Counter()
+
+    async def __call__(self, job):
+        # The same row at the same retry_count must never be dispatched twice
+        self.attempts[(job.id, job.retry_count)] += 1
+        await asyncio.sleep(self.latency)
+        if random.random() < FAILURE_RATE:
+            return False, "simulated Lambda error"
+        return True, "ok"
+
+
+async def run_scenario(dsn, replicas, slots, latency):
+    fake = FakeLambda(latency)
+    workers = [
+        QueueWorker(dsn, slots=slots, poll_seconds=0.1, dispatch=fake, name=f"replica-{index}")
+        for index in range(replicas)
+    ]
+    results = await asyncio.gather(*(worker.run(drain=True) for worker in workers))
+    elapsed = max(stats['elapsed_seconds'] for stats in results)
+    total = Counter()
+    for stats in results:
+        total.update({key: value for key, value in stats.items() if key != 'elapsed_seconds'})
+    duplicates = sum(count - 1 for count in fake.attempts.values() if count > 1)
+    return elapsed, total, duplicates
+
+
+def deadlock_count(cur):
+    # Let the workers' last transactions report in, then read a fresh snapshot
+    time.sleep(1)
+    cur.execute("SELECT pg_stat_clear_snapshot()")
+    cur.execute(DEADLOCKS_SQL)
+    return cur.fetchone()[0]
+
+
+def main():
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("❌ DATABASE_URL must point at a local Postgres (the benchmark uses its own schema)")
+        sys.exit(1)
+
+    renumber_on_claim = '--renumber-on-claim' in sys.argv
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    jobs = int(args[0]) if args else 300
+    latency = (float(args[1]) if len(args) > 1 else 200) / 1000
+    dsn = make_dsn(database_url, options=f"-c search_path={SCHEMA}")
+
+    conn = psycopg2.connect(database_url)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(SETUP_SQL.format(renumber_condition=RENUMBER_CONDITION[renumber_on_claim]))
+
+    print(f"📦 {jobs} queued jobs, {latency * 1000:g} ms simulated Lambda, {FAILURE_RATE:.0%} failures")
+    print(f"🔢 Queue renumbered {'inside every claim' if renumber_on_claim else 'by compact_queue_positions()'}")
+    print(f"⏰ Cron baseline: at most {CRON_JOBS_PER_MINUTE} jobs/minute ({DEFAULT_SLOTS} slots per 1-minute tick)")
+    print(f"{'replicas':>8} {'slots':>6} {'seconds':>8} {'jobs/min':>9} {'attempts':>9} {'failed':>7} {'conflicts':>9} {'deadlocks':>9} {'dupes':>6}  final state")
+    try:
+        for replicas, slots in SCENARIOS:
+            with conn.cursor() as cur:
+                cur.execute(SEED_SQL, (jobs,))
+                deadlocks = deadlock_count(cur)
+            elapsed, total, duplicates = asyncio.run(run_scenario(dsn, replicas, slots, latency))
+            with conn.cursor() as cur:
+                cur.execute(STATUS_SQL)
+                final = dict(cur.fetchall())
+                deadlocks = deadlock_count(cur) - deadlocks
+            rate = jobs / elapsed * 60 if elapsed > 0 else 0.0
+            state = ', '.join(f"{status}: {count}" for status, count in sorted(final.items()))
+            print(f"{replicas:>8} {slots:>6} {elapsed:>8.1f} {rate:>9.0f} {total['claimed']:>9} "
+                  f"{total['failed']:>7} {total['conflicts']:>9} {deadlocks:>9} {duplicates:>6}  {state}")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
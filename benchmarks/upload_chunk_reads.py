@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark chunk reads in the Gemini uploader: f.read() copies vs ChunkWindow.
+
+Uploads a generated file to a local sink server that discards the body, once
+per mode, each in a fresh subprocess so peak RSS (ru_maxrss) is not shared
+between runs.
+
+Usage:
+    python benchmarks/upload_chunk_reads.py [size_mb] [chunk_mb]
+"""
+
+import importlib.util
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ['read', 'mmap']
+
+
+def load_uploader():
+    """Import upload-large-video.py (its file name is not a valid module name)."""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location('upload_large_video', os.path.join(ROOT, 'upload-large-video.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def run_mode(mode, path, chunk_size, url):
+    """Upload `path` in chunks using one read strategy; print MB/s and peak RSS."""
+    uploader = load_uploader()
+    file_size = os.path.getsize(path)
+    session = requests.Session()
+    started = time.monotonic()
+
+    with open(path, 'rb') as f:
+        offset = 0
+        while offset < file_size:
+            length = min(chunk_size, file_size - offset)
+            if mode == 'read':
+                f.seek(offset)
+                session.post(url, data=f.read(length)).raise_for_status()
+            else:
+                with uploader.ChunkWindow(f, offset, length) as chunk:
+                    session.post(url, data=chunk).raise_for_status()
+            offset += length
+
+    elapsed = time.monotonic() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode}\t{file_size / (1024**2) / elapsed:.1f}\t{peak_mb:.1f}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        _, _, mode, path, chunk_size, url = sys.argv
+        run_mode(mode, path, int(chunk_size), url)
+        return
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    chunk_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/upload"
+
+    with tempfile.NamedTemporaryFile(suffix='.mov') as video:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            video.write(block)
+        video.flush()
+
+        print(f"📦 {size_mb} MB file, {chunk_mb} MB chunks")
+        print("mode\tMB/s\tpeak RSS (MB)")
+        for mode in MODES:
+            result = subprocess.run(
+                [sys.executable, __file__, '--mode', mode, video.name, str(chunk_mb * 1024 * 1024), url],
+                capture_output=True, text=True, check=True
+            )
+            print(result.stdout.strip())
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
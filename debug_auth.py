@@ -6,9 +6,10 @@ Debug authentication issues with Supabase
 import os
 import sys
 import json
-import requests
 import base64
 
+from rest_session import get_session, print_connection_stats
+
 def decode_jwt_payload(token):
     """Decode JWT payload to see what's inside."""
     try:
@@ -76,7 +77,7 @@ def test_different_auth_methods():
         print(f"\n🧪 Testing: {test_case['name']}")
         
         try:
-            response = requests.get(
+            response = get_session().get(
                 f"{url}/rest/v1/videos",
                 headers=test_case['headers'],
                 params={'select': 'id', 'limit': 1},
@@ -118,7 +119,7 @@ def test_table_access():
     
     for table in tables:
         try:
-            response = requests.get(
+            response = get_session().get(
                 f"{url}/rest/v1/{table}",
                 headers=headers,
                 params={'select': 'id', 'limit': 1},
@@ -165,6 +166,8 @@ def main():
         print(f"2. Is your Supabase project URL correct?")
         print(f"3. Are your RLS policies allowing service role access?")
         print(f"4. Is your Supabase project active?")
+    
+    print_connection_stats()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Local on-disk cache of Gemini video analysis results.
+
+Entries are keyed by a streaming SHA-256 of the video bytes plus the prompt,
+model name and generation config, so re-running an unchanged analysis returns
+the stored raw response (the text saved in gemini_raw_response.txt, or the
+generateContent JSON) without uploading anything. The cache is a single
+SQLite file, bounded in size with least-recently-used eviction.
+
+FileRegistry, stored in the same SQLite file, remembers which Gemini
+`files/...` handle holds a given video so it can be reused (files persist
+for ~48h) instead of being uploaded again.
+
+Used by upload-large-video.py and test-gemini-video.py.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_CACHE_DIR = os.getenv('GEMINI_CACHE_DIR', './.gemini_cache')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_FILE_TTL = 48 * 3600  # Gemini keeps uploaded files for 48 hours
+EXPIRY_MARGIN = 15 * 60  # do not hand out handles that expire within this window
+
+
+def hash_file(file_path, block_size=HASH_BLOCK_SIZE):
+    """Stream a file through SHA-256 without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _connect(cache_dir):
+    """Open the shared cache database (one connection per object, used across threads)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    return sqlite3.connect(os.path.join(cache_dir, 'analysis.sqlite3'), check_same_thread=False)
+
+
+def analysis_key(file_hash, prompt, model, generation_config=None):
+    """Cache key for one (video, prompt, model, config) combination."""
+    material = json.dumps(
+        {
+            'file': file_hash,
+            'prompt': prompt,
+            'model': model,
+            'config': generation_config or {}
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """Size-bounded LRU cache of raw analysis responses in SQLite."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        # One connection shared by batch worker threads, serialized by self.lock
+        self.conn = _connect(cache_dir)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                file_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_used ON analysis_cache(last_used)")
+        self.conn.commit()
+
+    def get(self, key):
+        """Return the cached raw response for key, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT response FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.conn.execute("UPDATE analysis_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+            return row[0]
+
+    def put(self, key, response, file_hash='', model=''):
+        """Store a raw response and evict least-recently-used entries over the size bound."""
+        size = len(response.encode('utf-8'))
+        now = time.time()
+
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO analysis_cache (key, file_hash, model, response, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, file_hash, model, response, size, now, now)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self.conn.execute("SELECT key, size FROM analysis_cache ORDER BY last_used ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Return entry count, total size and this session's hit/miss counters."""
+        with self.lock:
+            entries, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache"
+            ).fetchone()
+        return {
+            'entries': entries,
+            'bytes': total,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def print_report(self):
+        stats = self.stats()
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] * 100 / lookups if lookups else 0.0
+        print(
+            f"Analysis cache: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.0f}% hit rate), "
+            f"{stats['entries']} entries, {stats['bytes'] / (1024**2):.1f} MB, {stats['evictions']} evicted"
+        )
+
+    def close(self):
+        self.conn.close()
+
+
+def parse_expiration(value):
+    """Convert an RFC 3339 expirationTime from the Files API to a Unix timestamp."""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+class FileRegistry:
+    """Maps video content hashes to uploaded Gemini file handles and their expiry."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.reused = 0
+        self.lock = threading.Lock()
+        self.conn = _connect(cache_dir)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS gemini_files (
+                file_hash TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                uri TEXT NOT NULL,
+                mime_type TEXT,
+                expires_at REAL NOT NULL,
+                uploaded_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def lookup(self, file_hash):
+        """Return {'name', 'uri', 'mime_type', 'expires_at'} for a live handle, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT name, uri, mime_type, expires_at FROM gemini_files WHERE file_hash = ?",
+                (file_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        name, uri, mime_type, expires_at = row
+        if expires_at - EXPIRY_MARGIN <= time.time():
+            self.forget(file_hash)
+            return None
+        return {'name': name, 'uri': uri, 'mime_type': mime_type, 'expires_at': expires_at}
+
+    def record(self, file_hash, file_info):
+        """Remember the handle from an upload response's `file` object."""
+        now = time.time()
+        expires_at = parse_expiration(file_info.get('expirationTime')) or now + DEFAULT_FILE_TTL
+
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO gemini_files (file_hash, name, uri, mime_type, expires_at, uploaded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (file_hash, file_info['name'], file_info.get('uri', ''), file_info.get('mimeType'), expires_at, now)
+            )
+            self.conn.commit()
+
+    def forget(self, file_hash):
+        with self.lock:
+            self.conn.execute("DELETE FROM gemini_files WHERE file_hash = ?", (file_hash,))
+            self.conn.commit()
+
+    def mark_reused(self):
+        with self.lock:
+            self.reused += 1
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Chunked `in.(...)` filters for PostgREST queries over large ID lists.
+
+Putting every video ID into one `column=in.(...)` filter makes the request
+URL grow with the table; a few hundred UUIDs already pass the ~8 KB limit of
+typical proxies and the whole query fails. chunk_ids() splits an ID list so
+each chunk's URL-encoded filter value stays under MAX_IN_FILTER_CHARS, and
+fetch_in_chunks() runs one query per chunk with bounded parallelism and
+concatenates the rows.
+
+Used by the REST, fixed and simple video checkers.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+# Longest encoded `in.(...)` value per request; leaves room for the rest of the URL
+MAX_IN_FILTER_CHARS = 6000
+DEFAULT_MAX_PARALLEL = 4
+
+# `in.(` + `)`, and the separating comma, as they appear in the encoded URL
+_WRAPPER_COST = len(quote('in.()', safe=''))
+_SEPARATOR_COST = len(quote(',', safe=''))
+
+
+def chunk_ids(ids, max_chars=MAX_IN_FILTER_CHARS):
+    """Split IDs into lists whose encoded `in.(...)` filter value fits max_chars.
+
+    An ID that is too long on its own still gets a chunk to itself.
+    """
+    chunk = []
+    length = _WRAPPER_COST
+    for value in ids:
+        cost = len(quote(str(value), safe='')) + (_SEPARATOR_COST if chunk else 0)
+        if chunk and length + cost > max_chars:
+            yield chunk
+            chunk = []
+            length = _WRAPPER_COST
+            cost -= _SEPARATOR_COST
+        chunk.append(value)
+        length += cost
+    if chunk:
+        yield chunk
+
+
+def in_filter(ids):
+    """PostgREST filter value for a list of IDs, e.g. 'in.(a,b,c)'."""
+    return f"in.({','.join(str(value) for value in ids)})"
+
+
+def fetch_in_chunks(fetch, ids, max_parallel=DEFAULT_MAX_PARALLEL, max_chars=MAX_IN_FILTER_CHARS):
+    """Call fetch(chunk) -> list of rows for every chunk and concatenate the results.
+
+    Chunks run on up to `max_parallel` threads; results keep chunk order. An
+    exception from any chunk propagates, so a partial result is never
+    mistaken for a complete one.
+    """
+    chunks = list(chunk_ids(ids, max_chars))
+    if not chunks:
+        return []
+    if len(chunks) == 1 or max_parallel <= 1:
+        return [row for chunk in chunks for row in fetch(chunk)]
+
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(chunks))) as pool:
+        return [row for rows in pool.map(fetch, chunks) for row in rows]
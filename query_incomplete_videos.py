@@ -15,18 +15,77 @@ Based on the schema analysis:
 import os
 import sys
 import json
-from typing import List, Dict, Any
+import select
+import time
+from typing import List, Dict, Any, Iterator, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
 except ImportError:
     print("Error: psycopg2 not installed. Install with: pip install psycopg2-binary")
     sys.exit(1)
 
-@dataclass
+from video_categories import (
+    CATEGORIES,
+    COMPLETE,
+    FAILED,
+    INCOMPLETE_DATA,
+    ISSUE_CATEGORIES,
+    NO_ANALYSIS,
+    PENDING,
+    PRESENCE_VIEW,
+    TRANSCRIPT_RULES,
+    CategoryReport,
+    categorize,
+    classify,
+)
+
+# Rows fetched per round trip by the streaming (server-side) cursor
+DEFAULT_ITERSIZE = 2000
+
+# Column order matches the Video fields so rows map positionally. The has_*
+# flags come from the presence view, so every mode (and the server-side
+# aggregate) applies the same emptiness test and no JSONB leaves the database.
+VIDEO_STATUS_SELECT = f"""
+SELECT 
+    v.id,
+    v.project_id,
+    v.file_name,
+    v.original_name,
+    v.file_path,
+    v.status as video_status,
+    v.created_at,
+    va.status as analysis_status,
+    va.id as analysis_id,
+    va.has_transcription,
+    va.has_llm_response,
+    va.has_video_analysis
+FROM videos v
+LEFT JOIN {PRESENCE_VIEW} va ON v.id = va.video_id
+"""
+
+VIDEO_STATUS_QUERY = VIDEO_STATUS_SELECT + "ORDER BY v.created_at DESC;\n"
+
+# Re-read only the videos a change notification named (watch mode)
+VIDEO_STATUS_BY_ID_QUERY = VIDEO_STATUS_SELECT + "WHERE v.id = ANY(%s::uuid[]);\n"
+
+# NOTIFY channel fed by the triggers in 20250715000000_add_video_analysis_status_notify.sql
+WATCH_CHANNEL = 'video_analysis_status'
+# Notifications arriving this close together are applied (and redrawn) as one batch
+WATCH_DEBOUNCE_SECONDS = 0.25
+# Pause before reconnecting and rescanning after the watch connection fails
+WATCH_RETRY_SECONDS = 5
+
+DETAIL_TITLES = {
+    NO_ANALYSIS: '🚫 VIDEOS WITHOUT ANALYSIS',
+    PENDING: '⏳ VIDEOS WITH PENDING/PROCESSING ANALYSIS',
+    FAILED: '❌ VIDEOS WITH FAILED ANALYSIS',
+    INCOMPLETE_DATA: '⚠️ VIDEOS WITH INCOMPLETE DATA'
+}
+
+@dataclass(slots=True)
 class Video:
     id: str
     project_id: str
@@ -41,6 +100,10 @@ class Video:
     has_llm_response: bool = False
     has_video_analysis: bool = False
 
+    @property
+    def has_analysis(self) -> bool:
+        return self.analysis_id is not None
+
 class VideoAnalysisChecker:
     def __init__(self, database_url: str = None):
         """Initialize with database connection."""
@@ -70,155 +133,268 @@ class VideoAnalysisChecker:
         if not self.conn:
             raise ValueError("Not connected to database")
         
-        query = """
-        SELECT 
-            v.id,
-            v.project_id,
-            v.file_name,
-            v.original_name,
-            v.file_path,
-            v.status as video_status,
-            v.created_at,
-            va.id as analysis_id,
-            va.status as analysis_status,
-            CASE WHEN va.transcription IS NOT NULL AND va.transcription != 'null'::jsonb THEN true ELSE false END as has_transcription,
-            CASE WHEN va.llm_response IS NOT NULL AND va.llm_response != 'null'::jsonb THEN true ELSE false END as has_llm_response,
-            CASE WHEN va.video_analysis IS NOT NULL AND va.video_analysis != 'null'::jsonb THEN true ELSE false END as has_video_analysis
-        FROM videos v
-        LEFT JOIN video_analysis va ON v.id = va.video_id
-        ORDER BY v.created_at DESC;
-        """
-        
         try:
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query)
-                rows = cur.fetchall()
-                
-                videos = []
-                for row in rows:
-                    video = Video(
-                        id=row['id'],
-                        project_id=row['project_id'],
-                        file_name=row['file_name'],
-                        original_name=row['original_name'],
-                        file_path=row['file_path'],
-                        status=row['video_status'],
-                        created_at=row['created_at'],
-                        analysis_status=row['analysis_status'],
-                        analysis_id=row['analysis_id'],
-                        has_transcription=row['has_transcription'],
-                        has_llm_response=row['has_llm_response'],
-                        has_video_analysis=row['has_video_analysis']
-                    )
-                    videos.append(video)
-                
-                return videos
+            with self.conn.cursor() as cur:
+                cur.execute(VIDEO_STATUS_QUERY)
+                return [Video(*row) for row in cur.fetchall()]
                 
         except Exception as e:
             print(f"❌ Failed to query videos: {e}")
             return []
     
-    def categorize_videos(self, videos: List[Video]) -> Dict[str, List[Video]]:
-        """Categorize videos by their analysis completeness."""
-        categories = {
-            'no_analysis': [],           # No video_analysis row at all
-            'pending_analysis': [],      # Has analysis row but status is pending/processing
-            'failed_analysis': [],       # Has analysis row but status is failed
-            'incomplete_data': [],       # Status is completed but missing transcription/llm_response
-            'complete': []              # Fully completed with all data
-        }
+    def iter_videos(self, itersize: int = DEFAULT_ITERSIZE) -> Iterator[Video]:
+        """Stream videos and their analysis status through a named server-side cursor.
         
-        for video in videos:
-            if video.analysis_id is None:
-                # No analysis row exists
-                categories['no_analysis'].append(video)
-            elif video.analysis_status in ['pending', 'processing']:
-                # Analysis is in progress
-                categories['pending_analysis'].append(video)
-            elif video.analysis_status == 'failed':
-                # Analysis failed
-                categories['failed_analysis'].append(video)
-            elif video.analysis_status == 'completed':
-                # Check if data is actually present
-                if not video.has_transcription or not video.has_llm_response:
-                    categories['incomplete_data'].append(video)
-                else:
-                    categories['complete'].append(video)
-            else:
-                # Unknown status
-                categories['incomplete_data'].append(video)
+        Rows arrive `itersize` at a time, so memory stays O(itersize) no matter
+        how many videos there are, and the first rows can be processed while
+        the rest are still in the database.
+        """
+        if not self.conn:
+            raise ValueError("Not connected to database")
         
-        return categories
+        with self.conn.cursor(name='video_status_stream') as cur:
+            cur.itersize = itersize
+            cur.execute(VIDEO_STATUS_QUERY)
+            for row in cur:
+                yield Video(*row)
     
-    def print_summary(self, categories: Dict[str, List[Video]]):
-        """Print a summary of video analysis status."""
-        total_videos = sum(len(videos) for videos in categories.values())
+    def query_category_counts(self) -> Optional[CategoryReport]:
+        """Count videos per category in the database with a single aggregate query.
+        
+        Uses get_video_analysis_category_counts() (see its migration), so only
+        five (category, count) rows cross the wire. Returns None if the
+        function is not available.
+        """
+        if not self.conn:
+            raise ValueError("Not connected to database")
+        
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    "SELECT category, video_count FROM get_video_analysis_category_counts(%s, %s, %s)",
+                    (
+                        'transcription' in TRANSCRIPT_RULES.required_fields,
+                        'llm_response' in TRANSCRIPT_RULES.required_fields,
+                        'video_analysis' in TRANSCRIPT_RULES.required_fields
+                    )
+                )
+                counts = dict(cur.fetchall())
+        except psycopg2.Error as e:
+            # Leave the connection usable for the row-fetch fallback
+            self.conn.rollback()
+            print(f"⚠️  Aggregate query unavailable ({e.pgerror or e}), falling back to row fetch")
+            return None
+        
+        return CategoryReport.from_counts(TRANSCRIPT_RULES, counts)
+    
+    def categorize_videos(self, videos: List[Video], keep=ISSUE_CATEGORIES) -> CategoryReport:
+        """Categorize videos by their analysis completeness.
         
+        Completed analysis must have transcription and llm_response. Videos are
+        kept only for the categories in `keep`; the rest are just counted.
+        """
+        return categorize(videos, TRANSCRIPT_RULES, keep)
+    
+    def print_summary(self, report: CategoryReport):
+        """Print a summary of video analysis status."""
         print("\n" + "="*80)
         print(f"📊 VIDEO ANALYSIS SUMMARY")
         print("="*80)
-        print(f"Total videos found: {total_videos}")
+        print(f"Total videos found: {report.total}")
         print()
         
-        for category, videos in categories.items():
-            count = len(videos)
+        for category in CATEGORIES:
+            count = report.counts[category]
             if count > 0:
                 emoji = {
-                    'no_analysis': '🚫',
-                    'pending_analysis': '⏳',
-                    'failed_analysis': '❌',
-                    'incomplete_data': '⚠️',
-                    'complete': '✅'
+                    NO_ANALYSIS: '🚫',
+                    PENDING: '⏳',
+                    FAILED: '❌',
+                    INCOMPLETE_DATA: '⚠️',
+                    COMPLETE: '✅'
                 }[category]
                 
                 title = {
-                    'no_analysis': 'No Analysis Row',
-                    'pending_analysis': 'Analysis Pending/Processing',
-                    'failed_analysis': 'Analysis Failed',
-                    'incomplete_data': 'Incomplete Data (completed but missing transcription/llm_response)',
-                    'complete': 'Complete Analysis'
+                    NO_ANALYSIS: 'No Analysis Row',
+                    PENDING: 'Analysis Pending/Processing',
+                    FAILED: 'Analysis Failed',
+                    INCOMPLETE_DATA: 'Incomplete Data (completed but missing transcription/llm_response)',
+                    COMPLETE: 'Complete Analysis'
                 }[category]
                 
                 print(f"{emoji} {title}: {count} videos")
         
         print("\n" + "="*80)
     
-    def print_detailed_report(self, categories: Dict[str, List[Video]]):
-        """Print detailed information about incomplete videos."""
-        incomplete_categories = ['no_analysis', 'pending_analysis', 'failed_analysis', 'incomplete_data']
+    def stream_report(self, show_detailed: bool = False, itersize: int = DEFAULT_ITERSIZE) -> CategoryReport:
+        """Categorize videos as they stream in, printing issue videos immediately.
         
-        for category in incomplete_categories:
-            videos = categories[category]
+        No rows are kept: each video is counted and, with show_detailed,
+        printed under its category tag before the next one is read.
+        """
+        report = CategoryReport(TRANSCRIPT_RULES, keep=())
+        
+        for video in self.iter_videos(itersize):
+            category = report.add(video)
+            if show_detailed and category in ISSUE_CATEGORIES:
+                print(f"[{DETAIL_TITLES[category]}]")
+                self._print_video(video)
+        
+        return report
+    
+    def print_detailed_report(self, report: CategoryReport):
+        """Print detailed information about incomplete videos."""
+        for category in ISSUE_CATEGORIES:
+            videos = report.rows_for(category)
             if not videos:
                 continue
                 
-            title = {
-                'no_analysis': '🚫 VIDEOS WITHOUT ANALYSIS',
-                'pending_analysis': '⏳ VIDEOS WITH PENDING/PROCESSING ANALYSIS',
-                'failed_analysis': '❌ VIDEOS WITH FAILED ANALYSIS',
-                'incomplete_data': '⚠️ VIDEOS WITH INCOMPLETE DATA'
-            }[category]
-            
+            title = DETAIL_TITLES[category]
             print(f"\n{title}")
             print("-" * len(title))
             
             for video in videos:
-                print(f"📹 {video.original_name}")
-                print(f"   ID: {video.id}")
-                print(f"   Project: {video.project_id}")
-                print(f"   File Path: {video.file_path}")
-                print(f"   Video Status: {video.status}")
-                print(f"   Created: {video.created_at}")
-                
-                if video.analysis_id:
-                    print(f"   Analysis ID: {video.analysis_id}")
-                    print(f"   Analysis Status: {video.analysis_status}")
-                    print(f"   Has Transcription: {video.has_transcription}")
-                    print(f"   Has LLM Response: {video.has_llm_response}")
-                    print(f"   Has Video Analysis: {video.has_video_analysis}")
-                else:
-                    print(f"   Analysis: None")
-                print()
+                self._print_video(video)
+    
+    def watch(self, itersize: int = DEFAULT_ITERSIZE):
+        """Keep the summary live from change notifications instead of rescanning.
+        
+        Scans once, then re-reads only the videos named on WATCH_CHANNEL and
+        redraws the summary when a count actually changes. If the connection
+        drops, reconnects and rescans. Runs until interrupted.
+        """
+        if not self.conn:
+            raise ValueError("Not connected to database")
+        
+        categories = None
+        report = None
+        try:
+            while True:
+                try:
+                    if categories is None:
+                        categories = self._start_watch(itersize)
+                        report = CategoryReport(TRANSCRIPT_RULES, keep=())
+                        for per_video in categories.values():
+                            for category in per_video:
+                                report.counts[category] += 1
+                        self._draw_watch(report, "full scan")
+                        continue
+                    
+                    video_ids = self._collect_changes()
+                    if None in video_ids:
+                        # A payload we could not read; only a rescan is safe
+                        categories = None
+                        continue
+                    
+                    before = dict(report.counts)
+                    self._refresh_videos(categories, video_ids, report)
+                    if report.counts != before:
+                        deltas = ", ".join(
+                            f"{category} {report.counts[category] - before[category]:+d}"
+                            for category in CATEGORIES
+                            if report.counts[category] != before[category]
+                        )
+                        self._draw_watch(report, deltas)
+                except psycopg2.Error as e:
+                    print(f"⚠️  Watch interrupted ({e}), rescanning in {WATCH_RETRY_SECONDS}s")
+                    time.sleep(WATCH_RETRY_SECONDS)
+                    categories = None
+        except KeyboardInterrupt:
+            print("\n⏹️  Stopped watching")
+    
+    def _start_watch(self, itersize: int) -> Dict[str, List[str]]:
+        """LISTEN on WATCH_CHANNEL, then snapshot the categories of every video.
+        
+        LISTEN is committed before the scan starts, so a change that races the
+        scan is at worst applied twice, never missed.
+        """
+        if self.conn.closed:
+            self.conn = psycopg2.connect(self.database_url)
+        else:
+            self.conn.rollback()
+        
+        with self.conn.cursor() as cur:
+            cur.execute(f"LISTEN {WATCH_CHANNEL}")
+        self.conn.commit()
+        
+        # One entry per joined row, so counts match the full-scan report
+        categories = {}
+        for video in self.iter_videos(itersize):
+            categories.setdefault(video.id, []).append(classify(video, TRANSCRIPT_RULES))
+        self.conn.commit()
+        return categories
+    
+    def _collect_changes(self) -> set:
+        """Block until a notification arrives, then gather video ids until the burst ends.
+        
+        Returns the set of notified video ids; None in the set marks a payload
+        that could not be read.
+        """
+        video_ids = set()
+        deadline = None
+        while True:
+            if not self.conn.notifies:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if select.select([self.conn], [], [], timeout) == ([], [], []):
+                    return video_ids
+                self.conn.poll()
+            
+            while self.conn.notifies:
+                notify = self.conn.notifies.pop(0)
+                try:
+                    video_ids.add(json.loads(notify.payload)['video_id'])
+                except (ValueError, KeyError, TypeError):
+                    video_ids.add(None)
+            
+            if video_ids and deadline is None:
+                deadline = time.monotonic() + WATCH_DEBOUNCE_SECONDS
+    
+    def _refresh_videos(self, categories: Dict[str, List[str]], video_ids: set, report: CategoryReport):
+        """Re-read the given videos and move their counts to their current categories."""
+        with self.conn.cursor() as cur:
+            cur.execute(VIDEO_STATUS_BY_ID_QUERY, (list(video_ids),))
+            rows = cur.fetchall()
+        self.conn.commit()
+        
+        fresh = {}
+        for row in rows:
+            video = Video(*row)
+            fresh.setdefault(video.id, []).append(classify(video, TRANSCRIPT_RULES))
+        
+        for video_id in video_ids:
+            # Videos missing from the result were deleted
+            for category in categories.pop(video_id, ()):
+                report.counts[category] -= 1
+            if video_id in fresh:
+                categories[video_id] = fresh[video_id]
+                for category in fresh[video_id]:
+                    report.counts[category] += 1
+    
+    def _draw_watch(self, report: CategoryReport, note: str):
+        """Redraw the summary in place (when on a terminal) with what last changed."""
+        if sys.stdout.isatty():
+            print("\033[H\033[2J", end="")
+        self.print_summary(report)
+        print(f"👀 {datetime.now():%H:%M:%S} {note} — watching {WATCH_CHANNEL} (Ctrl-C to stop)", flush=True)
+    
+    def _print_video(self, video: Video):
+        """Print one video's detail block."""
+        print(f"📹 {video.original_name}")
+        print(f"   ID: {video.id}")
+        print(f"   Project: {video.project_id}")
+        print(f"   File Path: {video.file_path}")
+        print(f"   Video Status: {video.status}")
+        print(f"   Created: {video.created_at}")
+        
+        if video.analysis_id:
+            print(f"   Analysis ID: {video.analysis_id}")
+            print(f"   Analysis Status: {video.analysis_status}")
+            print(f"   Has Transcription: {video.has_transcription}")
+            print(f"   Has LLM Response: {video.has_llm_response}")
+            print(f"   Has Video Analysis: {video.has_video_analysis}")
+        else:
+            print("   Analysis: None")
+        print()
 
 
 def main():
@@ -235,6 +411,8 @@ def main():
     # Parse command line arguments
     show_detailed = '--detailed' in sys.argv or '-d' in sys.argv
     show_help = '--help' in sys.argv or '-h' in sys.argv
+    stream = '--stream' in sys.argv or '-s' in sys.argv
+    watch = '--watch' in sys.argv or '-w' in sys.argv
     
     if show_help:
         print("Video Analysis Checker")
@@ -244,6 +422,8 @@ def main():
         print("Options:")
         print("  -h, --help      Show this help message")
         print("  -d, --detailed  Show detailed report of incomplete videos")
+        print(f"  -s, --stream    Stream rows through a server-side cursor ({DEFAULT_ITERSIZE} per batch)")
+        print("  -w, --watch     Keep the summary live from NOTIFY events (needs the status notify migration)")
         print()
         print("Environment Variables:")
         print("  DATABASE_URL    Supabase database connection string")
@@ -256,18 +436,34 @@ def main():
         print("🔍 Querying video analysis status...")
         checker.connect()
         
-        videos = checker.query_incomplete_videos()
-        if not videos:
-            print("❌ No videos found or query failed")
+        if watch:
+            checker.watch()
+            return
+        
+        # The summary only needs counts; rows are fetched for the detailed report
+        report = None if show_detailed else checker.query_category_counts()
+        
+        if report is None and stream:
+            # Issue videos are printed as they arrive, ahead of the summary
+            report = checker.stream_report(show_detailed)
+        elif report is None:
+            videos = checker.query_incomplete_videos()
+            if not videos:
+                print("❌ No videos found or query failed")
+                return
+            report = checker.categorize_videos(videos, ISSUE_CATEGORIES if show_detailed else ())
+        
+        if report.total == 0:
+            print("❌ No videos found")
             return
         
-        categories = checker.categorize_videos(videos)
-        checker.print_summary(categories)
+        checker.print_summary(report)
         
         if show_detailed:
-            checker.print_detailed_report(categories)
+            if not stream:
+                checker.print_detailed_report(report)
         else:
-            incomplete_count = sum(len(categories[cat]) for cat in ['no_analysis', 'pending_analysis', 'failed_analysis', 'incomplete_data'])
+            incomplete_count = report.issues
             if incomplete_count > 0:
                 print(f"\n💡 Run with --detailed flag to see detailed information about {incomplete_count} incomplete videos")
         
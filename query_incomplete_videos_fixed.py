@@ -6,9 +6,27 @@ Fixed version with HTTP/1.1 and better error handling
 import os
 import sys
 import json
+import time
+import asyncio
 from datetime import datetime
 import httpx
 
+from postgrest_filters import chunk_ids, fetch_in_chunks, in_filter
+from video_categories import (
+    COMPLETE,
+    FAILED,
+    INCOMPLETE_DATA,
+    ISSUE_CATEGORIES,
+    NO_ANALYSIS,
+    PENDING,
+    PRESENCE_SELECT,
+    PRESENCE_VIEW,
+    TRANSCRIPT_RULES,
+    VideoRow,
+    categorize,
+    from_presence,
+)
+
 # Try to import supabase, fall back to instructions if not available
 try:
     from supabase import create_client, Client
@@ -17,6 +35,13 @@ except ImportError:
     print("Install with: pip install supabase")
     sys.exit(1)
 
+# Rows per keyset page of videos (both checkers); keep at or below PostgREST's max-rows
+PAGE_SIZE = 1000
+# Async checker: requests in flight
+ASYNC_MAX_PARALLEL = 8
+
+VIDEO_SELECT = 'id,project_id,file_name,original_name,file_path,status,created_at'
+
 class FixedVideoChecker:
     def __init__(self):
         """Initialize with Supabase client using HTTP/1.1."""
@@ -46,164 +71,256 @@ class FixedVideoChecker:
         )
         print("✅ Connected to Supabase (using HTTP/1.1)")
     
-    def get_all_videos_with_analysis_status(self):
-        """Get all videos and their analysis status in one optimized query."""
+    def get_all_videos_with_analysis_status(self, presence=False, keep=ISSUE_CATEGORIES):
+        """Fetch all videos and their analysis status and categorize them in one pass.
+        
+        With presence=True the has_* flags come from the presence view so the
+        JSONB payloads never leave the database. Rows are kept only for the
+        categories in `keep`; the rest are just counted. Returns a
+        CategoryReport, or None if nothing was found or the query failed.
+        """
         try:
             print("🔍 Fetching all videos...")
             
             # First get all videos
-            videos_response = self.supabase.table('videos').select(
-                'id, project_id, file_name, original_name, file_path, status, created_at'
-            ).execute()
-            
-            videos = videos_response.data
+            videos = self._fetch_videos()
             print(f"📹 Found {len(videos)} total videos")
             
             if not videos:
-                return [], []
+                return None
             
             # Get video IDs
             video_ids = [v['id'] for v in videos]
             
             print("🔍 Fetching analysis data...")
             
-            # Get analysis data for all videos
-            analysis_response = self.supabase.table('video_analysis').select(
-                'video_id, status, transcription, llm_response, video_analysis'
-            ).in_('video_id', video_ids).execute()
+            # Get analysis data for all videos, in URL-safe chunks of IDs
+            if presence:
+                table, select = PRESENCE_VIEW, PRESENCE_SELECT
+            else:
+                table, select = 'video_analysis', 'video_id, status, transcription, llm_response, video_analysis'
             
-            analysis_data = analysis_response.data
+            analysis_data = fetch_in_chunks(
+                lambda chunk: self.supabase.table(table).select(select).in_('video_id', chunk).execute().data,
+                video_ids
+            )
+            if presence:
+                analysis_data = [from_presence(record) for record in analysis_data]
             print(f"📊 Found {len(analysis_data)} analysis records")
             
             # Create lookup dict for analysis data
-            analysis_by_video_id = {}
-            for analysis in analysis_data:
-                analysis_by_video_id[analysis['video_id']] = analysis
+            analysis_by_video_id = {analysis['video_id']: analysis for analysis in analysis_data}
             
-            # Categorize videos
-            no_analysis = []
-            with_analysis = []
-            
-            for video in videos:
-                video_id = video['id']
-                if video_id in analysis_by_video_id:
-                    video['analysis'] = analysis_by_video_id[video_id]
-                    with_analysis.append(video)
-                else:
-                    no_analysis.append(video)
-            
-            return no_analysis, with_analysis
+            # A completed analysis needs transcription and llm_response
+            return categorize(
+                (VideoRow.from_records(video, analysis_by_video_id.get(video['id'])) for video in videos),
+                TRANSCRIPT_RULES,
+                keep
+            )
             
         except Exception as e:
             print(f"❌ Error fetching data: {e}")
             print(f"❌ Error type: {type(e).__name__}")
-            return [], []
+            return None
     
-    def categorize_analysis_issues(self, videos_with_analysis):
-        """Categorize videos with analysis by their completeness."""
-        pending = []
-        failed = []
-        incomplete_data = []
-        complete = []
-        
-        for video in videos_with_analysis:
-            analysis = video.get('analysis', {})
-            status = analysis.get('status', 'unknown')
-            
-            if status in ['pending', 'processing']:
-                pending.append(video)
-            elif status == 'failed':
-                failed.append(video)
-            elif status == 'completed':
-                # Check if data is actually present and not empty
-                has_transcription = (
-                    analysis.get('transcription') and 
-                    analysis.get('transcription') != {} and
-                    analysis.get('transcription') != 'null'
-                )
-                has_llm_response = (
-                    analysis.get('llm_response') and 
-                    analysis.get('llm_response') != {} and
-                    analysis.get('llm_response') != 'null'
-                )
-                
-                if not has_transcription or not has_llm_response:
-                    incomplete_data.append(video)
-                else:
-                    complete.append(video)
-            else:
-                # Unknown status
-                incomplete_data.append(video)
-        
-        return {
-            'pending': pending,
-            'failed': failed,
-            'incomplete_data': incomplete_data,
-            'complete': complete
-        }
+    def _fetch_videos(self):
+        """Fetch every video in keyset pages, so PostgREST's max-rows cap cannot truncate the list."""
+        videos = []
+        last_id = None
+        while True:
+            query = self.supabase.table('videos').select(VIDEO_SELECT).order('id').limit(PAGE_SIZE)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            page = query.execute().data
+            videos.extend(page)
+            if len(page) < PAGE_SIZE:
+                return videos
+            last_id = page[-1]['id']
     
-    def print_results(self, no_analysis, categories, detailed=False):
+    def print_results(self, report, detailed=False):
         """Print the results in a formatted way."""
-        total_videos = len(no_analysis) + sum(len(videos) for videos in categories.values())
-        total_issues = len(no_analysis) + len(categories['pending']) + len(categories['failed']) + len(categories['incomplete_data'])
+        counts = report.counts
+        total_issues = report.issues
         
         print("\n" + "="*80)
         print("📊 VIDEO ANALYSIS STATUS REPORT")
         print("="*80)
-        print(f"📹 Total videos: {total_videos}")
-        print(f"🚫 No analysis: {len(no_analysis)}")
-        print(f"⏳ Pending/Processing: {len(categories['pending'])}")
-        print(f"❌ Failed: {len(categories['failed'])}")
-        print(f"⚠️  Incomplete data: {len(categories['incomplete_data'])}")
-        print(f"✅ Complete: {len(categories['complete'])}")
+        print(f"📹 Total videos: {report.total}")
+        print(f"🚫 No analysis: {counts[NO_ANALYSIS]}")
+        print(f"⏳ Pending/Processing: {counts[PENDING]}")
+        print(f"❌ Failed: {counts[FAILED]}")
+        print(f"⚠️  Incomplete data: {counts[INCOMPLETE_DATA]}")
+        print(f"✅ Complete: {counts[COMPLETE]}")
         print(f"📊 Total needing attention: {total_issues}")
         
         if detailed and total_issues > 0:
-            self._print_detailed_sections(no_analysis, categories)
+            self._print_detailed_sections(report)
         elif total_issues > 0:
             print(f"\n💡 Run with --detailed flag to see detailed information")
         
         if total_issues == 0:
             print("\n🎉 All videos have complete analysis!")
     
-    def _print_detailed_sections(self, no_analysis, categories):
+    def _print_detailed_sections(self, report):
         """Print detailed information for each category."""
         sections = [
-            ("🚫 VIDEOS WITHOUT ANALYSIS", no_analysis),
-            ("⏳ VIDEOS WITH PENDING/PROCESSING ANALYSIS", categories['pending']),
-            ("❌ VIDEOS WITH FAILED ANALYSIS", categories['failed']),
-            ("⚠️  VIDEOS WITH INCOMPLETE DATA", categories['incomplete_data'])
+            ("🚫 VIDEOS WITHOUT ANALYSIS", report.rows_for(NO_ANALYSIS)),
+            ("⏳ VIDEOS WITH PENDING/PROCESSING ANALYSIS", report.rows_for(PENDING)),
+            ("❌ VIDEOS WITH FAILED ANALYSIS", report.rows_for(FAILED)),
+            ("⚠️  VIDEOS WITH INCOMPLETE DATA", report.rows_for(INCOMPLETE_DATA))
         ]
         
-        for title, videos in sections:
-            if not videos:
+        for title, rows in sections:
+            if not rows:
                 continue
                 
             print(f"\n{title}")
             print("-" * len(title))
             
-            for video in videos:
-                analysis = video.get('analysis', {})
-                print(f"📹 {video['original_name']}")
-                print(f"   ID: {video['id']}")
-                print(f"   Project: {video['project_id']}")
-                print(f"   File: {video['file_path']}")
-                print(f"   Video Status: {video['status']}")
-                print(f"   Created: {video['created_at']}")
+            for row in rows:
+                print(f"📹 {row.original_name}")
+                print(f"   ID: {row.id}")
+                print(f"   Project: {row.project_id}")
+                print(f"   File: {row.file_path}")
+                print(f"   Video Status: {row.status}")
+                print(f"   Created: {row.created_at}")
                 
-                if analysis:
-                    print(f"   Analysis Status: {analysis.get('status', 'unknown')}")
-                    print(f"   Has Transcription: {bool(analysis.get('transcription'))}")
-                    print(f"   Has LLM Response: {bool(analysis.get('llm_response'))}")
-                    print(f"   Has Video Analysis: {bool(analysis.get('video_analysis'))}")
+                if row.has_analysis:
+                    print(f"   Analysis Status: {row.analysis_status}")
+                    print(f"   Has Transcription: {row.has_transcription}")
+                    print(f"   Has LLM Response: {row.has_llm_response}")
+                    print(f"   Has Video Analysis: {row.has_video_analysis}")
                 else:
                     print(f"   Analysis: None")
                 print()
 
+class AsyncFixedVideoChecker(FixedVideoChecker):
+    """Same report as FixedVideoChecker, fetched with httpx.AsyncClient.
+    
+    Videos are walked by keyset pages; as soon as a page arrives, its
+    analysis rows are requested in parallel `video_id=in.(...)` chunks while
+    the next videos page is being fetched, so the two tables overlap instead
+    of running back to back. A semaphore caps requests in flight.
+    """
+    
+    def __init__(self, max_parallel=ASYNC_MAX_PARALLEL, page_size=PAGE_SIZE):
+        """Read credentials only; requests go straight to PostgREST."""
+        self.url = os.getenv('SUPABASE_URL', '').rstrip('/')
+        key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+        
+        if not self.url or not key:
+            print("❌ Required environment variables not set:")
+            print("   SUPABASE_URL - Your Supabase project URL")
+            print("   SUPABASE_SERVICE_ROLE_KEY - Your service role key")
+            sys.exit(1)
+        
+        self.headers = {'apikey': key, 'Authorization': f'Bearer {key}'}
+        self.max_parallel = max_parallel
+        self.page_size = page_size
+        self.requests_made = 0
+    
+    async def _get(self, client, semaphore, table, params):
+        """GET one PostgREST resource under the in-flight limit."""
+        async with semaphore:
+            self.requests_made += 1
+            response = await client.get(f"{self.url}/rest/v1/{table}", headers=self.headers, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"{table} request failed: {response.status_code} - {response.text[:500]}")
+        return response.json()
+    
+    async def _page_rows(self, client, semaphore, videos, presence):
+        """Fetch analysis for one page of videos in parallel chunks and build its rows."""
+        if presence:
+            table, select = PRESENCE_VIEW, PRESENCE_SELECT
+        else:
+            table, select = 'video_analysis', 'video_id,status,transcription,llm_response,video_analysis'
+        
+        chunks = await asyncio.gather(*(
+            self._get(client, semaphore, table, {'select': select, 'video_id': in_filter(ids)})
+            for ids in chunk_ids([video['id'] for video in videos])
+        ))
+        
+        analysis_by_video_id = {}
+        for records in chunks:
+            for record in records:
+                analysis_by_video_id[record['video_id']] = from_presence(record) if presence else record
+        
+        return [VideoRow.from_records(video, analysis_by_video_id.get(video['id'])) for video in videos]
+    
+    async def _collect(self, presence, keep):
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        limits = httpx.Limits(max_connections=self.max_parallel, max_keepalive_connections=self.max_parallel)
+        page_tasks = []
+        last_id = None
+        
+        async with httpx.AsyncClient(http2=False, timeout=30.0, limits=limits) as client:
+            while True:
+                params = {
+                    'select': VIDEO_SELECT,
+                    'order': 'id.asc',
+                    'limit': self.page_size
+                }
+                if last_id is not None:
+                    params['id'] = f'gt.{last_id}'
+                
+                videos = await self._get(client, semaphore, 'videos', params)
+                if not videos:
+                    break
+                last_id = videos[-1]['id']
+                # Start this page's analysis fetch, then go straight on to the next page
+                page_tasks.append(asyncio.create_task(self._page_rows(client, semaphore, videos, presence)))
+            
+            pages = await asyncio.gather(*page_tasks)
+        
+        return categorize((row for rows in pages for row in rows), TRANSCRIPT_RULES, keep)
+    
+    def get_all_videos_with_analysis_status(self, presence=False, keep=ISSUE_CATEGORIES):
+        """Fetch and categorize every video; returns a CategoryReport or None."""
+        try:
+            print(f"🔍 Fetching videos and analysis concurrently (up to {self.max_parallel} requests in flight)...")
+            report = asyncio.run(self._collect(presence, keep))
+        except Exception as e:
+            print(f"❌ Error fetching data: {e}")
+            print(f"❌ Error type: {type(e).__name__}")
+            return None
+        
+        print(f"📹 Found {report.total} total videos ({self.requests_made} requests)")
+        return report if report.total else None
+
+
+def compare_latency(presence=False):
+    """Time the sync and async paths end to end; timings are only reported if both saw the same videos."""
+    results = {}
+    for name, checker in (('sync', FixedVideoChecker()), ('async', AsyncFixedVideoChecker())):
+        started = time.perf_counter()
+        report = checker.get_all_videos_with_analysis_status(presence, keep=())
+        results[name] = (time.perf_counter() - started, report)
+    
+    sync_elapsed, sync_report = results['sync']
+    async_elapsed, async_report = results['async']
+    if not sync_report or not async_report:
+        print("❌ A checker failed; no timings to compare")
+        return
+    if sync_report.counts != async_report.counts:
+        # Different row sets (e.g. data changed mid-run) make the timings meaningless
+        print(f"❌ Counts differ, not comparing timings: sync {sync_report.counts} vs async {async_report.counts}")
+        return
+    
+    print("\n" + "="*80)
+    print("⏱️  END-TO-END LATENCY")
+    print("="*80)
+    for name, (elapsed, report) in results.items():
+        print(f"{name:>6}: {elapsed:.2f}s for {report.total} videos")
+    if async_elapsed > 0:
+        print(f"speedup: {sync_elapsed / async_elapsed:.1f}x")
+
 def main():
     """Main function."""
     detailed = '--detailed' in sys.argv or '-d' in sys.argv
     show_help = '--help' in sys.argv or '-h' in sys.argv
+    presence = '--presence' in sys.argv or '-p' in sys.argv
+    use_async = '--async' in sys.argv or '-a' in sys.argv
+    compare = '--compare' in sys.argv
     
     if show_help:
         print("Fixed Video Analysis Checker")
@@ -213,6 +330,9 @@ def main():
         print("Options:")
         print("  -h, --help      Show this help message")
         print("  -d, --detailed  Show detailed report")
+        print("  -p, --presence  Fetch has_* flags from the presence view instead of JSONB")
+        print("  -a, --async     Fetch both tables concurrently with httpx.AsyncClient")
+        print("  --compare       Time the sync and async paths against each other")
         print()
         print("Environment Variables:")
         print("  SUPABASE_URL              Your Supabase project URL")
@@ -220,17 +340,22 @@ def main():
         return
     
     try:
-        checker = FixedVideoChecker()
+        if compare:
+            compare_latency(presence)
+            return
+        
+        checker = AsyncFixedVideoChecker() if use_async else FixedVideoChecker()
         
         print("🔍 Analyzing video status...")
-        no_analysis, with_analysis = checker.get_all_videos_with_analysis_status()
+        # Issue rows are only needed for the detailed report
+        keep = ISSUE_CATEGORIES if detailed else ()
+        report = checker.get_all_videos_with_analysis_status(presence, keep)
         
-        if not no_analysis and not with_analysis:
+        if not report:
             print("❌ No videos found or query failed")
             return
         
-        categories = checker.categorize_analysis_issues(with_analysis)
-        checker.print_results(no_analysis, categories, detailed)
+        checker.print_results(report, detailed)
         
     except Exception as e:
         print(f"❌ Fatal error: {e}")
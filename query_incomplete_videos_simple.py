@@ -6,6 +6,7 @@ This version uses the Supabase client instead of direct PostgreSQL connection.
 Usage:
     python query_incomplete_videos_simple.py
     python query_incomplete_videos_simple.py --detailed
+    python query_incomplete_videos_simple.py --server-side
 """
 
 import os
@@ -22,6 +23,47 @@ except ImportError:
     print("Or use the PostgreSQL version: query_incomplete_videos.py")
     sys.exit(1)
 
+from postgrest_filters import fetch_in_chunks
+from video_categories import (
+    FAILED,
+    INCOMPLETE_DATA,
+    NO_ANALYSIS,
+    PENDING,
+    PRESENCE_SELECT,
+    PRESENCE_VIEW,
+    TRANSCRIPT_RULES,
+    VideoRow,
+    categorize,
+    from_presence,
+    has_data,
+)
+
+# Problem rows only (see the videos_needing_analysis view migration)
+NEEDING_ANALYSIS_VIEW = 'videos_needing_analysis'
+NEEDING_ANALYSIS_PAGE_SIZE = 1000
+
+def needing_analysis_filter(rules):
+    """PostgREST or=(...) filter keeping the view rows that are issues under `rules`."""
+    # neq never matches NULL, so a NULL status needs its own condition
+    conditions = ['analysis_id.is.null', 'analysis_status.is.null', 'analysis_status.neq.completed']
+    conditions += [f'has_{field}.is.false' for field in rules.required_fields]
+    return ','.join(conditions)
+
+def from_needing_analysis(record):
+    """Map a videos_needing_analysis row onto a VideoRow."""
+    if record.get('analysis_id') is None:
+        return VideoRow.from_records(record)
+    return VideoRow(
+        record['id'], record.get('project_id'), record.get('original_name'),
+        record.get('file_path'), record.get('status'), record.get('created_at'),
+        has_analysis=True,
+        analysis_id=record['analysis_id'],
+        analysis_status=record.get('analysis_status'),
+        has_transcription=bool(record.get('has_transcription')),
+        has_llm_response=bool(record.get('has_llm_response')),
+        has_video_analysis=bool(record.get('has_video_analysis'))
+    )
+
 class SimpleVideoChecker:
     def __init__(self):
         """Initialize with Supabase client."""
@@ -38,7 +80,7 @@ class SimpleVideoChecker:
         print("✅ Connected to Supabase")
     
     def get_videos_without_analysis(self):
-        """Get videos that have no video_analysis row."""
+        """Get videos that have no video_analysis row, as VideoRows."""
         try:
             # Get all videos
             videos_response = self.supabase.table('videos').select('*').execute()
@@ -50,79 +92,102 @@ class SimpleVideoChecker:
             analyzed_video_ids = {record['video_id'] for record in analysis_response.data}
             
             # Find videos without analysis
-            unanalyzed_videos = [v for v in videos if v['id'] not in analyzed_video_ids]
-            
-            return unanalyzed_videos
+            return [VideoRow.from_records(v) for v in videos if v['id'] not in analyzed_video_ids]
             
         except Exception as e:
             print(f"❌ Error fetching videos without analysis: {e}")
             return []
     
-    def get_videos_with_incomplete_analysis(self):
-        """Get videos with incomplete or failed analysis."""
+    def get_videos_with_incomplete_analysis(self, presence=False):
+        """Get videos with incomplete or failed analysis, as VideoRows.
+        
+        With presence=True the has_* flags come from the presence view so the
+        JSONB payloads never leave the database.
+        """
+        if presence:
+            table, select, convert = PRESENCE_VIEW, PRESENCE_SELECT, from_presence
+        else:
+            table = 'video_analysis'
+            select = 'id, video_id, status, transcription, llm_response, video_analysis'
+            convert = None
+        
         try:
-            # Query video_analysis for incomplete records
-            response = self.supabase.table('video_analysis').select(
-                'id, video_id, status, transcription, llm_response, video_analysis'
-            ).neq('status', 'completed').execute()
-            
-            incomplete_analysis = response.data
-            
-            # Also check completed records that might be missing data
-            completed_response = self.supabase.table('video_analysis').select(
-                'id, video_id, status, transcription, llm_response, video_analysis'
-            ).eq('status', 'completed').execute()
-            
-            completed_analysis = completed_response.data
+            # One scan of video_analysis; split by status here rather than querying twice
+            analysis = self.supabase.table(table).select(select).execute().data
+            if convert:
+                analysis = [convert(record) for record in analysis]
             
-            # Filter completed records that are actually incomplete
-            incomplete_completed = []
-            for record in completed_analysis:
-                missing_data = (
-                    not record.get('transcription') or 
-                    not record.get('llm_response') or
-                    record.get('transcription') == {} or
-                    record.get('llm_response') == {}
-                )
-                if missing_data:
-                    incomplete_completed.append(record)
-            
-            # Get video details for incomplete analysis
-            all_incomplete = incomplete_analysis + incomplete_completed
+            # Anything not completed, plus completed records that are missing data
+            all_incomplete = [
+                record for record in analysis
+                if record.get('status') != 'completed'
+                or not all(has_data(record.get(field)) for field in TRANSCRIPT_RULES.required_fields)
+            ]
             video_ids = [record['video_id'] for record in all_incomplete]
             
             if not video_ids:
                 return []
             
-            # Get video details
-            videos_response = self.supabase.table('videos').select('*').in_('id', video_ids).execute()
-            videos_by_id = {v['id']: v for v in videos_response.data}
+            # Get video details, in URL-safe chunks of IDs
+            videos = fetch_in_chunks(
+                lambda chunk: self.supabase.table('videos').select('*').in_('id', chunk).execute().data,
+                video_ids
+            )
+            videos_by_id = {v['id']: v for v in videos}
             
             # Combine video and analysis data
-            result = []
-            for analysis in all_incomplete:
-                video_id = analysis['video_id']
-                if video_id in videos_by_id:
-                    video = videos_by_id[video_id]
-                    video['analysis'] = analysis
-                    result.append(video)
-            
-            return result
+            return [
+                VideoRow.from_records(videos_by_id[analysis['video_id']], analysis)
+                for analysis in all_incomplete
+                if analysis['video_id'] in videos_by_id
+            ]
             
         except Exception as e:
             print(f"❌ Error fetching incomplete analysis: {e}")
             return []
     
-    def print_results(self, no_analysis, incomplete_analysis, detailed=False):
+    def get_videos_needing_attention(self, rules=TRANSCRIPT_RULES):
+        """Get only the videos that need attention, computed in the database.
+        
+        Reads the videos_needing_analysis view, which does the no-analysis
+        anti-join and the incomplete filter server-side, narrowed to the
+        fields `rules` requires. Transfer scales with the number of problems,
+        not the number of videos. Returns VideoRows, or None if the query
+        failed (e.g. the view migration has not been applied).
+        """
+        rows = []
+        try:
+            while True:
+                # Offset pages: the view has no unique key (a video can have several analyses)
+                page = (
+                    self.supabase.table(NEEDING_ANALYSIS_VIEW)
+                    .select('*')
+                    .or_(needing_analysis_filter(rules))
+                    .order('id')
+                    .order('analysis_id')
+                    .range(len(rows), len(rows) + NEEDING_ANALYSIS_PAGE_SIZE - 1)
+                    .execute()
+                    .data
+                )
+                rows.extend(from_needing_analysis(record) for record in page)
+                if len(page) < NEEDING_ANALYSIS_PAGE_SIZE:
+                    return rows
+        except Exception as e:
+            print(f"❌ Error fetching videos needing analysis: {e}")
+            return None
+    
+    def print_results(self, report, detailed=False):
         """Print the results in a formatted way."""
-        total_issues = len(no_analysis) + len(incomplete_analysis)
+        counts = report.counts
+        incomplete_count = counts[PENDING] + counts[FAILED] + counts[INCOMPLETE_DATA]
+        total_issues = report.issues
         
         print("\n" + "="*80)
         print("📊 VIDEO ANALYSIS STATUS REPORT")
         print("="*80)
         
-        print(f"🚫 Videos without analysis: {len(no_analysis)}")
-        print(f"⚠️  Videos with incomplete analysis: {len(incomplete_analysis)}")
+        print(f"🚫 Videos without analysis: {counts[NO_ANALYSIS]}")
+        print(f"⚠️  Videos with incomplete analysis: {incomplete_count}")
         print(f"📊 Total videos needing attention: {total_issues}")
         
         if detailed and total_issues > 0:
@@ -130,31 +195,31 @@ class SimpleVideoChecker:
             print("🚫 VIDEOS WITHOUT ANALYSIS")
             print("="*80)
             
-            for video in no_analysis:
-                print(f"📹 {video['original_name']}")
-                print(f"   ID: {video['id']}")
-                print(f"   Project: {video['project_id']}")
-                print(f"   File: {video['file_path']}")
-                print(f"   Status: {video['status']}")
-                print(f"   Created: {video['created_at']}")
+            for row in report.rows_for(NO_ANALYSIS):
+                print(f"📹 {row.original_name}")
+                print(f"   ID: {row.id}")
+                print(f"   Project: {row.project_id}")
+                print(f"   File: {row.file_path}")
+                print(f"   Status: {row.status}")
+                print(f"   Created: {row.created_at}")
                 print()
             
             print("\n" + "="*80)
             print("⚠️  VIDEOS WITH INCOMPLETE ANALYSIS")
             print("="*80)
             
-            for video in incomplete_analysis:
-                analysis = video.get('analysis', {})
-                print(f"📹 {video['original_name']}")
-                print(f"   ID: {video['id']}")
-                print(f"   Project: {video['project_id']}")
-                print(f"   File: {video['file_path']}")
-                print(f"   Video Status: {video['status']}")
-                print(f"   Analysis Status: {analysis.get('status', 'unknown')}")
-                print(f"   Has Transcription: {bool(analysis.get('transcription'))}")
-                print(f"   Has LLM Response: {bool(analysis.get('llm_response'))}")
-                print(f"   Has Video Analysis: {bool(analysis.get('video_analysis'))}")
-                print()
+            for category in (PENDING, FAILED, INCOMPLETE_DATA):
+                for row in report.rows_for(category):
+                    print(f"📹 {row.original_name}")
+                    print(f"   ID: {row.id}")
+                    print(f"   Project: {row.project_id}")
+                    print(f"   File: {row.file_path}")
+                    print(f"   Video Status: {row.status}")
+                    print(f"   Analysis Status: {row.analysis_status}")
+                    print(f"   Has Transcription: {row.has_transcription}")
+                    print(f"   Has LLM Response: {row.has_llm_response}")
+                    print(f"   Has Video Analysis: {row.has_video_analysis}")
+                    print()
         
         elif total_issues > 0:
             print(f"\n💡 Run with --detailed flag to see detailed information")
@@ -166,6 +231,8 @@ def main():
     """Main function."""
     detailed = '--detailed' in sys.argv or '-d' in sys.argv
     show_help = '--help' in sys.argv or '-h' in sys.argv
+    presence = '--presence' in sys.argv or '-p' in sys.argv
+    server_side = '--server-side' in sys.argv or '-s' in sys.argv
     
     if show_help:
         print("Simple Video Analysis Checker")
@@ -175,6 +242,8 @@ def main():
         print("Options:")
         print("  -h, --help      Show this help message")
         print("  -d, --detailed  Show detailed report")
+        print("  -p, --presence  Fetch has_* flags from the presence view instead of JSONB")
+        print("  -s, --server-side Fetch only problem videos from the videos_needing_analysis view")
         print()
         print("Environment Variables:")
         print("  SUPABASE_URL              Your Supabase project URL")
@@ -185,10 +254,15 @@ def main():
     
     print("🔍 Checking video analysis status...")
     
-    no_analysis = checker.get_videos_without_analysis()
-    incomplete_analysis = checker.get_videos_with_incomplete_analysis()
+    if server_side:
+        rows = checker.get_videos_needing_attention(TRANSCRIPT_RULES)
+        if rows is None:
+            sys.exit(1)
+    else:
+        rows = checker.get_videos_without_analysis() + checker.get_videos_with_incomplete_analysis(presence)
     
-    checker.print_results(no_analysis, incomplete_analysis, detailed)
+    report = categorize(rows, TRANSCRIPT_RULES)
+    checker.print_results(report, detailed)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
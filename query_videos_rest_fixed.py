@@ -4,15 +4,188 @@ Alternative approach using direct REST API calls with proper header cleaning
 """
 
 import os
+import re
 import sys
 import json
-import requests
+import math
 import time
 from datetime import datetime
 
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from audit_snapshot import DEFAULT_SNAPSHOT_PATH, AuditSnapshot, since_filter
+from reanalysis_dispatcher import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE_PER_MINUTE,
+    NotDispatchedError,
+    ReanalysisDispatcher,
+    RetryableError,
+)
+from reanalysis_journal import DEFAULT_JOURNAL_PATH, ReanalysisJournal, print_run_stats
+from postgrest_filters import chunk_ids, in_filter
+from rest_session import DEFAULT_POOL_SIZE, get_session, print_connection_stats
+from video_categories import (
+    COMPLETE,
+    FAILED,
+    INCOMPLETE_DATA,
+    ISSUE_CATEGORIES,
+    LLM_RULES,
+    NO_ANALYSIS,
+    PENDING,
+    PRESENCE_SELECT,
+    PRESENCE_VIEW,
+    VideoRow,
+    categorize,
+    from_presence,
+    has_data,
+)
+
+# Rows per keyset page; keep at or below PostgREST's max-rows setting
+DEFAULT_PAGE_SIZE = 1000
+
+# Lambda responses worth retrying. 504 is deliberately excluded: API Gateway
+# gave up waiting but the Lambda keeps running, so a retry would double-dispatch.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503}
+
+# Seconds to wait for a trigger response; a read timeout past this is reported
+# as an unknown outcome, never resent, for the same reason as a 504
+TRIGGER_TIMEOUT_SECONDS = 30
+
+TRANSCRIBE_AUDIO_URL = "https://3jmprxblzk.execute-api.us-east-1.amazonaws.com/default/TranscribeAudio"
+
+# Records per fake S3 event; 1 keeps one Lambda invocation per video
+DEFAULT_TRIGGER_BATCH_SIZE = 1
+# Synchronous Lambda invocations take at most 6 MB (API Gateway allows 10 MB);
+# leave headroom for headers and encoding
+MAX_TRIGGER_PAYLOAD_BYTES = 5 * 1024 * 1024
+
+# How the process-video-queue cron drains the queue: every CRON_INTERVAL_MINUTES
+# (vercel.json) it fills up to DEFAULT_CONCURRENCY (MAX_CONCURRENT_PROCESSING) slots
+CRON_INTERVAL_MINUTES = 1
+
+
+def _retry_after(response):
+    """Parse a Retry-After header in seconds, if present."""
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return None
+
+def _s3_record(video_id, file_path):
+    """One fake S3 ObjectCreated:Put record that mimics an actual upload of file_path."""
+    return {
+        "eventVersion": "2.0",
+        "eventSource": "aws:s3",
+        "awsRegion": "us-east-1",
+        "eventTime": "1970-01-01T00:00:00.000Z",
+        "eventName": "ObjectCreated:Put",
+        "userIdentity": {
+            "principalId": "REANALYSIS_TRIGGER"
+        },
+        "requestParameters": {
+            "sourceIPAddress": "127.0.0.1"
+        },
+        "responseElements": {
+            "x-amz-request-id": f"REANALYSIS-{video_id}",
+            "x-amz-id-2": "REANALYSIS/TRIGGER/REQUEST"
+        },
+        "s3": {
+            "s3SchemaVersion": "1.0",
+            "configurationId": "reanalysisConfigRule",
+            "bucket": {
+                "name": "raw-clips-global",
+                "ownerIdentity": {
+                    "principalId": "REANALYSIS_TRIGGER"
+                },
+                "arn": "arn:aws:s3:::raw-clips-global"
+            },
+            "object": {
+                "key": file_path,
+                "size": 1024,
+                "eTag": f"reanalysis{video_id}",
+                "sequencer": f"REANALYSIS{video_id}"
+            }
+        }
+    }
+
+def _never_connected(error):
+    """True if a requests error happened before a connection was made, so nothing was sent."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def _json_message(response, default='processed successfully'):
+    """The `message` of a JSON response body, or `default` if there is none."""
+    try:
+        result = response.json()
+    except ValueError:
+        return default
+    return result.get('message', default) if isinstance(result, dict) else default
+
+def max_trigger_batch_size(videos):
+    """Most records per S3 event that keep the payload under MAX_TRIGGER_PAYLOAD_BYTES."""
+    largest = max(
+        (len(json.dumps(_s3_record(video['id'], video.get('trigger_file_path') or ''))) for video in videos),
+        default=1
+    )
+    return max(1, MAX_TRIGGER_PAYLOAD_BYTES // (largest + 2))
+
+def _record_outcomes(result):
+    """Per-record outcomes from a batched trigger response, keyed by S3 object key.
+    
+    Expects `results` (or `records`) as a list of objects with a `key` and
+    either `success` or a `status` string; returns None if the response does
+    not break results down per record. A status that is neither a success
+    nor a failure (e.g. 'accepted') gives None: the outcome is unknown.
+    """
+    entries = result.get('results', result.get('records')) if isinstance(result, dict) else None
+    if not isinstance(entries, list):
+        return None
+    
+    outcomes = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or 'key' not in entry:
+            continue
+        if 'success' in entry:
+            success = bool(entry['success'])
+        else:
+            status = str(entry.get('status', '')).lower()
+            if status in ('success', 'succeeded', 'ok', 'processed'):
+                success = True
+            elif status in ('failed', 'failure', 'error', 'rejected'):
+                success = False
+            else:
+                success = None
+        outcomes[entry['key']] = (success, entry.get('message') or entry.get('error') or entry.get('status', ''))
+    return outcomes
+
+def _interval_minutes(value):
+    """Parse a Postgres interval as rendered by PostgREST ('1 day 02:03:04.5') into minutes."""
+    if not value:
+        return None
+    match = re.fullmatch(r'(?:(\d+) days?)?\s*(?:(\d+):(\d+):(\d+(?:\.\d+)?))?', str(value).strip())
+    if not match or not any(match.groups()):
+        return None
+    days, hours, minutes, seconds = (float(part) if part else 0.0 for part in match.groups())
+    return days * 1440 + hours * 60 + minutes + seconds / 60
+
+def projected_drain_minutes(queued, avg_processing_minutes=None, slots=DEFAULT_CONCURRENCY,
+                            interval=CRON_INTERVAL_MINUTES):
+    """Minutes for the cron worker to start `queued` videos.
+    
+    A slot freed mid-interval is only refilled on the next cron tick, so each
+    slot takes ceil(processing time / interval) ticks per video (at least one).
+    Without a measured processing time this assumes one tick per video, the
+    fastest the cron can go.
+    """
+    ticks_per_video = max(1, math.ceil((avg_processing_minutes or 0) / interval))
+    return math.ceil(queued / slots) * ticks_per_video * interval
+
 class RestVideoChecker:
-    def __init__(self):
-        """Initialize with direct REST API calls."""
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        """Initialize with direct REST API calls over a shared keep-alive session."""
         self.url = os.getenv('SUPABASE_URL', '').strip()
         self.key = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '').strip().replace('\n', '').replace('\r', '')
         
@@ -34,6 +207,7 @@ class RestVideoChecker:
             'Content-Type': 'application/json',
             'Prefer': 'return=representation'
         }
+        self.session = get_session(pool_size)
         
         print(f"✅ Using direct REST API calls")
         print(f"🔗 URL: {self.url}")
@@ -42,7 +216,7 @@ class RestVideoChecker:
     def test_connection(self):
         """Test the connection first."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/rest/v1/videos",
                 headers=self.headers,
                 params={'select': 'id', 'limit': 1},
@@ -72,7 +246,7 @@ class RestVideoChecker:
         """Get all videos using REST API."""
         try:
             print("📹 Fetching videos...")
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/rest/v1/videos",
                 headers=self.headers,
                 params={
@@ -94,21 +268,32 @@ class RestVideoChecker:
             print(f"❌ Error fetching videos: {e}")
             return []
     
-    def get_video_analysis(self):
-        """Get all video analysis using REST API."""
+    def get_video_analysis(self, presence=False):
+        """Get all video analysis using REST API.
+        
+        With presence=True the has_* flags are read from the presence view
+        instead of downloading the JSONB columns.
+        """
+        if presence:
+            table, select = PRESENCE_VIEW, PRESENCE_SELECT
+        else:
+            table, select = 'video_analysis', 'video_id,status,transcription,llm_response,video_analysis'
+        
         try:
             print("📊 Fetching analysis records...")
-            response = requests.get(
-                f"{self.url}/rest/v1/video_analysis",
+            response = self.session.get(
+                f"{self.url}/rest/v1/{table}",
                 headers=self.headers,
                 params={
-                    'select': 'video_id,status,transcription,llm_response,video_analysis'
+                    'select': select
                 },
                 timeout=30
             )
             
             if response.status_code == 200:
                 analysis = response.json()
+                if presence:
+                    analysis = [from_presence(record) for record in analysis]
                 print(f"📊 Found {len(analysis)} analysis records")
                 return analysis
             else:
@@ -120,14 +305,130 @@ class RestVideoChecker:
             print(f"❌ Error fetching analysis: {e}")
             return []
     
-    def analyze_videos(self):
-        """Analyze video completion status."""
+    def _iter_table(self, table, select, page_size, filters=None):
+        """Walk a table by keyset on id, yielding rows one page at a time.
+        
+        Each request asks for `id > last_id` ordered by id, so no page ever
+        depends on an offset and the walk cannot stop early at PostgREST's
+        max-rows cap: it only ends when the server returns an empty page.
+        `filters` adds extra PostgREST column filters to every page.
+        """
+        last_id = None
+        page = 0
+        total = 0
+        
+        while True:
+            params = {
+                'select': select,
+                'order': 'id.asc',
+                'limit': page_size,
+                **(filters or {})
+            }
+            if last_id is not None:
+                params['id'] = f'gt.{last_id}'
+            
+            started = time.perf_counter()
+            response = self.session.get(
+                f"{self.url}/rest/v1/{table}",
+                headers=self.headers,
+                params=params,
+                timeout=30
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            
+            if response.status_code != 200:
+                raise RuntimeError(
+                    f"{table} page {page + 1} failed: {response.status_code} - {response.text[:500]}"
+                )
+            
+            rows = response.json()
+            if not rows:
+                break
+            
+            page += 1
+            total += len(rows)
+            last_id = rows[-1]['id']
+            print(f"   📄 {table} page {page}: {len(rows)} rows in {elapsed_ms:.0f} ms ({total} so far)")
+            
+            yield from rows
+    
+    def iter_videos(self, page_size=DEFAULT_PAGE_SIZE, created_since=None):
+        """Stream all videos page by page using keyset pagination.
+        
+        `created_since` is a PostgREST filter value on created_at (e.g. 'gte.<ts>').
+        """
+        print(f"📹 Streaming videos ({page_size} per page)...")
+        return self._iter_table(
+            'videos',
+            'id,project_id,file_name,original_name,file_path,status,created_at',
+            page_size,
+            {'created_at': created_since} if created_since else None
+        )
+    
+    def iter_video_analysis(self, page_size=DEFAULT_PAGE_SIZE, presence=False, updated_since=None):
+        """Stream all analysis records page by page using keyset pagination.
+        
+        `updated_since` is a PostgREST filter value on updated_at (e.g. 'gte.<ts>').
+        """
+        print(f"📊 Streaming analysis records ({page_size} per page)...")
+        filters = {'updated_at': updated_since} if updated_since else None
+        if presence:
+            return (
+                from_presence(record)
+                for record in self._iter_table(PRESENCE_VIEW, PRESENCE_SELECT + ',updated_at', page_size, filters)
+            )
+        return self._iter_table(
+            'video_analysis',
+            'id,video_id,status,updated_at,transcription,llm_response,video_analysis',
+            page_size,
+            filters
+        )
+    
+    def _stream_analysis_lookup(self, page_size, presence=False):
+        """Build the analysis lookup from the stream, keeping only presence flags.
+        
+        The JSONB payloads are reduced to booleans as each page arrives, so the
+        lookup stays small no matter how large the Gemini responses are.
+        """
+        analysis_by_video = {}
+        for record in self.iter_video_analysis(page_size, presence):
+            analysis_by_video[record['video_id']] = {
+                'video_id': record['video_id'],
+                'status': record.get('status'),
+                'transcription': has_data(record.get('transcription')),
+                'llm_response': has_data(record.get('llm_response')),
+                'video_analysis': has_data(record.get('video_analysis'))
+            }
+        print(f"📊 Found {len(analysis_by_video)} analysis records")
+        return analysis_by_video
+    
+    def analyze_videos(self, stream=False, page_size=DEFAULT_PAGE_SIZE, presence=False):
+        """Analyze video completion status.
+        
+        With stream=True both tables are walked with keyset pagination instead
+        of a single unbounded request per table. With presence=True the
+        emptiness checks run in the database via the presence view.
+        """
         # Test connection first
         if not self.test_connection():
             return None
         
+        if stream:
+            try:
+                analysis_by_video = self._stream_analysis_lookup(page_size, presence)
+                videos = self.iter_videos(page_size)
+                report = self._categorize(videos, analysis_by_video)
+            except Exception as e:
+                print(f"❌ Error streaming videos: {e}")
+                return None
+            
+            if report.total == 0:
+                print("❌ No videos found")
+                return None
+            return report
+        
         videos = self.get_videos()
-        analysis_records = self.get_video_analysis()
+        analysis_records = self.get_video_analysis(presence)
         
         if not videos:
             print("❌ No videos found")
@@ -135,52 +436,75 @@ class RestVideoChecker:
         
         # Create lookup for analysis records
         analysis_by_video = {record['video_id']: record for record in analysis_records}
+        return self._categorize(videos, analysis_by_video)
+    
+    def _categorize(self, videos, analysis_by_video):
+        """Categorize videos (list or stream) against the analysis lookup in one pass.
         
-        # Categorize videos
-        categories = {
-            'no_analysis': [],
-            'pending': [],
-            'failed': [],
-            'incomplete_data': [],
-            'complete': []
-        }
+        A completed analysis only needs llm_response and video_analysis here
+        (missing transcription is fine).
+        """
+        return categorize(
+            (VideoRow.from_records(video, analysis_by_video.get(video['id'])) for video in videos),
+            LLM_RULES
+        )
+    
+    def analyze_incremental(self, snapshot_path=DEFAULT_SNAPSHOT_PATH, page_size=DEFAULT_PAGE_SIZE,
+                            presence=False, rebuild=False):
+        """Analyze video completion status from a local snapshot plus a delta.
+        
+        Only videos created and analysis records updated since the snapshot's
+        watermarks are fetched; the first run (or rebuild=True) does a full
+        keyset scan to seed the snapshot.
+        """
+        if not self.test_connection():
+            return None
+        
+        started = time.perf_counter()
+        snapshot = AuditSnapshot(self.url) if rebuild else AuditSnapshot.load(snapshot_path, self.url)
         
-        for video in videos:
-            video_id = video['id']
-            analysis = analysis_by_video.get(video_id)
+        if snapshot.is_empty:
+            print("📸 No snapshot yet, running a full scan to seed it")
+            created_since = updated_since = None
+        else:
+            created_since = since_filter(snapshot.videos_watermark)
+            updated_since = since_filter(snapshot.analysis_watermark)
+            print(f"📸 Snapshot has {len(snapshot.rows)} videos")
+            print(f"   videos created since {snapshot.videos_watermark}")
+            print(f"   analysis updated since {snapshot.analysis_watermark}")
+        
+        try:
+            # Videos first, so analysis for brand-new videos has a row to land on
+            new_videos = 0
+            for video in self.iter_videos(page_size, created_since):
+                snapshot.merge_video(video)
+                new_videos += 1
             
-            if not analysis:
-                categories['no_analysis'].append(video)
-            else:
-                status = analysis.get('status', 'unknown')
-                
-                if status in ['pending', 'processing']:
-                    categories['pending'].append({**video, 'analysis': analysis})
-                elif status == 'failed':
-                    categories['failed'].append({**video, 'analysis': analysis})
-                elif status == 'completed':
-                    # Check if data exists and is not empty
-                    # For incomplete data: only care about missing llm_response or video_analysis
-                    # (missing transcription is fine)
-                    llm_response = analysis.get('llm_response')
-                    video_analysis = analysis.get('video_analysis')
-                    
-                    has_llm = llm_response and llm_response != {} and llm_response != 'null'
-                    has_video_analysis = video_analysis and video_analysis != {} and video_analysis != 'null'
-                    
-                    if has_llm and has_video_analysis:
-                        categories['complete'].append({**video, 'analysis': analysis})
-                    else:
-                        categories['incomplete_data'].append({**video, 'analysis': analysis})
-                else:
-                    categories['incomplete_data'].append({**video, 'analysis': analysis})
+            changed_analysis = 0
+            for record in self.iter_video_analysis(page_size, presence, updated_since):
+                snapshot.merge_analysis(record)
+                changed_analysis += 1
+        except Exception as e:
+            print(f"❌ Error fetching delta: {e}")
+            return None
         
-        return categories
+        snapshot.save(snapshot_path)
+        elapsed = time.perf_counter() - started
+        print(f"📸 Merged {new_videos} video rows and {changed_analysis} analysis rows in {elapsed:.2f}s")
+        if snapshot.orphans:
+            print(f"⚠️  {snapshot.orphans} analysis rows had no video in the snapshot (use --rebuild to rescan)")
+        print(f"💾 Snapshot saved to {snapshot_path}")
+        
+        report = snapshot.report(LLM_RULES, ISSUE_CATEGORIES)
+        if report.total == 0:
+            print("❌ No videos found")
+            return None
+        return report
     
     def get_video_file_path(self, video_id):
         """Get the file path for a video from the database."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/rest/v1/videos",
                 headers=self.headers,
                 params={
@@ -205,81 +529,92 @@ class RestVideoChecker:
             print(f"❌ Error getting file path for video {video_id}: {e}")
             return None
 
-    def trigger_reanalysis(self, video_id, project_id):
-        """Trigger reanalysis for a specific video by creating a fake S3 trigger event."""
-        api_url = "https://3jmprxblzk.execute-api.us-east-1.amazonaws.com/default/TranscribeAudio"
+    def get_video_file_paths(self, video_ids):
+        """Resolve trigger file paths for many videos with chunked `id=in.(...)` queries.
+        
+        Returns ({video_id: file_path}, number_of_requests). Processed paths win
+        over original paths, matching get_video_file_path.
+        """
+        paths = {}
+        requests_made = 0
+        
+        for chunk in chunk_ids(video_ids):
+            requests_made += 1
+            try:
+                response = self.session.get(
+                    f"{self.url}/rest/v1/videos",
+                    headers=self.headers,
+                    params={
+                        'select': 'id,file_path,processed_file_path',
+                        'id': in_filter(chunk)
+                    },
+                    timeout=30
+                )
+                
+                if response.status_code != 200:
+                    print(f"❌ Failed to resolve file paths: {response.status_code} - {response.text[:500]}")
+                    continue
+                
+                for video in response.json():
+                    file_path = video.get('processed_file_path') or video.get('file_path')
+                    if file_path:
+                        paths[video['id']] = file_path
+                        
+            except Exception as e:
+                print(f"❌ Error resolving file paths: {e}")
+        
+        return paths, requests_made
+    
+    def trigger_reanalysis(self, video_id, project_id, file_path=None):
+        """Trigger reanalysis for a specific video by creating a fake S3 trigger event.
         
+        Pass file_path when it is already known to skip the per-video lookup.
+        Raises NotDispatchedError if nothing reached the Lambda.
+        """
         # Get the file path for this video
-        file_path = self.get_video_file_path(video_id)
         if not file_path:
-            return False, f"Could not find file path for video {video_id}"
+            file_path = self.get_video_file_path(video_id)
+        if not file_path:
+            raise NotDispatchedError(f"Could not find file path for video {video_id}")
         
         # Create a fake S3 trigger event that mimics an actual S3 upload
-        s3_trigger_payload = {
-            "Records": [
-                {
-                    "eventVersion": "2.0",
-                    "eventSource": "aws:s3",
-                    "awsRegion": "us-east-1",
-                    "eventTime": "1970-01-01T00:00:00.000Z",
-                    "eventName": "ObjectCreated:Put",
-                    "userIdentity": {
-                        "principalId": "REANALYSIS_TRIGGER"
-                    },
-                    "requestParameters": {
-                        "sourceIPAddress": "127.0.0.1"
-                    },
-                    "responseElements": {
-                        "x-amz-request-id": f"REANALYSIS-{video_id}",
-                        "x-amz-id-2": "REANALYSIS/TRIGGER/REQUEST"
-                    },
-                    "s3": {
-                        "s3SchemaVersion": "1.0",
-                        "configurationId": "reanalysisConfigRule",
-                        "bucket": {
-                            "name": "raw-clips-global",
-                            "ownerIdentity": {
-                                "principalId": "REANALYSIS_TRIGGER"
-                            },
-                            "arn": "arn:aws:s3:::raw-clips-global"
-                        },
-                        "object": {
-                            "key": file_path,
-                            "size": 1024,
-                            "eTag": f"reanalysis{video_id}",
-                            "sequencer": f"REANALYSIS{video_id}"
-                        }
-                    }
-                }
-            ]
-        }
+        s3_trigger_payload = {"Records": [_s3_record(video_id, file_path)]}
         
         try:
             print(f"🔄 Sending S3 trigger event for file: {file_path}")
-            response = requests.post(
-                api_url,
+            response = self.session.post(
+                TRANSCRIBE_AUDIO_URL,
                 json=s3_trigger_payload,
                 headers={'Content-Type': 'application/json'},
-                timeout=30
+                timeout=TRIGGER_TIMEOUT_SECONDS
             )
             
             if response.status_code == 200:
-                result = response.json()
-                return True, f"S3 trigger: {result.get('message', 'processed successfully')}"
+                return True, f"S3 trigger: {_json_message(response)}"
+            elif response.status_code == 504:
+                # The Lambda got the event; the other payload format would dispatch it twice
+                return None, "S3 trigger: gateway timed out, Lambda may still be running"
+            elif response.status_code in RETRYABLE_STATUS_CODES:
+                # Throttled or transiently down: the other payload format would hit the same wall
+                raise RetryableError(f"S3 trigger HTTP {response.status_code}", _retry_after(response))
             else:
                 print(f"⚠️ S3 trigger failed ({response.status_code}), trying API Gateway format...")
                 # Fallback to API Gateway format
                 return self.trigger_reanalysis_api_gateway(video_id, project_id)
                 
-        except Exception as e:
-            print(f"⚠️ S3 trigger error ({e}), trying API Gateway format...")
-            # Fallback to API Gateway format
+        except RetryableError:
+            raise
+        except requests.exceptions.ReadTimeout:
+            return None, f"S3 trigger: no response within {TRIGGER_TIMEOUT_SECONDS}s, Lambda may still be running"
+        except requests.exceptions.RequestException as e:
+            if not _never_connected(e):
+                # The event may have reached the Lambda; the other format could dispatch it twice
+                return None, f"S3 trigger: outcome unknown ({e}), Lambda may be running it"
+            print(f"⚠️ S3 trigger could not connect ({e}), trying API Gateway format...")
             return self.trigger_reanalysis_api_gateway(video_id, project_id)
     
     def trigger_reanalysis_api_gateway(self, video_id, project_id):
         """Fallback: Trigger reanalysis using API Gateway format."""
-        api_url = "https://3jmprxblzk.execute-api.us-east-1.amazonaws.com/default/TranscribeAudio"
-        
         api_gateway_payload = {
             "video_id": video_id,
             "project_id": project_id,
@@ -290,111 +625,307 @@ class RestVideoChecker:
         }
         
         try:
-            response = requests.post(
-                api_url,
+            response = self.session.post(
+                TRANSCRIBE_AUDIO_URL,
                 json=api_gateway_payload,
                 headers={'Content-Type': 'application/json'},
-                timeout=30
+                timeout=TRIGGER_TIMEOUT_SECONDS
             )
             
             if response.status_code == 200:
-                result = response.json()
-                return True, f"API Gateway: {result.get('message', 'processed successfully')}"
+                return True, f"API Gateway: {_json_message(response)}"
+            elif response.status_code == 504:
+                return None, "API Gateway: gateway timed out, Lambda may still be running"
+            elif response.status_code in RETRYABLE_STATUS_CODES:
+                raise RetryableError(f"API Gateway HTTP {response.status_code}", _retry_after(response))
             else:
                 return False, f"API Gateway failed: HTTP {response.status_code}: {response.text}"
                 
+        except RetryableError:
+            raise
+        except requests.exceptions.ReadTimeout:
+            return None, f"API Gateway: no response within {TRIGGER_TIMEOUT_SECONDS}s, Lambda may still be running"
+        except requests.exceptions.RequestException as e:
+            if _never_connected(e):
+                raise NotDispatchedError(f"API Gateway could not connect: {e}")
+            return None, f"API Gateway: outcome unknown ({e}), Lambda may be running it"
+    
+    def _dispatch_reanalysis(self, video):
+        """Trigger reanalysis for one candidate; used as the dispatcher callback."""
+        video_id = video['id']
+        
+        # The path was resolved in bulk before dispatching
+        file_path = video.get('trigger_file_path')
+        if not file_path:
+            raise NotDispatchedError(f"Could not find file path for video {video_id}")
+        print(f"📄 {video_id}: {file_path}")
+        
+        return self.trigger_reanalysis(video_id, video['project_id'], file_path)
+    
+    def trigger_reanalysis_batch(self, videos):
+        """Trigger reanalysis for several videos with one multi-record S3 event.
+        
+        `videos` are dicts with id and trigger_file_path. Returns one
+        (success, message) per video. When the Lambda reports results per
+        record they are used as-is; otherwise the HTTP outcome applies to the
+        whole batch. Raises NotDispatchedError if it could not connect. Only definite rejections come back as False. A 504, a
+        read timeout or a record the breakdown leaves out may already be
+        running, so they come back as None (unknown) and are not resent.
+        """
+        payload = {"Records": [_s3_record(video['id'], video['trigger_file_path']) for video in videos]}
+        
+        try:
+            print(f"🔄 Sending S3 trigger event with {len(videos)} records")
+            response = self.session.post(
+                TRANSCRIBE_AUDIO_URL,
+                json=payload,
+                headers={'Content-Type': 'application/json'},
+                timeout=TRIGGER_TIMEOUT_SECONDS
+            )
+        except requests.exceptions.RequestException as e:
+            if _never_connected(e):
+                raise NotDispatchedError(f"S3 batch trigger could not connect: {e}")
+            # The event may have been delivered before the error (e.g. a read timeout)
+            return [(None, f"S3 batch trigger: outcome unknown ({e}), Lambda may be running it")] * len(videos)
         except Exception as e:
-            return False, f"API Gateway error: {e}"
+            return [(None, f"S3 batch trigger: outcome unknown ({e}), Lambda may be running it")] * len(videos)
+        
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise RetryableError(f"S3 batch trigger HTTP {response.status_code}", _retry_after(response))
+        if response.status_code == 504:
+            # API Gateway gave up waiting but the Lambda keeps going; resending would double-dispatch
+            return [(None, "S3 batch trigger: gateway timed out, Lambda may still be running")] * len(videos)
+        if response.status_code != 200:
+            return [(False, f"S3 batch trigger HTTP {response.status_code}: {response.text}")] * len(videos)
+        
+        try:
+            result = response.json()
+        except ValueError:
+            result = {}
+        outcomes = _record_outcomes(result)
+        if outcomes is None:
+            message = result.get('message', 'processed successfully') if isinstance(result, dict) else 'processed successfully'
+            return [(True, f"S3 batch trigger: {message}")] * len(videos)
+        
+        return [
+            (success, f"S3 batch trigger: {message}")
+            for success, message in (
+                outcomes.get(video['trigger_file_path'], (None, "no result for this record, outcome unknown"))
+                for video in videos
+            )
+        ]
+    
+    def _dispatch_reanalysis_batch(self, videos):
+        """Trigger reanalysis for a batch of candidates; used as the dispatcher's batch callback."""
+        sendable = [video for video in videos if video.get('trigger_file_path')]
+        outcomes = dict(zip(
+            (video['id'] for video in sendable),
+            self.trigger_reanalysis_batch(sendable) if sendable else []
+        ))
+        return [
+            outcomes.get(video['id'], (False, f"Could not find file path for video {video['id']}"))
+            for video in videos
+        ]
     
-    def reanalyze_videos(self, categories, delay_minutes=2):
-        """Trigger reanalysis for all videos that need attention with delays."""
-        videos_to_reanalyze = []
+    def reanalyze_videos(self, report, concurrency=DEFAULT_CONCURRENCY,
+                         rate_per_minute=DEFAULT_RATE_PER_MINUTE,
+                         journal_path=DEFAULT_JOURNAL_PATH, fresh_run=False,
+                         batch_size=DEFAULT_TRIGGER_BATCH_SIZE):
+        """Trigger reanalysis for all videos that need attention.
         
+        Requests run concurrently (at most `concurrency` in flight) and start
+        at no more than `rate_per_minute`; throttled or 5xx responses are
+        retried with jittered backoff. Each send is journaled to
+        `journal_path`, and an unfinished run is resumed (skipping videos it
+        already sent) unless `fresh_run` is set. With `batch_size` above 1,
+        each request carries up to that many S3 records (capped by the
+        payload limit) and only failed records are resent singly.
+        """
         # Collect all videos that need reanalysis
-        videos_to_reanalyze.extend(categories['no_analysis'])
-        videos_to_reanalyze.extend(categories['pending'])
-        videos_to_reanalyze.extend(categories['incomplete_data'])
+        rows = (
+            report.rows_for(NO_ANALYSIS)
+            + report.rows_for(PENDING)
+            + report.rows_for(INCOMPLETE_DATA)
+        )
         
-        if not videos_to_reanalyze:
+        if not rows:
             print("\n✅ No videos need reanalysis!")
             return
         
+        journal = ReanalysisJournal(journal_path)
+        candidates = [
+            {'id': row.id, 'project_id': row.project_id, 'original_name': row.original_name}
+            for row in rows
+        ]
+        run_id, resumed, videos_to_reanalyze = journal.begin(candidates, fresh=fresh_run)
+        if resumed:
+            print(f"\n📒 Resuming reanalysis run {run_id} from {journal_path}: "
+                  f"{len(candidates) - len(videos_to_reanalyze)} already sent, {len(videos_to_reanalyze)} to go")
+        else:
+            print(f"\n📒 Journaling reanalysis run {run_id} to {journal_path}")
+        
+        if not videos_to_reanalyze:
+            journal.finish_run()
+            print("✅ Every video in this run was already sent")
+            print_run_stats(journal.run_stats())
+            journal.close()
+            return
+        
         total_videos = len(videos_to_reanalyze)
-        delay_seconds = delay_minutes * 60
+        
+        # Resolve every candidate's file path up front instead of two lookups per video
+        print(f"\n📄 Resolving file paths for {total_videos} videos...")
+        paths, path_requests = self.get_video_file_paths([video['id'] for video in videos_to_reanalyze])
+        for video in videos_to_reanalyze:
+            video['trigger_file_path'] = paths.get(video['id'])
+        round_trips_saved = 2 * total_videos - path_requests
+        print(f"📄 Resolved {len(paths)}/{total_videos} paths in {path_requests} request(s)")
+        
+        payload_limit = max_trigger_batch_size(videos_to_reanalyze)
+        if batch_size > payload_limit:
+            print(f"⚠️  Batch size {batch_size} would exceed the payload limit; using {payload_limit}")
+            batch_size = payload_limit
+        total_requests = math.ceil(total_videos / batch_size)
         
         print(f"\n🚀 STARTING REANALYSIS FOR {total_videos} VIDEOS")
-        print(f"⏰ Delay between requests: {delay_minutes} minutes ({delay_seconds} seconds)")
-        print(f"🕐 Estimated total time: {total_videos * delay_minutes:.1f} minutes")
+        print(f"🔀 Concurrency: {concurrency} in flight")
+        print(f"⏰ Rate limit: {rate_per_minute:g} requests/minute")
+        if batch_size > 1:
+            print(f"📦 Batching: up to {batch_size} records per S3 event ({total_requests} requests)")
+        print(f"🕐 Estimated total time: {max(0, total_requests - concurrency) / rate_per_minute:.1f} minutes")
         print("=" * 60)
         
-        successful = 0
-        failed = 0
-        
-        for i, video in enumerate(videos_to_reanalyze, 1):
-            video_id = video['id']
-            project_id = video['project_id']
-            video_name = video['original_name']
-            
-            print(f"\n[{i}/{total_videos}] Processing: {video_name}")
-            print(f"🎯 Video ID: {video_id}")
-            print(f"📁 Project ID: {project_id}")
-            
-            # Get file path first
-            file_path = self.get_video_file_path(video_id)
-            if file_path:
-                print(f"📄 File Path: {file_path}")
-            else:
-                print(f"❌ Could not find file path for video {video_id}")
-                failed += 1
-                continue
-            
-            # Trigger reanalysis
-            success, message = self.trigger_reanalysis(video_id, project_id)
-            
-            if success:
-                print(f"✅ SUCCESS: {message}")
-                successful += 1
-            else:
-                print(f"❌ FAILED: {message}")
-                failed += 1
-            
-            # Wait before next request (except for the last one)
-            if i < total_videos:
-                print(f"⏳ Waiting {delay_minutes} minutes before next request...")
-                
-                # Show countdown
-                for remaining in range(delay_seconds, 0, -30):
-                    mins, secs = divmod(remaining, 60)
-                    print(f"   ⏰ {mins:02d}:{secs:02d} remaining", end='\r')
-                    time.sleep(30)
-                
-                print("   ⏰ 00:00 - Proceeding to next video...")
+        dispatcher = ReanalysisDispatcher(
+            self._dispatch_reanalysis,
+            concurrency=concurrency,
+            rate_per_minute=rate_per_minute,
+            journal=journal,
+            dispatch_batch=self._dispatch_reanalysis_batch,
+            batch_size=batch_size
+        )
+        try:
+            summary = dispatcher.run(videos_to_reanalyze)
+        except KeyboardInterrupt:
+            print(f"📒 Progress saved to {journal_path}; rerun with --reanalyze to resume run {run_id}")
+            print_run_stats(journal.run_stats())
+            journal.close()
+            return
+        closed = journal.finish_run()
         
         # Final summary
         print(f"\n" + "=" * 60)
         print(f"🎉 REANALYSIS BATCH COMPLETED!")
-        print(f"✅ Successful: {successful}")
-        print(f"❌ Failed: {failed}")
-        print(f"📊 Total processed: {total_videos}")
-        print(f"🕐 Total time elapsed: {(total_videos - 1) * delay_minutes:.1f} minutes")
+        print(f"✅ Successful: {summary['successful']}")
+        print(f"❌ Failed: {summary['failed']}")
+        print(f"⏳ Outcome unknown, not resent: {summary['unknown']}")
+        print(f"↻ Retries: {summary['retries']}")
+        print(f"📊 Total processed: {summary['total']}")
+        print(f"📨 Trigger requests: {summary['requests']}")
+        if batch_size > 1:
+            print(f"↪ Resent singly after a batch failure: {summary['fallbacks']}")
+        print(f"📄 Path lookups: {path_requests} bulk request(s), {round_trips_saved} round trips saved")
+        print(f"🕐 Total time elapsed: {summary['elapsed_seconds'] / 60:.1f} minutes ({summary['per_minute']:.1f} videos/minute)")
+        print_run_stats(journal.run_stats())
+        if not closed:
+            print(f"📒 Run {run_id} stays open for the videos that were never sent; rerun with --reanalyze to send them")
+        journal.close()
+    
+    def get_queue_stats(self):
+        """Queue counts and average processing time from the get_queue_stats RPC, or None."""
+        try:
+            response = self.session.post(
+                f"{self.url}/rest/v1/rpc/get_queue_stats",
+                headers=self.headers,
+                json={},
+                timeout=30
+            )
+            if response.status_code == 200 and response.json():
+                return response.json()[0]
+            print(f"⚠️ Could not fetch queue stats: {response.status_code} - {response.text}")
+        except Exception as e:
+            print(f"⚠️ Could not fetch queue stats: {e}")
+        return None
+    
+    def enqueue_videos(self, report):
+        """Queue all videos that need attention for the cron worker in one RPC call.
+        
+        Instead of invoking the Lambda per video, enqueue_video_analysis_bulk
+        moves every candidate to status 'queued' with contiguous queue
+        positions and a reset retry_count; the process-video-queue cron then
+        drains them at MAX_CONCURRENT_PROCESSING. Videos already queued or
+        processing keep their place.
+        """
+        rows = (
+            report.rows_for(NO_ANALYSIS)
+            + report.rows_for(PENDING)
+            + report.rows_for(INCOMPLETE_DATA)
+        )
+        
+        if not rows:
+            print("\n✅ No videos need reanalysis!")
+            return
+        
+        print(f"\n📥 Enqueueing {len(rows)} videos for the cron worker...")
+        try:
+            response = self.session.post(
+                f"{self.url}/rest/v1/rpc/enqueue_video_analysis_bulk",
+                headers=self.headers,
+                json={'p_video_ids': [row.id for row in rows]},
+                timeout=120
+            )
+        except Exception as e:
+            print(f"❌ Error enqueueing videos: {e}")
+            return
+        
+        if response.status_code != 200:
+            print(f"❌ Enqueue failed: {response.status_code} - {response.text}")
+            return
+        
+        results = response.json()
+        enqueued = sorted(
+            (result for result in results if result['enqueued']),
+            key=lambda result: result['queue_position']
+        )
+        already_queued = len(results) - len(enqueued)
+        missing = len(rows) - len(results)
+        
+        print(f"✅ Enqueued: {len(enqueued)}")
+        if enqueued:
+            print(f"🔢 Queue positions: {enqueued[0]['queue_position']}-{enqueued[-1]['queue_position']}")
+        if already_queued:
+            print(f"⏭️  Already queued or processing: {already_queued}")
+        if missing:
+            print(f"⚠️  Not found: {missing}")
+        
+        stats = self.get_queue_stats()
+        if not stats:
+            return
+        
+        queued = stats.get('queued_count') or 0
+        avg_minutes = _interval_minutes(stats.get('avg_processing_time'))
+        drain = projected_drain_minutes(queued, avg_minutes)
+        per_video = f"~{avg_minutes:.1f} min per video" if avg_minutes else "no processing time recorded yet"
+        print(f"\n📊 Queue: {queued} queued, {stats.get('processing_count') or 0} processing")
+        print(f"🕐 Projected drain time: ~{drain:.0f} minutes "
+              f"({DEFAULT_CONCURRENCY} slots every {CRON_INTERVAL_MINUTES} min cron tick, {per_video})")
     
-    def print_results(self, categories, detailed=False, trigger_reanalysis=False):
+    def print_results(self, report, detailed=False, trigger_reanalysis=False, reanalysis_options=None):
         """Print the analysis results."""
-        if not categories:
+        if not report:
             return
             
-        total_videos = sum(len(videos) for videos in categories.values())
-        issues = len(categories['no_analysis']) + len(categories['pending']) + len(categories['failed']) + len(categories['incomplete_data'])
+        counts = report.counts
+        issues = report.issues
         
         print("\n" + "="*80)
         print("📊 VIDEO ANALYSIS STATUS REPORT")
         print("="*80)
-        print(f"📹 Total videos: {total_videos}")
-        print(f"🚫 No analysis: {len(categories['no_analysis'])}")
-        print(f"⏳ Pending/Processing: {len(categories['pending'])}")
-        print(f"❌ Failed: {len(categories['failed'])}")
-        print(f"⚠️  Incomplete data: {len(categories['incomplete_data'])}")
-        print(f"✅ Complete: {len(categories['complete'])}")
+        print(f"📹 Total videos: {report.total}")
+        print(f"🚫 No analysis: {counts[NO_ANALYSIS]}")
+        print(f"⏳ Pending/Processing: {counts[PENDING]}")
+        print(f"❌ Failed: {counts[FAILED]}")
+        print(f"⚠️  Incomplete data: {counts[INCOMPLETE_DATA]}")
+        print(f"✅ Complete: {counts[COMPLETE]}")
         print(f"📊 Total needing attention: {issues}")
         
         # Print reanalyzing statements for videos that need attention
@@ -402,20 +933,14 @@ class RestVideoChecker:
             print(f"\n🔄 VIDEOS TO REANALYZE:")
             print("-" * 40)
             
-            # Videos with no analysis
-            for video in categories['no_analysis']:
-                print(f'reanalyzing video_id: "{video["id"]}"')
-            
-            # Videos with pending/processing analysis
-            for video in categories['pending']:
-                print(f'reanalyzing video_id: "{video["id"]}"')
-            
-            # Videos with incomplete data (only missing llm_response or video_analysis)
-            for video in categories['incomplete_data']:
-                print(f'reanalyzing video_id: "{video["id"]}"')
+            # No analysis, pending/processing, and incomplete data (only missing
+            # llm_response or video_analysis)
+            for category in (NO_ANALYSIS, PENDING, INCOMPLETE_DATA):
+                for row in report.rows_for(category):
+                    print(f'reanalyzing video_id: "{row.id}"')
         
         if detailed and issues > 0:
-            self._print_detailed(categories)
+            self._print_detailed(report)
         elif issues > 0:
             print(f"\n💡 Run with --detailed flag to see detailed information")
         
@@ -425,50 +950,88 @@ class RestVideoChecker:
         # Offer to trigger reanalysis
         if trigger_reanalysis and issues > 0:
             print(f"\n" + "="*60)
-            self.reanalyze_videos(categories)
+            self.reanalyze_videos(report, **(reanalysis_options or {}))
     
-    def _print_detailed(self, categories):
+    def _print_detailed(self, report):
         """Print detailed breakdown."""
-        issue_categories = ['no_analysis', 'pending', 'failed', 'incomplete_data']
+        titles = {
+            NO_ANALYSIS: '🚫 VIDEOS WITHOUT ANALYSIS',
+            PENDING: '⏳ VIDEOS WITH PENDING ANALYSIS',
+            FAILED: '❌ VIDEOS WITH FAILED ANALYSIS',
+            INCOMPLETE_DATA: '⚠️  VIDEOS WITH INCOMPLETE DATA'
+        }
         
-        for category in issue_categories:
-            videos = categories[category]
-            if not videos:
+        for category in ISSUE_CATEGORIES:
+            rows = report.rows_for(category)
+            if not rows:
                 continue
             
-            titles = {
-                'no_analysis': '🚫 VIDEOS WITHOUT ANALYSIS',
-                'pending': '⏳ VIDEOS WITH PENDING ANALYSIS',
-                'failed': '❌ VIDEOS WITH FAILED ANALYSIS',
-                'incomplete_data': '⚠️  VIDEOS WITH INCOMPLETE DATA'
-            }
-            
             title = titles[category]
             print(f"\n{title}")
             print("-" * len(title))
             
-            for video in videos:
-                analysis = video.get('analysis', {})
-                print(f"📹 {video['original_name']}")
-                print(f"   ID: {video['id']}")
-                print(f"   Project: {video['project_id']}")
-                print(f"   File Path: {video['file_path']}")
-                print(f"   Video Status: {video['status']}")
-                print(f"   Created: {video['created_at']}")
+            for row in rows:
+                print(f"📹 {row.original_name}")
+                print(f"   ID: {row.id}")
+                print(f"   Project: {row.project_id}")
+                print(f"   File Path: {row.file_path}")
+                print(f"   Video Status: {row.status}")
+                print(f"   Created: {row.created_at}")
                 
-                if analysis:
-                    print(f"   Analysis Status: {analysis.get('status')}")
-                    print(f"   Has Transcription: {bool(analysis.get('transcription'))}")
-                    print(f"   Has LLM Response: {bool(analysis.get('llm_response'))}")
-                    print(f"   Has Video Analysis: {bool(analysis.get('video_analysis'))}")
+                if row.has_analysis:
+                    print(f"   Analysis Status: {row.analysis_status}")
+                    print(f"   Has Transcription: {row.has_transcription}")
+                    print(f"   Has LLM Response: {row.has_llm_response}")
+                    print(f"   Has Video Analysis: {row.has_video_analysis}")
                 else:
                     print(f"   Analysis: None")
                 print()
 
+
+def _int_option(name, default):
+    """Read a positive integer option like `--page-size 500` from argv."""
+    if name not in sys.argv:
+        return default
+    
+    try:
+        value = int(sys.argv[sys.argv.index(name) + 1])
+    except (IndexError, ValueError):
+        value = 0
+    
+    if value <= 0:
+        print(f"❌ {name} requires a positive integer")
+        sys.exit(1)
+    return value
+
+def _str_option(name, default):
+    """Read a string option like `--snapshot path.json` from argv."""
+    if name not in sys.argv:
+        return default
+    
+    index = sys.argv.index(name) + 1
+    if index >= len(sys.argv):
+        print(f"❌ {name} requires a value")
+        sys.exit(1)
+    return sys.argv[index]
+
 def main():
     """Main function."""
     detailed = '--detailed' in sys.argv or '-d' in sys.argv
     show_help = '--help' in sys.argv or '-h' in sys.argv
+    stream = '--stream' in sys.argv or '-s' in sys.argv
+    presence = '--presence' in sys.argv or '-p' in sys.argv
+    incremental = '--incremental' in sys.argv or '-i' in sys.argv
+    rebuild = '--rebuild' in sys.argv
+    snapshot_path = _str_option('--snapshot', DEFAULT_SNAPSHOT_PATH)
+    page_size = _int_option('--page-size', DEFAULT_PAGE_SIZE)
+    concurrency = _int_option('--concurrency', DEFAULT_CONCURRENCY)
+    rate_per_minute = _int_option('--rate', DEFAULT_RATE_PER_MINUTE)
+    journal_path = _str_option('--journal', DEFAULT_JOURNAL_PATH)
+    fresh_run = '--fresh-run' in sys.argv
+    batch_size = _int_option('--batch-size', DEFAULT_TRIGGER_BATCH_SIZE)
+    enqueue = '--enqueue' in sys.argv
+    # Keep at least one pooled connection per in-flight reanalysis request
+    pool_size = _int_option('--pool-size', max(DEFAULT_POOL_SIZE, concurrency))
     
     if show_help:
         print("Video Analysis Checker (REST API)")
@@ -479,21 +1042,50 @@ def main():
         print("  -h, --help      Show this help message")
         print("  -d, --detailed  Show detailed report")
         print("  -r, --reanalyze Trigger reanalysis for videos that need attention")
+        print("  --enqueue       Queue videos that need attention for the cron worker (instead of --reanalyze)")
+        print("  -s, --stream    Walk both tables with keyset pagination (bounded memory)")
+        print(f"  --page-size N   Rows per page in stream mode (default {DEFAULT_PAGE_SIZE})")
+        print("  -p, --presence  Fetch has_* flags from the presence view instead of JSONB")
+        print("  -i, --incremental Fetch only rows changed since the last run, merged into a local snapshot")
+        print(f"  --snapshot PATH Snapshot file for incremental mode (default {DEFAULT_SNAPSHOT_PATH})")
+        print("  --rebuild       Re-seed the incremental snapshot from a full scan")
+        print(f"  --concurrency N Reanalysis requests in flight (default {DEFAULT_CONCURRENCY})")
+        print(f"  --rate N        Reanalysis requests started per minute (default {DEFAULT_RATE_PER_MINUTE})")
+        print(f"  --pool-size N   Keep-alive connections per host (default {DEFAULT_POOL_SIZE} or --concurrency)")
+        print(f"  --journal PATH  Reanalysis journal for resuming interrupted runs (default {DEFAULT_JOURNAL_PATH})")
+        print("  --fresh-run     Abandon an unfinished reanalysis run and start a new one")
+        print(f"  --batch-size N  S3 records per reanalysis trigger request (default {DEFAULT_TRIGGER_BATCH_SIZE})")
         print()
         print("Environment Variables:")
         print("  SUPABASE_URL              Your Supabase project URL")
         print("  SUPABASE_SERVICE_ROLE_KEY Your service role key")
         return
     
-    checker = RestVideoChecker()
+    checker = RestVideoChecker(pool_size)
     
     print("🔍 Analyzing videos using REST API...")
-    categories = checker.analyze_videos()
+    if incremental or rebuild:
+        report = checker.analyze_incremental(snapshot_path, page_size, presence, rebuild)
+    else:
+        report = checker.analyze_videos(stream=stream, page_size=page_size, presence=presence)
     
-    if categories:
+    if report:
         # Check for --reanalyze flag
         trigger_reanalysis = '--reanalyze' in sys.argv or '-r' in sys.argv
-        checker.print_results(categories, detailed, trigger_reanalysis)
+        reanalysis_options = {
+            'concurrency': concurrency,
+            'rate_per_minute': rate_per_minute,
+            'journal_path': journal_path,
+            'fresh_run': fresh_run,
+            'batch_size': batch_size
+        }
+        # Enqueueing replaces direct Lambda calls
+        checker.print_results(report, detailed, trigger_reanalysis and not enqueue, reanalysis_options)
+        if enqueue and report.issues > 0:
+            print("\n" + "="*60)
+            checker.enqueue_videos(report)
+    
+    print_connection_stats(checker.session)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
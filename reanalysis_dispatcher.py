@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Concurrent reanalysis dispatcher with token-bucket rate limiting.
+
+Used by query_videos_rest_fixed.py to re-drive stuck videos through the
+TranscribeAudio Lambda. A thread pool caps the number of in-flight requests
+(defaults to the MAX_CONCURRENT_PROCESSING = 3 slots the cron route enforces),
+a token bucket caps how fast new requests start, and throttled/5xx responses
+are retried with jittered exponential backoff.
+
+A dispatch_batch function lets one request carry several videos (e.g. a
+multi-record S3 event).
+
+With a ReanalysisJournal attached, every send and outcome is recorded as
+it happens so an interrupted run can be resumed (see reanalysis_journal.py).
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Matches MAX_CONCURRENT_PROCESSING in src/app/api/cron/process-video-queue/route.ts
+DEFAULT_CONCURRENCY = 3
+DEFAULT_RATE_PER_MINUTE = 3
+DEFAULT_MAX_ATTEMPTS = 5
+
+
+class RetryableError(Exception):
+    """Raised by a dispatch function for responses worth retrying (429/5xx)."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NotDispatchedError(Exception):
+    """Raised by a dispatch function when nothing was sent (no connection, no file path).
+
+    The video is journaled as not sent, so resuming the run sends it again.
+    """
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def backoff_delay(attempt, base_delay=2.0, max_delay=60.0):
+    """Full-jitter exponential backoff for the given 1-based attempt number."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+class ReanalysisDispatcher:
+    """Run a dispatch function over many videos with bounded concurrency and rate."""
+
+    def __init__(self, dispatch, concurrency=DEFAULT_CONCURRENCY,
+                 rate_per_minute=DEFAULT_RATE_PER_MINUTE, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 base_delay=2.0, max_delay=60.0, journal=None,
+                 dispatch_batch=None, batch_size=1):
+        """
+        `dispatch(video)` returns a (success, message) tuple, where success is
+        True if the Lambda accepted the video, False if it rejected it (safe
+        to resend) and None if the outcome is unknown, e.g. a gateway timeout
+        after the request went out (never resent). It raises RetryableError
+        for responses worth retrying, and NotDispatchedError if nothing was
+        sent at all.
+
+        With `dispatch_batch(videos)` and a `batch_size` above 1, videos are
+        sent `batch_size` per request. It returns one (success, message) per
+        video, and the videos it rejected are resent one by one through
+        `dispatch`. Concurrency and rate limits count requests, not videos.
+
+        `journal`, if given, is a ReanalysisJournal with a run already begun.
+        """
+        if concurrency < 1 or max_attempts < 1 or batch_size < 1:
+            raise ValueError("concurrency, max_attempts and batch_size must be at least 1")
+
+        self.dispatch = dispatch
+        self.dispatch_batch = dispatch_batch
+        self.batch_size = batch_size if dispatch_batch else 1
+        self.concurrency = concurrency
+        self.rate_per_minute = rate_per_minute
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(rate_per_minute / 60.0, capacity=concurrency)
+        self.journal = journal
+
+        self.lock = threading.Lock()
+        self.retries = 0
+        self.requests = 0
+        self.fallbacks = 0
+
+    def _send_one(self, batch):
+        return [self.dispatch(batch[0])]
+
+    def _run_batch(self, batch):
+        """Dispatch one batch, resend its failures singly, and journal every outcome.
+
+        Returns (success, message, attempts) per video. Recording here rather
+        than in run() means requests that complete while an interrupted run
+        drains are still journaled.
+        """
+        if len(batch) == 1:
+            outcomes, attempts, sent = self._attempt(batch, self._send_one)
+        else:
+            outcomes, attempts, sent = self._attempt(batch, self.dispatch_batch)
+
+        results = []
+        for video, (success, message) in zip(batch, outcomes):
+            video_attempts = attempts
+            video_sent = sent
+            if success is False and len(batch) > 1:
+                with self.lock:
+                    self.fallbacks += 1
+                print(f"   ↪ {video['id']}: {message}; resending on its own")
+                [(success, message)], single_attempts, video_sent = self._attempt([video], self._send_one)
+                video_attempts += single_attempts
+            if self.journal:
+                self.journal.record(video['id'], success, message, sent=video_sent)
+            results.append((success, message, video_attempts))
+        return results
+
+    def _attempt(self, batch, send):
+        """Send one request for `batch`, retrying retryable failures with jittered backoff.
+
+        Returns ([(success, message)] per video, attempts made, whether
+        anything reached the Lambda).
+        """
+        label = batch[0]['id'] if len(batch) == 1 else f"batch of {len(batch)} from {batch[0]['id']}"
+        for attempt in range(1, self.max_attempts + 1):
+            self.bucket.acquire()
+            if self.journal:
+                for video in batch:
+                    self.journal.mark_in_flight(video['id'])
+            with self.lock:
+                self.requests += 1
+            try:
+                outcomes = send(batch)
+                if len(outcomes) != len(batch):
+                    raise ValueError(f"got {len(outcomes)} outcomes for {len(batch)} videos")
+                return outcomes, attempt, True
+            except NotDispatchedError as e:
+                return [(False, f"Not sent: {e}")] * len(batch), attempt, False
+            except RetryableError as e:
+                if attempt == self.max_attempts:
+                    return [(False, f"{e} (gave up after {attempt} attempts)")] * len(batch), attempt, True
+
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                if e.retry_after:
+                    delay = max(delay, e.retry_after)
+
+                with self.lock:
+                    self.retries += 1
+                print(f"   ↻ {label}: {e}, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_attempts})")
+                time.sleep(delay)
+            except Exception as e:
+                return [(False, f"Unexpected error: {e}")] * len(batch), attempt, True
+
+    def run(self, videos):
+        """Dispatch all videos and return a summary dict."""
+        total = len(videos)
+        successful = 0
+        failed = 0
+        unknown = 0
+        done = 0
+        started = time.monotonic()
+        batches = [videos[i:i + self.batch_size] for i in range(0, total, self.batch_size)]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(self._run_batch, batch): batch for batch in batches}
+
+            pending = set(futures)
+            try:
+                while pending:
+                    # Wake up every second: Ctrl-C may be delivered to a worker thread and
+                    # only runs its handler once the main thread is back in Python code
+                    finished, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        for video, (success, message, attempts) in zip(futures[future], future.result()):
+                            done += 1
+
+                            if success:
+                                successful += 1
+                                print(f"[{done}/{total}] ✅ {video['original_name']} ({video['id']}): {message}")
+                            elif success is None:
+                                unknown += 1
+                                print(f"[{done}/{total}] ⏳ {video['original_name']} ({video['id']}): {message}")
+                            else:
+                                failed += 1
+                                print(f"[{done}/{total}] ❌ {video['original_name']} ({video['id']}): {message}")
+            except KeyboardInterrupt:
+                # Without cancel_futures the pool would keep sending every queued video
+                print("\n⏹️  Interrupted: cancelling queued videos, waiting for requests in flight...")
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        elapsed = time.monotonic() - started
+        return {
+            'total': total,
+            'successful': successful,
+            'failed': failed,
+            'unknown': unknown,
+            'retries': self.retries,
+            'requests': self.requests,
+            'fallbacks': self.fallbacks,
+            'elapsed_seconds': elapsed,
+            'per_minute': (total / elapsed * 60) if elapsed > 0 else 0.0
+        }
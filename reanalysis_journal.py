@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Durable SQLite journal for reanalysis runs.
+
+Every reanalysis run records each candidate video as a job with its dispatch
+state, attempt count, last response and timestamps, committed as it changes.
+If a run crashes or is interrupted, the next run resumes it instead of
+starting over: videos that were already sent are skipped and only the ones
+never dispatched go out, so no video triggers Lambda/Gemini twice in a run.
+
+Job states:
+    pending     - not sent yet
+    in_flight   - request sent, no response recorded yet
+    succeeded   - Lambda accepted the trigger
+    failed      - gave up (non-retryable response or out of attempts)
+    not_sent    - never reached the Lambda (no connection, no file path); the
+                  run stays open and resuming it sends these again
+    unknown     - sent, but the outcome is unknown (e.g. gateway timeout); the
+                  Lambda may still be running it, so it is not resent
+    interrupted - was in flight when the previous process died; the request
+                  may have reached the Lambda, so it is not resent
+    skipped     - no longer needed attention when the run was resumed
+
+Used by query_videos_rest_fixed.py via ReanalysisDispatcher. Run directly to
+inspect throughput and failure rates:
+
+    python reanalysis_journal.py [journal_path]
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_JOURNAL_PATH = os.getenv('REANALYSIS_JOURNAL_PATH', './.reanalysis_journal.sqlite')
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+UNKNOWN = 'unknown'
+NOT_SENT = 'not_sent'
+INTERRUPTED = 'interrupted'
+SKIPPED = 'skipped'
+JOB_STATES = [PENDING, IN_FLIGHT, SUCCEEDED, FAILED, UNKNOWN, NOT_SENT, INTERRUPTED, SKIPPED]
+
+# States that mean the video was (or may have been) sent in this run
+SENT_STATES = {IN_FLIGHT, SUCCEEDED, FAILED, UNKNOWN, INTERRUPTED}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL DEFAULT 'open'
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    video_id TEXT NOT NULL,
+    project_id TEXT,
+    original_name TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    response TEXT,
+    dispatched_at TEXT,
+    finished_at TEXT,
+    PRIMARY KEY (run_id, video_id)
+);
+
+CREATE INDEX IF NOT EXISTS jobs_run_state ON jobs (run_id, state);
+"""
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ReanalysisJournal:
+    """One SQLite file holding every reanalysis run; safe to share across dispatcher threads."""
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.run_id = None
+        self.lock = threading.Lock()
+        # Autocommit: each state change is durable as soon as the call returns
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def open_run(self):
+        """ID of the most recent run that never finished, or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT id FROM runs WHERE status = 'open' ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def begin(self, videos, fresh=False):
+        """Start or resume a run for `videos` (dicts with id, project_id, original_name).
+
+        Resumes the open run unless `fresh` is set, in which case it is
+        marked abandoned. Returns (run_id, resumed, videos to dispatch):
+        candidates this run already sent are left out, jobs that were in
+        flight when the last process died become interrupted, and pending or
+        not-sent jobs that are no longer candidates become skipped.
+        """
+        run_id = None if fresh else self.open_run()
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                if fresh:
+                    self.db.execute(
+                        "UPDATE runs SET status = 'abandoned', finished_at = ? WHERE status = 'open'",
+                        (_now(),)
+                    )
+
+                resumed = run_id is not None
+                if resumed:
+                    self.db.execute(
+                        "UPDATE jobs SET state = ? WHERE run_id = ? AND state = ?",
+                        (INTERRUPTED, run_id, IN_FLIGHT)
+                    )
+                    known = dict(self.db.execute(
+                        "SELECT video_id, state FROM jobs WHERE run_id = ?", (run_id,)
+                    ))
+                else:
+                    run_id = self.db.execute(
+                        "INSERT INTO runs (started_at) VALUES (?)", (_now(),)
+                    ).lastrowid
+                    known = {}
+
+                candidate_ids = {video['id'] for video in videos}
+                self.db.executemany(
+                    "UPDATE jobs SET state = ?, finished_at = ? WHERE run_id = ? AND video_id = ?",
+                    [
+                        (SKIPPED, _now(), run_id, video_id)
+                        for video_id, state in known.items()
+                        if state in (PENDING, NOT_SENT) and video_id not in candidate_ids
+                    ]
+                )
+
+                to_dispatch = [video for video in videos if known.get(video['id']) not in SENT_STATES]
+                self.db.executemany(
+                    "INSERT INTO jobs (run_id, video_id, project_id, original_name) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (run_id, video_id) DO UPDATE SET state = excluded.state, finished_at = NULL",
+                    [
+                        (run_id, video['id'], video.get('project_id'), video.get('original_name'))
+                        for video in to_dispatch
+                    ]
+                )
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+
+        self.run_id = run_id
+        return run_id, resumed, to_dispatch
+
+    def mark_in_flight(self, video_id):
+        """Record that a request for this video is about to be sent."""
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, dispatched_at = COALESCE(dispatched_at, ?) "
+                "WHERE run_id = ? AND video_id = ?",
+                (IN_FLIGHT, _now(), self.run_id, video_id)
+            )
+
+    def record(self, video_id, success, message, sent=True):
+        """Record the final outcome of a job; `sent=False` means nothing reached the Lambda."""
+        if not sent:
+            state = NOT_SENT
+        else:
+            state = SUCCEEDED if success else UNKNOWN if success is None else FAILED
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET state = ?, response = ?, finished_at = ? WHERE run_id = ? AND video_id = ?",
+                (state, message, _now(), self.run_id, video_id)
+            )
+
+    def finish_run(self):
+        """Close the current run unless jobs are left to send; returns True if it closed."""
+        with self.lock:
+            remaining = self.db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE run_id = ? AND state IN (?, ?, ?)",
+                (self.run_id, PENDING, IN_FLIGHT, NOT_SENT)
+            ).fetchone()[0]
+            if remaining:
+                return False
+            self.db.execute(
+                "UPDATE runs SET status = 'finished', finished_at = ? WHERE id = ?",
+                (_now(), self.run_id)
+            )
+            return True
+
+    def run_stats(self, run_id=None):
+        """State counts, throughput and failure rate for a run (default: the current one)."""
+        run_id = run_id or self.run_id
+        with self.lock:
+            run = self.db.execute(
+                "SELECT id, started_at, finished_at, status FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
+            if run is None:
+                return None
+            counts = dict(self.db.execute(
+                "SELECT state, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY state", (run_id,)
+            ))
+            first, last, attempts = self.db.execute(
+                "SELECT MIN(dispatched_at), MAX(finished_at), COALESCE(SUM(attempts), 0) "
+                "FROM jobs WHERE run_id = ? AND state IN (?, ?, ?)",
+                (run_id, SUCCEEDED, FAILED, UNKNOWN)
+            ).fetchone()
+
+        counts = {state: counts.get(state, 0) for state in JOB_STATES}
+        done = counts[SUCCEEDED] + counts[FAILED] + counts[UNKNOWN]
+        elapsed = 0.0
+        if first and last:
+            elapsed = (datetime.fromisoformat(last) - datetime.fromisoformat(first)).total_seconds()
+        return {
+            'run_id': run[0],
+            'started_at': run[1],
+            'finished_at': run[2],
+            'status': run[3],
+            'counts': counts,
+            'attempts': attempts,
+            'per_minute': (done / elapsed * 60) if elapsed > 0 else 0.0,
+            'failure_rate': (counts[FAILED] / done) if done else 0.0
+        }
+
+    def run_ids(self):
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT id FROM runs ORDER BY id")]
+
+
+def print_run_stats(stats):
+    """Print one run's summary line and state breakdown."""
+    counts = stats['counts']
+    print(f"🗂️  Run {stats['run_id']} ({stats['status']}), started {stats['started_at']}")
+    print("   " + ", ".join(f"{state}: {counts[state]}" for state in JOB_STATES))
+    print(f"   {stats['attempts']} attempts, {stats['per_minute']:.1f} videos/minute, "
+          f"{stats['failure_rate'] * 100:.1f}% failed")
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_JOURNAL_PATH
+    if not os.path.exists(path):
+        print(f"❌ No reanalysis journal at {path}")
+        sys.exit(1)
+
+    journal = ReanalysisJournal(path)
+    run_ids = journal.run_ids()
+    if not run_ids:
+        print("📭 Journal has no runs yet")
+    for run_id in run_ids:
+        print_run_stats(journal.run_stats(run_id))
+    journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Shared keep-alive HTTP session for the REST tooling.
+
+Module-level requests.get/post open a new TCP + TLS connection for every
+call. get_session() returns one process-wide requests.Session whose
+HTTPAdapter keeps up to `pool_size` idle connections per host (Supabase and
+the API Gateway), so after the first request each call costs a single round
+trip. The pool is thread-safe and sized for the reanalysis dispatcher's
+worker threads.
+
+connection_stats() reports, per host, how many requests were sent and how
+many connections had to be opened to serve them.
+
+Used by query_videos_rest_fixed.py and debug_auth.py.
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_SIZE = int(os.getenv('REST_POOL_SIZE', '10'))
+
+_session = None
+_lock = threading.Lock()
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests and actual connection opens per host."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        self.stats_lock = threading.Lock()
+        self.requests_by_host = {}
+        self.connects_by_host = {}
+        # pool_connections = hosts kept, pool_maxsize = connections kept per host
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def _count(self, counter, host):
+        with self.stats_lock:
+            counter[host] = counter.get(host, 0) + 1
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+
+        # Count every connect(), including reconnects of a pooled connection
+        # the server had closed, so reuse is not overstated
+        class CountingHTTPConnection(HTTPConnection):
+            def connect(self):
+                super().connect()
+                adapter._count(adapter.connects_by_host, self.host)
+
+        class CountingHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                super().connect()
+                adapter._count(adapter.connects_by_host, self.host)
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('CountingHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': CountingHTTPConnection}),
+            'https': type('CountingHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': CountingHTTPSConnection})
+        }
+
+    def send(self, request, **kwargs):
+        self._count(self.requests_by_host, urlsplit(request.url).hostname)
+        return super().send(request, **kwargs)
+
+    def stats(self):
+        with self.stats_lock:
+            return [
+                {
+                    'host': host,
+                    'requests': count,
+                    'connections': self.connects_by_host.get(host, 0),
+                    'reused': max(0, count - self.connects_by_host.get(host, 0))
+                }
+                for host, count in self.requests_by_host.items()
+            ]
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE):
+    """Build a session with `pool_size` pooled keep-alive connections per host."""
+    if pool_size < 1:
+        raise ValueError("pool_size must be at least 1")
+
+    session = requests.Session()
+    adapter = PooledAdapter(pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(pool_size=DEFAULT_POOL_SIZE):
+    """Return the shared session, creating it on first use.
+
+    `pool_size` only applies to the call that creates the session.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session(pool_size)
+        return _session
+
+
+def connection_stats(session=None):
+    """Per-host request and connection counts for a session (default: the shared one)."""
+    session = session or _session
+    if session is None:
+        return []
+
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    return [
+        host
+        for adapter in adapters.values() if isinstance(adapter, PooledAdapter)
+        for host in adapter.stats()
+    ]
+
+
+def print_connection_stats(session=None):
+    """Print connection reuse for each host the session talked to."""
+    stats = connection_stats(session)
+    if not stats:
+        return
+
+    print("\n🔌 Connection reuse:")
+    for host in stats:
+        rate = host['reused'] * 100 / host['requests']
+        print(
+            f"   {host['host']}: {host['requests']} requests over {host['connections']} "
+            f"connection(s), {host['reused']} reused ({rate:.0f}%)"
+        )
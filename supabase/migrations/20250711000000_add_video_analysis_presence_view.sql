@@ -0,0 +1,26 @@
+-- Presence-only projection of video_analysis for the status audit scripts.
+-- The checkers only need to know whether transcription / llm_response /
+-- video_analysis hold data, so the emptiness test runs here and the REST
+-- and supabase-py clients transfer a few booleans per row instead of the
+-- full Gemini JSONB payloads.
+
+CREATE OR REPLACE VIEW video_analysis_presence
+WITH (security_invoker = true) AS
+SELECT
+  va.id,
+  va.video_id,
+  va.project_id,
+  va.status,
+  va.created_at,
+  va.updated_at,
+  (va.transcription IS NOT NULL
+    AND va.transcription NOT IN ('null'::jsonb, '{}'::jsonb, '[]'::jsonb, '""'::jsonb, '"null"'::jsonb)) as has_transcription,
+  (va.llm_response IS NOT NULL
+    AND va.llm_response NOT IN ('null'::jsonb, '{}'::jsonb, '[]'::jsonb, '""'::jsonb, '"null"'::jsonb)) as has_llm_response,
+  (va.video_analysis IS NOT NULL
+    AND va.video_analysis NOT IN ('null'::jsonb, '{}'::jsonb, '[]'::jsonb, '""'::jsonb, '"null"'::jsonb)) as has_video_analysis
+FROM video_analysis va;
+
+COMMENT ON VIEW video_analysis_presence IS 'video_analysis status with has_* flags instead of JSONB payloads, used by the audit scripts';
+
+GRANT SELECT ON video_analysis_presence TO authenticated, service_role;
@@ -0,0 +1,45 @@
+-- Aggregate status report for the video audit scripts.
+-- Returns one row per category (no_analysis, pending, failed,
+-- incomplete_data, complete) instead of shipping every video row to the
+-- client just to count it. The category expression mirrors
+-- video_categories.classify(); which data fields a 'completed' analysis
+-- must have is chosen by the p_require_* arguments (defaults match
+-- query_incomplete_videos.py: transcription and llm_response).
+-- Callable via psycopg2 or POST /rest/v1/rpc/get_video_analysis_category_counts.
+
+CREATE OR REPLACE FUNCTION get_video_analysis_category_counts(
+    p_require_transcription BOOLEAN DEFAULT true,
+    p_require_llm_response BOOLEAN DEFAULT true,
+    p_require_video_analysis BOOLEAN DEFAULT false
+)
+RETURNS TABLE (
+    category TEXT,
+    video_count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        CASE
+            WHEN p.id IS NULL THEN 'no_analysis'
+            WHEN p.status IN ('pending', 'processing') THEN 'pending'
+            WHEN p.status = 'failed' THEN 'failed'
+            WHEN p.status = 'completed' THEN
+                CASE
+                    WHEN (p_require_transcription AND NOT p.has_transcription)
+                      OR (p_require_llm_response AND NOT p.has_llm_response)
+                      OR (p_require_video_analysis AND NOT p.has_video_analysis)
+                    THEN 'incomplete_data'
+                    ELSE 'complete'
+                END
+            ELSE 'incomplete_data'
+        END as category,
+        COUNT(*) as video_count
+    FROM videos v
+    LEFT JOIN video_analysis_presence p ON p.video_id = v.id
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION get_video_analysis_category_counts(BOOLEAN, BOOLEAN, BOOLEAN) IS 'Per-category video counts for the analysis audit scripts';
+
+GRANT EXECUTE ON FUNCTION get_video_analysis_category_counts(BOOLEAN, BOOLEAN, BOOLEAN) TO authenticated, service_role;
@@ -0,0 +1,49 @@
+-- Only the videos that need attention, for the audit scripts.
+-- Videos without any video_analysis row come from a NOT EXISTS anti-join
+-- over the video_id foreign key (idx_video_analysis_video_id), and analyses
+-- are narrowed to those not completed or missing a payload, so a healthy
+-- library returns no rows and the cost tracks the number of problems rather
+-- than the number of videos. Callers narrow further to the fields their
+-- rules require, e.g. query_incomplete_videos_simple.py --server-side.
+
+CREATE OR REPLACE VIEW videos_needing_analysis
+WITH (security_invoker = true) AS
+SELECT
+  v.id,
+  v.project_id,
+  v.file_name,
+  v.original_name,
+  v.file_path,
+  v.status,
+  v.created_at,
+  NULL::uuid as analysis_id,
+  NULL::text as analysis_status,
+  false as has_transcription,
+  false as has_llm_response,
+  false as has_video_analysis
+FROM videos v
+WHERE NOT EXISTS (
+  SELECT 1 FROM video_analysis va WHERE va.video_id = v.id
+)
+UNION ALL
+SELECT
+  v.id,
+  v.project_id,
+  v.file_name,
+  v.original_name,
+  v.file_path,
+  v.status,
+  v.created_at,
+  p.id as analysis_id,
+  p.status as analysis_status,
+  p.has_transcription,
+  p.has_llm_response,
+  p.has_video_analysis
+FROM video_analysis_presence p
+JOIN videos v ON v.id = p.video_id
+WHERE p.status IS DISTINCT FROM 'completed'
+   OR NOT (p.has_transcription AND p.has_llm_response AND p.has_video_analysis);
+
+COMMENT ON VIEW videos_needing_analysis IS 'Videos with no analysis or an analysis that is not completed with every payload, used by the audit scripts';
+
+GRANT SELECT ON videos_needing_analysis TO authenticated, service_role;
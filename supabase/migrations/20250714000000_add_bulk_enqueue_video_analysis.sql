@@ -0,0 +1,87 @@
+-- Bulk reanalysis through the existing queue (20250703000000_add_video_queue_system.sql).
+-- Moves every requested video to status 'queued' in one statement, with
+-- contiguous queue_positions after the current tail (in the order given),
+-- retry_count reset and the previous run's error/timestamps cleared, so the
+-- process-video-queue cron drains them at MAX_CONCURRENT_PROCESSING instead
+-- of the audit scripts invoking the Lambda directly. Videos without an
+-- analysis row get one. Videos already queued or processing are left where
+-- they are and reported with enqueued = false, so re-running is harmless.
+-- Callable via POST /rest/v1/rpc/enqueue_video_analysis_bulk.
+
+CREATE OR REPLACE FUNCTION enqueue_video_analysis_bulk(p_video_ids UUID[])
+RETURNS TABLE (
+    video_id UUID,
+    analysis_id UUID,
+    queue_position INTEGER,
+    enqueued BOOLEAN
+) AS $$
+#variable_conflict use_column
+DECLARE
+    base_position INTEGER;
+BEGIN
+    -- Serialize bulk enqueues so two runs cannot hand out the same positions
+    PERFORM pg_advisory_xact_lock(hashtext('enqueue_video_analysis_bulk'));
+
+    base_position := get_next_queue_position() - 1;
+
+    RETURN QUERY
+    WITH requested AS (
+        SELECT DISTINCT ON (r.video_id) r.video_id, r.ordinality
+        FROM unnest(p_video_ids) WITH ORDINALITY AS r(video_id, ordinality)
+        ORDER BY r.video_id, r.ordinality
+    ),
+    latest AS (
+        -- The most recent analysis row per video is the one the queue works on
+        SELECT DISTINCT ON (va.video_id) va.id, va.video_id, va.status, va.queue_position
+        FROM video_analysis va
+        JOIN requested r ON r.video_id = va.video_id
+        ORDER BY va.video_id, va.created_at DESC
+    ),
+    eligible AS (
+        SELECT
+            r.video_id,
+            l.id as analysis_id,
+            v.project_id,
+            p.user_id,
+            (base_position + ROW_NUMBER() OVER (ORDER BY r.ordinality))::INTEGER as position
+        FROM requested r
+        JOIN videos v ON v.id = r.video_id
+        JOIN projects p ON p.id = v.project_id
+        LEFT JOIN latest l ON l.video_id = r.video_id
+        WHERE l.id IS NULL OR l.status NOT IN ('queued', 'processing')
+    ),
+    updated AS (
+        UPDATE video_analysis va
+        SET
+            status = 'queued',
+            queue_position = e.position,
+            queued_at = NOW(),
+            retry_count = 0,
+            error_message = NULL,
+            processing_started_at = NULL,
+            processing_completed_at = NULL
+        FROM eligible e
+        WHERE va.id = e.analysis_id
+        RETURNING va.video_id, va.id, va.queue_position
+    ),
+    inserted AS (
+        INSERT INTO video_analysis (video_id, project_id, user_id, status, queue_position, queued_at, retry_count, max_retries)
+        SELECT e.video_id, e.project_id, e.user_id, 'queued', e.position, NOW(), 0, 3
+        FROM eligible e
+        WHERE e.analysis_id IS NULL
+        RETURNING video_analysis.video_id, video_analysis.id, video_analysis.queue_position
+    )
+    SELECT u.video_id, u.id, u.queue_position, true FROM updated u
+    UNION ALL
+    SELECT i.video_id, i.id, i.queue_position, true FROM inserted i
+    UNION ALL
+    SELECT l.video_id, l.id, l.queue_position, false FROM latest l
+    WHERE l.status IN ('queued', 'processing');
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION enqueue_video_analysis_bulk(UUID[]) IS 'Queue many videos for analysis at once with contiguous queue positions, used by the audit scripts';
+
+-- Admin-only: it can queue any user's videos
+REVOKE EXECUTE ON FUNCTION enqueue_video_analysis_bulk(UUID[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION enqueue_video_analysis_bulk(UUID[]) TO service_role;
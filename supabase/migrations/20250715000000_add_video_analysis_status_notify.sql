@@ -0,0 +1,63 @@
+-- Change feed for `query_incomplete_videos.py --watch`.
+-- Fires NOTIFY video_analysis_status with {"video_id": ...} whenever a
+-- change can move a video between audit categories: an analysis row is
+-- inserted or deleted, or its status, video_id or transcription /
+-- llm_response / video_analysis payload changes, or a video is added or
+-- removed. Frequent progress_message / updated_at writes do not fire.
+-- The watcher re-reads just the notified videos, so payloads stay tiny and
+-- Postgres collapses duplicate notifications within one transaction.
+
+CREATE OR REPLACE FUNCTION notify_video_analysis_status_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM pg_notify('video_analysis_status', json_build_object('video_id', NEW.video_id)::text);
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.video_id IS DISTINCT FROM NEW.video_id) THEN
+        PERFORM pg_notify('video_analysis_status', json_build_object('video_id', OLD.video_id)::text);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_video_status_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('video_analysis_status', json_build_object('video_id', OLD.id)::text);
+    ELSE
+        PERFORM pg_notify('video_analysis_status', json_build_object('video_id', NEW.id)::text);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_notify_video_analysis_insert_delete ON video_analysis;
+CREATE TRIGGER trigger_notify_video_analysis_insert_delete
+AFTER INSERT OR DELETE ON video_analysis
+FOR EACH ROW
+EXECUTE FUNCTION notify_video_analysis_status_change();
+
+DROP TRIGGER IF EXISTS trigger_notify_video_analysis_status ON video_analysis;
+CREATE TRIGGER trigger_notify_video_analysis_status
+AFTER UPDATE OF status, video_id, transcription, llm_response, video_analysis ON video_analysis
+FOR EACH ROW
+WHEN (
+    OLD.status IS DISTINCT FROM NEW.status
+    OR OLD.video_id IS DISTINCT FROM NEW.video_id
+    OR OLD.transcription IS DISTINCT FROM NEW.transcription
+    OR OLD.llm_response IS DISTINCT FROM NEW.llm_response
+    OR OLD.video_analysis IS DISTINCT FROM NEW.video_analysis
+)
+EXECUTE FUNCTION notify_video_analysis_status_change();
+
+DROP TRIGGER IF EXISTS trigger_notify_video_insert_delete ON videos;
+CREATE TRIGGER trigger_notify_video_insert_delete
+AFTER INSERT OR DELETE ON videos
+FOR EACH ROW
+EXECUTE FUNCTION notify_video_status_change();
+
+COMMENT ON FUNCTION notify_video_analysis_status_change() IS 'NOTIFY video_analysis_status for audit watchers when an analysis row changes category-relevant fields';
+COMMENT ON FUNCTION notify_video_status_change() IS 'NOTIFY video_analysis_status for audit watchers when a video is added or removed';
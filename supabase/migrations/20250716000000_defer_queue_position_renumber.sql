@@ -0,0 +1,54 @@
+-- Take queue renumbering out of video_queue_worker.py's claim path.
+-- update_queue_positions() decrements every queued row behind a row that
+-- leaves the queue, so concurrent claims lock overlapping sets of rows in
+-- different orders and serialize or deadlock. A transaction that sets
+-- video_queue.defer_renumber = 'on' now skips that step, and
+-- compact_queue_positions() renumbers the queued rows 1..n in one statement,
+-- which the worker runs every few seconds. Other writers (the
+-- process-video-queue cron) renumber as before.
+
+CREATE OR REPLACE FUNCTION update_queue_positions()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- When a video moves from queued to processing or completed, update queue positions
+    IF OLD.status = 'queued' AND NEW.status IN ('processing', 'completed', 'failed')
+       AND current_setting('video_queue.defer_renumber', true) IS DISTINCT FROM 'on' THEN
+        UPDATE video_analysis
+        SET queue_position = queue_position - 1
+        WHERE status = 'queued'
+        AND queue_position > OLD.queue_position;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION compact_queue_positions()
+RETURNS INTEGER AS $$
+DECLARE
+    renumbered INTEGER;
+BEGIN
+    -- One compaction at a time; a caller that finds one running has nothing to do
+    IF NOT pg_try_advisory_xact_lock(hashtext('compact_queue_positions')) THEN
+        RETURN 0;
+    END IF;
+
+    UPDATE video_analysis va
+    SET queue_position = ranked.position
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY queue_position NULLS LAST, queued_at)::INTEGER AS position
+        FROM video_analysis
+        WHERE status = 'queued'
+    ) ranked
+    WHERE va.id = ranked.id
+      AND va.status = 'queued'
+      AND va.queue_position IS DISTINCT FROM ranked.position;
+
+    GET DIAGNOSTICS renumbered = ROW_COUNT;
+    RETURN renumbered;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION compact_queue_positions() IS 'Renumber queued video_analysis rows 1..n in queue order, for claims that deferred update_queue_positions()';
+
+GRANT EXECUTE ON FUNCTION compact_queue_positions() TO service_role;
@@ -1,33 +1,60 @@
 import google.generativeai as genai
+import random
+import sys
 import time
 
+from gemini_cache import AnalysisCache, analysis_key, hash_file
+
+VIDEO_PATH = "./test.MOV"
+MODEL = "gemini-2.0-flash-exp"
+PROMPT = "Analyze this video and provide: 1) Scene descriptions with timestamps, 2) Key visual elements and transitions, 3) Suggested cuts for editing, 4) Overall content summary. Focus on identifying the most engaging moments."
+
+# Repeated runs on unchanged footage return the cached response without uploading
+cache = AnalysisCache()
+cache_key = analysis_key(hash_file(VIDEO_PATH), PROMPT, MODEL)
+cached = cache.get(cache_key)
+if cached is not None:
+    print("\nAnalysis Result (cached):")
+    print(cached)
+    cache.print_report()
+    sys.exit(0)
+
 # Configure API key
 genai.configure(api_key="YOUR_API_KEY_HERE")
 
 # Upload video file
 print("Uploading video...")
-video_file = genai.upload_file(path="./test.MOV")
+video_file = genai.upload_file(path=VIDEO_PATH)
 
 # Wait for processing
 print(f"Uploaded file: {video_file.uri}")
 print("Waiting for processing...")
 
+# Exponential backoff with jitter instead of a fixed 10 s interval, bounded by a deadline
+delay = 1.0
+deadline = time.monotonic() + 30 * 60
 while video_file.state.name == "PROCESSING":
-    time.sleep(10)
+    if time.monotonic() >= deadline:
+        raise TimeoutError(f"Video still processing after 30 minutes: {video_file.name}")
+    time.sleep(min(delay * random.uniform(0.5, 1.0), max(0.0, deadline - time.monotonic())))
+    delay = min(delay * 2, 20.0)
     video_file = genai.get_file(video_file.name)
 
 if video_file.state.name == "FAILED":
     raise ValueError(f"Video processing failed: {video_file.state.name}")
 
 # Create the model
-model = genai.GenerativeModel(model_name="gemini-2.0-flash-exp")
+model = genai.GenerativeModel(model_name=MODEL)
 
 # Make the request
 print("Analyzing video...")
 response = model.generate_content([
     video_file,
-    "Analyze this video and provide: 1) Scene descriptions with timestamps, 2) Key visual elements and transitions, 3) Suggested cuts for editing, 4) Overall content summary. Focus on identifying the most engaging moments."
+    PROMPT
 ])
 
+cache.put(cache_key, response.text, model=MODEL)
+
 print("\nAnalysis Result:")
-print(response.text)
\ No newline at end of file
+print(response.text)
+cache.print_report()
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Resuming a reanalysis run re-sends exactly the videos that never reached the Lambda."""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import query_videos_rest_fixed
+from reanalysis_dispatcher import ReanalysisDispatcher
+from reanalysis_journal import NOT_SENT, SUCCEEDED, ReanalysisJournal
+
+
+class FakeLambda(ThreadingHTTPServer):
+    """Accepts every trigger and remembers the S3 keys it received."""
+
+    def __init__(self):
+        self.keys = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(handler):
+                body = json.loads(handler.rfile.read(int(handler.headers['Content-Length'])))
+                self.keys.extend(record['s3']['object']['key'] for record in body.get('Records', []))
+                reply = json.dumps({'message': 'ok'}).encode()
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'application/json')
+                handler.send_header('Content-Length', str(len(reply)))
+                handler.end_headers()
+                handler.wfile.write(reply)
+
+        super().__init__(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/default/TranscribeAudio"
+
+
+def closed_port_url():
+    """A local URL nothing listens on, so connecting is refused."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/"
+
+
+class UnreachableFor(requests.Session):
+    """Session whose triggers for the given file paths cannot connect."""
+
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = set(paths)
+        self.closed_url = closed_port_url()
+
+    def post(self, url, json=None, **kwargs):
+        records = (json or {}).get('Records', [])
+        if any(record['s3']['object']['key'] in self.paths for record in records) or (
+                json and json.get('video_id') in {path.rsplit('/', 1)[-1] for path in self.paths}):
+            url = self.closed_url
+        return super().post(url, json=json, **kwargs)
+
+
+@pytest.fixture
+def fake_lambda(monkeypatch):
+    server = FakeLambda()
+    monkeypatch.setattr(query_videos_rest_fixed, 'TRANSCRIBE_AUDIO_URL', server.url)
+    yield server
+    server.shutdown()
+
+
+def make_checker(session):
+    checker = query_videos_rest_fixed.RestVideoChecker.__new__(query_videos_rest_fixed.RestVideoChecker)
+    checker.session = session
+    return checker
+
+
+def candidates():
+    return [{'id': video_id, 'project_id': 'p', 'original_name': f"{video_id}.mov"} for video_id in 'abc']
+
+
+def dispatch(journal, checker, batch_size=1):
+    run_id, resumed, videos = journal.begin(candidates())
+    for video in videos:
+        video['trigger_file_path'] = f"uploads/{video['id']}"
+    ReanalysisDispatcher(
+        checker._dispatch_reanalysis,
+        rate_per_minute=60000,
+        journal=journal,
+        dispatch_batch=checker._dispatch_reanalysis_batch,
+        batch_size=batch_size
+    ).run(videos)
+    return resumed, [video['id'] for video in videos]
+
+
+def job_states(journal):
+    return dict(journal.db.execute("SELECT video_id, state FROM jobs WHERE run_id = ?", (journal.run_id,)))
+
+
+@pytest.mark.parametrize('batch_size', [1, 3])
+def test_connect_failure_is_resent_on_resume(tmp_path, fake_lambda, batch_size):
+    path = str(tmp_path / 'journal.sqlite')
+
+    journal = ReanalysisJournal(path)
+    dispatch(journal, make_checker(UnreachableFor({'uploads/b'})), batch_size)
+    assert job_states(journal) == {'a': SUCCEEDED, 'b': NOT_SENT, 'c': SUCCEEDED}
+    assert not journal.finish_run()
+    journal.close()
+
+    # A new process resumes the open run and sends only the video that never went out
+    journal = ReanalysisJournal(path)
+    resumed, sent = dispatch(journal, make_checker(requests.Session()), batch_size)
+    assert resumed and sent == ['b']
+    assert job_states(journal) == {'a': SUCCEEDED, 'b': SUCCEEDED, 'c': SUCCEEDED}
+    assert journal.finish_run()
+    journal.close()
+
+    assert sorted(fake_lambda.keys) == ['uploads/a', 'uploads/b', 'uploads/c']
+
+
+def test_missing_file_path_is_not_sent(tmp_path, fake_lambda):
+    journal = ReanalysisJournal(str(tmp_path / 'journal.sqlite'))
+    journal.begin(candidates()[:1])
+    ReanalysisDispatcher(make_checker(requests.Session())._dispatch_reanalysis, journal=journal).run(
+        [{'id': 'a', 'project_id': 'p', 'original_name': 'a.mov'}]
+    )
+    assert job_states(journal) == {'a': NOT_SENT}
+    assert fake_lambda.keys == []
+    journal.close()
@@ -0,0 +1,51 @@
+"""The server-side filter of query_incomplete_videos_simple.py against the PostgREST stand-in."""
+
+import pytest
+
+from benchmarks.checker_load import STANDIN_KEY
+from benchmarks.postgrest_standin import VirtualTable, start_standin
+from query_incomplete_videos_simple import NEEDING_ANALYSIS_VIEW, SimpleVideoChecker
+from video_categories import TRANSCRIPT_RULES, CategoryReport, INCOMPLETE_DATA
+
+
+def view_row(video_id, analysis_id=None, status=None, **present):
+    return {
+        'id': video_id, 'project_id': 'p', 'file_name': f"{video_id}.mp4", 'original_name': f"{video_id}.mov",
+        'file_path': f"uploads/{video_id}.mp4", 'status': 'uploaded', 'created_at': '2025-07-01T00:00:00+00:00',
+        'analysis_id': analysis_id, 'analysis_status': status,
+        'has_transcription': present.get('transcription', analysis_id is not None),
+        'has_llm_response': present.get('llm_response', analysis_id is not None),
+        'has_video_analysis': present.get('video_analysis', analysis_id is not None)
+    }
+
+
+class ViewDataset:
+    def __init__(self, rows):
+        self.tables = {NEEDING_ANALYSIS_VIEW: VirtualTable(len(rows), rows.__getitem__, {})}
+
+
+@pytest.fixture
+def checker(monkeypatch):
+    rows = [
+        view_row('v-none'),
+        view_row('v-null-status', 'a-null-status', None),
+        view_row('v-failed', 'a-failed', 'failed'),
+        view_row('v-no-transcript', 'a-no-transcript', 'completed', transcription=False),
+        # Only the non-required video_analysis is missing, so not an issue under TRANSCRIPT_RULES
+        view_row('v-no-video', 'a-no-video', 'completed', video_analysis=False),
+    ]
+    server = start_standin(ViewDataset(rows))
+    monkeypatch.setenv('SUPABASE_URL', server.url)
+    monkeypatch.setenv('SUPABASE_SERVICE_ROLE_KEY', STANDIN_KEY)
+    yield SimpleVideoChecker()
+    server.shutdown()
+
+
+def test_null_status_is_reported(checker):
+    rows = checker.get_videos_needing_attention(TRANSCRIPT_RULES)
+    assert [row.id for row in rows] == ['v-none', 'v-null-status', 'v-failed', 'v-no-transcript']
+
+    report = CategoryReport(TRANSCRIPT_RULES)
+    for row in rows:
+        report.add(row)
+    assert [row.id for row in report.rows[INCOMPLETE_DATA]] == ['v-null-status', 'v-no-transcript']
@@ -1,21 +1,225 @@
 import requests
 import os
+import sys
 import json
+import mimetypes
+import mmap
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from gemini_cache import AnalysisCache, FileRegistry, analysis_key, hash_file
 
 API_KEY = "YOUR_API_KEY_HERE"
 VIDEO_PATH = "./test.MOV"
 
-def upload_large_video(file_path):
-    file_size = os.path.getsize(file_path)
-    print(f"Uploading video: {file_path} ({file_size / (1024**3):.2f} GB)")
+# Usage:
+#   python upload-large-video.py [video_path]
+#   python upload-large-video.py --batch <directory|manifest.txt> [--output DIR]
+#       [--upload-workers N] [--poll-workers N] [--analyze-workers N]
+#   --no-cache skips the local analysis cache (see gemini_cache.py)
+#   --no-reuse always uploads instead of reusing a live files/... handle
+
+API_BASE = "https://generativelanguage.googleapis.com"
+MODEL = "gemini-2.0-flash-exp"
+ANALYSIS_PROMPT = "Analyze this video and provide: 1) Scene descriptions with timestamps, 2) Key visual elements and transitions, 3) Suggested cuts for editing, 4) Overall content summary. Focus on identifying the most engaging moments."
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "maxOutputTokens": 8192
+}
+UPLOAD_ENDPOINT = f"{API_BASE}/upload/v1beta/files"
+CHUNK_GRANULARITY = 256 * 1024  # the protocol requires non-final chunks to be multiples of this
+INITIAL_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = CHUNK_GRANULARITY
+MAX_CHUNK_SIZE = 512 * 1024 * 1024
+CHUNK_STEP = 8 * 1024 * 1024  # additive increase per fast chunk
+TARGET_CHUNK_SECONDS = 10  # chunks faster than this grow, much slower ones shrink
+
+# Batch mode: per-stage concurrency (upload bandwidth, processing polls, generateContent quota)
+VIDEO_EXTENSIONS = {'.mov', '.mp4', '.m4v', '.webm', '.avi', '.mkv', '.mpeg', '.mpg'}
+DEFAULT_UPLOAD_WORKERS = 2
+DEFAULT_POLL_WORKERS = 8
+DEFAULT_ANALYZE_WORKERS = 4
+DEFAULT_OUTPUT_DIR = "./gemini_results"
+# generateContent on a long video can take minutes; past this the request
+# fails instead of holding its analyze slot for the rest of the batch
+ANALYZE_TIMEOUT = 10 * 60
+
+# Processing polls: per-file exponential backoff with jitter, bounded by a deadline
+POLL_INITIAL_DELAY = 1.0
+POLL_MAX_DELAY = 20.0
+PROCESSING_TIMEOUT = 30 * 60
+LIST_BATCH_THRESHOLD = 3  # check this many due files with one files.list call
+LIST_MAX_PAGES = 10
+MAX_RETRIES = 8  # consecutive failures tolerated before giving up
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+class UploadError(Exception):
+    """Raised when the resumable upload cannot make progress."""
+
+class ChunkSizer:
+    """AIMD chunk sizing from measured per-chunk throughput and RTT.
+    
+    Chunks that finish well inside TARGET_CHUNK_SECONDS grow by CHUNK_STEP
+    (additive increase); failures and chunks that take more than twice the
+    target halve the size (multiplicative decrease). The size never drops
+    below what keeps the per-request RTT under ~10% of transfer time on the
+    measured link, and is always a multiple of CHUNK_GRANULARITY.
+    """
+    
+    def __init__(self, size=INITIAL_CHUNK_SIZE):
+        self.size = self._clamp(size)
+        self.rtt = None
+        self.throughput = None  # bytes per second, from the last successful chunk
+    
+    @staticmethod
+    def _clamp(size):
+        size -= size % CHUNK_GRANULARITY
+        return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, size))
     
-    # Step 1: Initialize resumable upload
+    def observe_rtt(self, seconds):
+        """Record the round trip of a small control request (start/query)."""
+        self.rtt = seconds if self.rtt is None else min(self.rtt, seconds)
+    
+    def on_success(self, length, seconds):
+        """Adjust after a chunk of `length` bytes was committed in `seconds`."""
+        transfer = max(seconds - (self.rtt or 0), 1e-3)
+        self.throughput = length / transfer
+        
+        if length < self.size:
+            # Final short chunk says nothing about the link
+            return
+        if seconds < TARGET_CHUNK_SECONDS:
+            size = self.size + CHUNK_STEP
+        elif seconds > 2 * TARGET_CHUNK_SECONDS:
+            size = self.size // 2
+        else:
+            size = self.size
+        
+        if self.rtt:
+            size = max(size, int(self.throughput * self.rtt * 10))
+        self.size = self._clamp(size)
+    
+    def on_failure(self):
+        """Halve the chunk size so the next attempt fails (or succeeds) cheaply."""
+        self.size = self._clamp(self.size // 2)
+
+class ChunkWindow:
+    """Read-only file-like view of one chunk of a file, backed by mmap.
+    
+    read() hands out memoryview slices of the mapping, so the chunk goes to the
+    socket without being copied into a Python bytes object. Pages that have
+    already been handed out are dropped from this process with MADV_DONTNEED,
+    so RSS stays flat regardless of chunk or file size.
+    """
+    
+    def __init__(self, f, offset, length):
+        # mmap offsets must be aligned to the allocation granularity
+        aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+        self.delta = offset - aligned
+        self.length = length
+        self.pos = 0
+        self.released = 0
+        self.block = None
+        self.mm = mmap.mmap(f.fileno(), length + self.delta, offset=aligned, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+    
+    def __len__(self):
+        return self.length
+    
+    def tell(self):
+        return self.pos
+    
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self.pos
+        elif whence == 2:
+            pos += self.length
+        self.pos = max(0, min(pos, self.length))
+        return self.pos
+    
+    def read(self, size=-1):
+        # Everything before pos was handed out earlier and has been written by now
+        self._drop_sent_pages()
+        
+        if size is None or size < 0:
+            size = self.length - self.pos
+        start = self.delta + self.pos
+        end = min(self.length, self.pos + size)
+        self.block = self.view[start:self.delta + end]
+        self.pos = end
+        return self.block
+    
+    def _drop_sent_pages(self):
+        if not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        done = self.delta + self.pos
+        done -= done % mmap.PAGESIZE
+        if done > self.released:
+            self.mm.madvise(mmap.MADV_DONTNEED, self.released, done - self.released)
+            self.released = done
+    
+    def close(self):
+        if self.block is not None:
+            self.block.release()
+        self.view.release()
+        self.mm.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def state_path_for(file_path):
+    """Local file recording an in-progress upload so a killed process can resume."""
+    return file_path + ".upload-state.json"
+
+def load_upload_state(file_path):
+    """Return the saved upload state if it still matches the file on disk."""
+    try:
+        with open(state_path_for(file_path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    stat = os.stat(file_path)
+    if state.get('file_size') != stat.st_size or state.get('mtime') != stat.st_mtime:
+        print("Saved upload state does not match the file, starting over")
+        return None
+    return state
+
+def save_upload_state(file_path, state):
+    """Persist upload state atomically (write to a temp file, then rename)."""
+    path = state_path_for(file_path)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+def clear_upload_state(file_path):
+    """Forget a finished upload."""
+    try:
+        os.remove(state_path_for(file_path))
+    except FileNotFoundError:
+        pass
+
+def backoff(attempt):
+    """Exponential backoff with jitter, capped at one minute."""
+    time.sleep(min(60, 2 ** attempt) * random.uniform(0.5, 1.0))
+
+def video_mime_type(file_path):
+    """Guess the video MIME type from the extension, defaulting to QuickTime."""
+    mime_type, _ = mimetypes.guess_type(file_path)
+    return mime_type if mime_type and mime_type.startswith('video/') else "video/quicktime"
+
+def start_upload(file_path, file_size):
+    """Open a resumable upload session and return its upload URL."""
     headers = {
         "X-Goog-Upload-Protocol": "resumable",
         "X-Goog-Upload-Command": "start",
         "X-Goog-Upload-Header-Content-Length": str(file_size),
-        "X-Goog-Upload-Header-Content-Type": "video/quicktime",
+        "X-Goog-Upload-Header-Content-Type": video_mime_type(file_path),
         "Content-Type": "application/json"
     }
     
@@ -26,60 +230,288 @@ def upload_large_video(file_path):
     }
     
     response = requests.post(
-        f"https://generativelanguage.googleapis.com/upload/v1beta/files?key={API_KEY}",
+        f"{UPLOAD_ENDPOINT}?key={API_KEY}",
         headers=headers,
-        json=data
+        json=data,
+        timeout=60
     )
+    response.raise_for_status()
     
     upload_url = response.headers.get("X-Goog-Upload-URL")
+    if not upload_url:
+        raise UploadError(f"No upload URL in response: {response.status_code} {response.text[:500]}")
+    return upload_url
+
+def query_upload_offset(upload_url):
+    """Ask the server how many bytes it has committed.
+    
+    Returns (status, offset, response) where status is 'active' or 'final'.
+    """
+    response = requests.post(
+        upload_url,
+        headers={"X-Goog-Upload-Command": "query"},
+        timeout=60
+    )
+    response.raise_for_status()
+    
+    status = response.headers.get("X-Goog-Upload-Status", "active")
+    offset = int(response.headers.get("X-Goog-Upload-Size-Received", 0))
+    return status, offset, response
+
+def upload_large_video(file_path):
+    """Upload a file with the resumable protocol, surviving dropped connections.
+    
+    After any failure the server's committed offset is queried and only the
+    missing range is re-sent. Progress is saved next to the video so that a
+    killed process resumes the same session on the next run.
+    """
+    file_size = os.path.getsize(file_path)
+    print(f"Uploading video: {file_path} ({file_size / (1024**3):.2f} GB)")
+    
+    # Step 1: Resume a saved session, or initialize a new resumable upload
+    state = load_upload_state(file_path)
+    uploaded = 0
+    sizer = ChunkSizer()
+    
+    if state:
+        upload_url = state['upload_url']
+        try:
+            status, uploaded, response = query_upload_offset(upload_url)
+        except requests.RequestException as e:
+            print(f"Saved upload session is no longer usable ({e}), starting over")
+            state = None
+        else:
+            sizer.observe_rtt(response.elapsed.total_seconds())
+            if status == 'final':
+                clear_upload_state(file_path)
+                print("Upload already finalized by a previous run")
+                return response.json()
+            print(f"Resuming upload at {uploaded / (1024**2):.1f} MB")
+    
+    if not state:
+        started = time.monotonic()
+        upload_url = start_upload(file_path, file_size)
+        sizer.observe_rtt(time.monotonic() - started)
+        stat = os.stat(file_path)
+        state = {'upload_url': upload_url, 'file_size': file_size, 'mtime': stat.st_mtime}
+        save_upload_state(file_path, state)
+    
     print(f"Got upload URL: {upload_url}")
     
     # Step 2: Upload the file in chunks
-    chunk_size = 64 * 1024 * 1024  # 32MB chunks
+    session_start = time.monotonic()
+    session_offset = uploaded
+    failures = 0
+    finalized = False
     
     with open(file_path, 'rb') as f:
-        uploaded = 0
-        while uploaded < file_size:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            
-            end = min(uploaded + len(chunk), file_size)
+        # Loops until finalize succeeds, even if every byte was committed before a crash
+        while not finalized:
+            length = min(sizer.size, file_size - uploaded)
+            end = uploaded + length
             
             headers = {
-                "Content-Length": str(len(chunk)),
+                "Content-Length": str(length),
                 "X-Goog-Upload-Command": "upload" if end < file_size else "upload, finalize",
                 "X-Goog-Upload-Offset": str(uploaded)
             }
             
-            response = requests.post(upload_url, headers=headers, data=chunk)
+            chunk_start = time.monotonic()
+            try:
+                if length:
+                    with ChunkWindow(f, uploaded, length) as chunk:
+                        response = requests.post(upload_url, headers=headers, data=chunk, timeout=300)
+                else:
+                    response = requests.post(upload_url, headers=headers, data=b'', timeout=300)
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    raise UploadError(f"HTTP {response.status_code}")
+                response.raise_for_status()
+            except (requests.RequestException, UploadError) as e:
+                if isinstance(e, requests.HTTPError):
+                    # 4xx other than timeouts/throttling will not fix itself
+                    raise
+                
+                failures += 1
+                if failures > MAX_RETRIES:
+                    raise UploadError(f"Giving up after {MAX_RETRIES} retries: {e}")
+                
+                sizer.on_failure()
+                print(f"Chunk at {uploaded / (1024**2):.1f} MB failed ({e}), retry {failures}/{MAX_RETRIES}, next chunk {sizer.size / (1024**2):.2f} MB")
+                backoff(failures)
+                
+                # Only re-send what the server has not committed
+                try:
+                    status, uploaded, response = query_upload_offset(upload_url)
+                except requests.RequestException as query_error:
+                    print(f"Offset query failed ({query_error}), retrying the same range")
+                    continue
+                sizer.observe_rtt(response.elapsed.total_seconds())
+                
+                if status == 'final':
+                    finalized = True
+                    break
+                print(f"Server has {uploaded / (1024**2):.1f} MB, resuming from there")
+                state['offset'] = uploaded
+                save_upload_state(file_path, state)
+                continue
+            
+            chunk_seconds = time.monotonic() - chunk_start
+            failures = 0
+            finalized = end >= file_size
             uploaded = end
+            state['offset'] = uploaded
+            save_upload_state(file_path, state)
             
-            print(f"Uploaded {uploaded / (1024**2):.1f} MB / {file_size / (1024**2):.1f} MB ({uploaded * 100 / file_size:.1f}%)")
+            sizer.on_success(length, chunk_seconds)
+            elapsed = time.monotonic() - session_start
+            rate = (uploaded - session_offset) / (1024**2) / elapsed if elapsed > 0 else 0.0
+            print(
+                f"Uploaded {uploaded / (1024**2):.1f} MB / {file_size / (1024**2):.1f} MB ({uploaded * 100 / file_size:.1f}%) at {rate:.1f} MB/s"
+                f" | chunk {length / (1024**2):.2f} MB in {chunk_seconds:.2f}s, next {sizer.size / (1024**2):.2f} MB"
+            )
+    
+    elapsed = time.monotonic() - session_start
+    if elapsed > 0:
+        print(f"Sustained throughput: {(uploaded - session_offset) / (1024**2) / elapsed:.1f} MB/s over {elapsed:.1f}s")
+    
+    clear_upload_state(file_path)
     
     # Get the file info
     file_info = response.json()
     return file_info
 
-def wait_for_file_processing(file_name):
-    """Wait for the file to be processed"""
-    while True:
-        response = requests.get(
-            f"https://generativelanguage.googleapis.com/v1beta/{file_name}?key={API_KEY}"
-        )
-        file_info = response.json()
+class ProcessingError(Exception):
+    """Raised when Gemini reports a file as FAILED."""
+
+class FileStatePoller:
+    """One background poller for every file waiting on Gemini processing.
+    
+    Each waiting file gets its own backoff schedule (starting at
+    POLL_INITIAL_DELAY, doubling with jitter up to POLL_MAX_DELAY) and a
+    deadline. When several files are due at once their states come from a
+    single files.list call instead of one GET each. Callers block on an event
+    that is set as soon as their file turns ACTIVE or FAILED.
+    """
+    
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.thread = None
+    
+    def wait(self, file_name, timeout=PROCESSING_TIMEOUT):
+        """Block until file_name is ACTIVE and return its file info."""
+        with self.cond:
+            entry = self.pending.get(file_name)
+            if entry is None:
+                now = time.monotonic()
+                entry = {
+                    'event': threading.Event(),
+                    'deadline': now + timeout,
+                    'delay': POLL_INITIAL_DELAY,
+                    'next_check': now,
+                    'state': None,
+                    'result': None,
+                    'error': None
+                }
+                self.pending[file_name] = entry
+            
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="gemini-file-poller", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+        
+        entry['event'].wait()
+        if entry['error']:
+            raise entry['error']
+        return entry['result']
+    
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                
+                now = time.monotonic()
+                due = [name for name, entry in self.pending.items() if entry['next_check'] <= now]
+                if not due:
+                    self.cond.wait(min(entry['next_check'] for entry in self.pending.values()) - now)
+                    continue
+            
+            states = self._fetch_states(due)
+            
+            with self.cond:
+                now = time.monotonic()
+                for name in due:
+                    entry = self.pending[name]
+                    info = states.get(name)
+                    state = info.get('state', 'PROCESSING') if info else None
+                    
+                    if state and state != entry['state']:
+                        print(f"File {name} state: {state}")
+                        entry['state'] = state
+                    
+                    if state == 'ACTIVE':
+                        entry['result'] = info
+                    elif state == 'FAILED':
+                        entry['error'] = ProcessingError(f"File processing failed: {info}")
+                    elif now >= entry['deadline']:
+                        entry['error'] = TimeoutError(f"File {name} still {state or 'unknown'} at deadline")
+                    else:
+                        delay = entry['delay'] * random.uniform(0.5, 1.0)
+                        entry['next_check'] = min(now + delay, entry['deadline'])
+                        entry['delay'] = min(POLL_MAX_DELAY, entry['delay'] * 2)
+                        continue
+                    
+                    del self.pending[name]
+                    entry['event'].set()
+    
+    def _fetch_states(self, names):
+        """Return {name: file_info} for as many of names as could be fetched."""
+        states = {}
         
-        state = file_info.get('state', 'PROCESSING')
-        print(f"File state: {state}")
+        if len(names) >= LIST_BATCH_THRESHOLD:
+            wanted = set(names)
+            page_token = None
+            for _ in range(LIST_MAX_PAGES):
+                params = {'key': API_KEY, 'pageSize': 100}
+                if page_token:
+                    params['pageToken'] = page_token
+                try:
+                    response = requests.get(f"{API_BASE}/v1beta/files", params=params, timeout=30)
+                    response.raise_for_status()
+                    listing = response.json()
+                except (requests.RequestException, ValueError) as e:
+                    print(f"files.list failed ({e}), checking files individually")
+                    break
+                
+                for info in listing.get('files', []):
+                    if info.get('name') in wanted:
+                        states[info['name']] = info
+                
+                page_token = listing.get('nextPageToken')
+                if not page_token or wanted <= states.keys():
+                    break
         
-        if state == 'ACTIVE':
-            return file_info
-        elif state == 'FAILED':
-            raise Exception(f"File processing failed: {file_info}")
+        # Anything the listing did not cover gets an individual GET
+        for name in names:
+            if name in states:
+                continue
+            try:
+                response = requests.get(f"{API_BASE}/v1beta/{name}?key={API_KEY}", timeout=30)
+                response.raise_for_status()
+                states[name] = response.json()
+            except (requests.RequestException, ValueError) as e:
+                print(f"State check for {name} failed ({e}), will retry")
         
-        time.sleep(5)
+        return states
 
-def analyze_video(file_uri):
+_poller = FileStatePoller()
+
+def wait_for_file_processing(file_name, timeout=PROCESSING_TIMEOUT):
+    """Wait for the file to be processed"""
+    return _poller.wait(file_name, timeout)
+
+def analyze_video(file_uri, mime_type="video/quicktime"):
     """Analyze the video using Gemini"""
     headers = {
         "Content-Type": "application/json"
@@ -90,57 +522,268 @@ def analyze_video(file_uri):
             {
                 "parts": [
                     {
-                        "text": "Analyze this video and provide: 1) Scene descriptions with timestamps, 2) Key visual elements and transitions, 3) Suggested cuts for editing, 4) Overall content summary. Focus on identifying the most engaging moments."
+                        "text": ANALYSIS_PROMPT
                     },
                     {
                         "fileData": {
-                            "mimeType": "video/quicktime",
+                            "mimeType": mime_type,
                             "fileUri": file_uri
                         }
                     }
                 ]
             }
         ],
-        "generationConfig": {
-            "temperature": 0.7,
-            "maxOutputTokens": 8192
-        }
+        "generationConfig": GENERATION_CONFIG
     }
     
     response = requests.post(
-        f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={API_KEY}",
+        f"{API_BASE}/v1beta/models/{MODEL}:generateContent?key={API_KEY}",
         headers=headers,
-        json=data
+        json=data,
+        timeout=ANALYZE_TIMEOUT
     )
     
     return response.json()
 
-# Main execution
-print("Starting upload...")
-file_info = upload_large_video(VIDEO_PATH)
-print(f"\nUpload complete! Response: {json.dumps(file_info, indent=2)}")
-
-# Extract the file name from the response
-if 'file' in file_info:
-    file_name = file_info['file']['name']
-    print(f"File name: {file_name}")
-else:
-    print("Unexpected response format. Full response:")
-    print(json.dumps(file_info, indent=2))
-    exit(1)
-
-print("\nWaiting for processing...")
-file_info = wait_for_file_processing(file_name)
-print(f"File ready! URI: {file_info['uri']}")
-
-print("\nAnalyzing video...")
-result = analyze_video(file_info['uri'])
-
-# Print the analysis
-if 'candidates' in result:
+def cached_analysis(cache, file_hash):
+    """Look a video up in the analysis cache; returns (key, result or None)."""
+    key = analysis_key(file_hash, ANALYSIS_PROMPT, MODEL, GENERATION_CONFIG)
+    cached = cache.get(key)
+    return key, (json.loads(cached) if cached is not None else None)
+
+def store_analysis(cache, key, result, file_hash=''):
+    """Cache a successful analysis response."""
+    if 'candidates' in result:
+        cache.put(key, json.dumps(result), file_hash=file_hash, model=MODEL)
+
+def upload_or_reuse(file_path, registry=None, file_hash=None):
+    """Return upload info ({'file': {...}}), reusing a live Gemini handle if one exists.
+    
+    A registered handle is verified with a single GET; only ACTIVE or still
+    PROCESSING files are reused, anything else is forgotten and re-uploaded.
+    """
+    if registry and file_hash:
+        handle = registry.lookup(file_hash)
+        if handle:
+            try:
+                response = requests.get(f"{API_BASE}/v1beta/{handle['name']}?key={API_KEY}", timeout=30)
+                info = response.json() if response.status_code == 200 else {}
+            except (requests.RequestException, ValueError) as e:
+                print(f"Could not verify {handle['name']} ({e}), uploading again")
+                info = {}
+            
+            if info.get('state') in ('ACTIVE', 'PROCESSING'):
+                registry.mark_reused()
+                hours_left = (handle['expires_at'] - time.time()) / 3600
+                print(f"Reusing uploaded file {handle['name']} for {file_path} (expires in {hours_left:.1f}h)")
+                return {'file': info}
+            registry.forget(file_hash)
+    
+    upload_info = upload_large_video(file_path)
+    if registry and file_hash and 'file' in upload_info:
+        registry.record(file_hash, upload_info['file'])
+    return upload_info
+
+def collect_videos(source):
+    """List videos from a directory, or from a manifest file with one path per line."""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name)
+            for name in os.listdir(source)
+            if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS
+        )
+    
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        lines = [line.strip() for line in f]
+    return [
+        line if os.path.isabs(line) else os.path.join(base, line)
+        for line in lines
+        if line and not line.startswith('#')
+    ]
+
+def run_batch(paths, output_dir=DEFAULT_OUTPUT_DIR, upload_workers=DEFAULT_UPLOAD_WORKERS,
+              poll_workers=DEFAULT_POLL_WORKERS, analyze_workers=DEFAULT_ANALYZE_WORKERS, cache=None,
+              registry=None):
+    """Pipeline upload -> processing wait -> analysis across many videos.
+    
+    Every file moves through the three stages independently; each stage has
+    its own concurrency limit, so one file can be analyzed while others are
+    still uploading or processing. Results are written to output_dir as
+    <video name>.json. Videos found in `cache` skip all three stages, and
+    videos with a live handle in `registry` skip the upload.
+    """
+    if min(upload_workers, poll_workers, analyze_workers) < 1:
+        raise ValueError("every stage needs at least 1 worker")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    stage_limits = {
+        'upload': threading.BoundedSemaphore(upload_workers),
+        'poll': threading.BoundedSemaphore(poll_workers),
+        'analyze': threading.BoundedSemaphore(analyze_workers)
+    }
+    
+    def process(path):
+        timings = {}
+        output_path = os.path.join(output_dir, os.path.basename(path) + ".json")
+        
+        key = None
+        file_hash = None
+        if cache or registry:
+            started = time.monotonic()
+            file_hash = hash_file(path)
+            timings['hash'] = time.monotonic() - started
+        
+        if cache:
+            key, result = cached_analysis(cache, file_hash)
+            if result is not None:
+                with open(output_path, 'w') as f:
+                    json.dump(result, f, indent=2)
+                timings['cached'] = 0.0
+                return output_path, timings
+        
+        started = time.monotonic()
+        with stage_limits['upload']:
+            upload_info = upload_or_reuse(path, registry, file_hash)
+        timings['upload'] = time.monotonic() - started
+        if 'file' not in upload_info:
+            raise UploadError(f"Unexpected upload response: {upload_info}")
+        
+        started = time.monotonic()
+        with stage_limits['poll']:
+            file_info = wait_for_file_processing(upload_info['file']['name'])
+        timings['processing'] = time.monotonic() - started
+        
+        started = time.monotonic()
+        with stage_limits['analyze']:
+            result = analyze_video(file_info['uri'], file_info.get('mimeType', video_mime_type(path)))
+        timings['analysis'] = time.monotonic() - started
+        
+        if cache:
+            store_analysis(cache, key, result, file_hash)
+        
+        with open(output_path, 'w') as f:
+            json.dump(result, f, indent=2)
+        
+        if 'candidates' not in result:
+            raise UploadError(f"Error in analysis: {json.dumps(result)[:500]}")
+        return output_path, timings
+    
+    total = len(paths)
+    succeeded = 0
+    failed = 0
+    batch_start = time.monotonic()
+    
+    # Enough threads for every stage to be fully busy at once
+    with ThreadPoolExecutor(max_workers=upload_workers + poll_workers + analyze_workers) as pool:
+        futures = {pool.submit(process, path): path for path in paths}
+        
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                output_path, timings = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{total}] FAILED {path}: {e}")
+                continue
+            
+            succeeded += 1
+            stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in timings.items())
+            print(f"[{done}/{total}] {path} -> {output_path} ({stages})")
+    
+    elapsed = time.monotonic() - batch_start
     print("\n" + "="*50)
-    print("ANALYSIS RESULT:")
-    print("="*50)
-    print(result['candidates'][0]['content']['parts'][0]['text'])
-else:
-    print("Error in analysis:", result)
\ No newline at end of file
+    print(f"Batch complete: {succeeded} analyzed, {failed} failed, {total} total in {elapsed:.1f}s")
+    if cache:
+        cache.print_report()
+    if registry:
+        print(f"Uploads skipped by reusing Gemini files: {registry.reused}")
+    return succeeded, failed
+
+def _int_option(name, default):
+    """Read a positive integer option like `--upload-workers 4` from argv."""
+    if name not in sys.argv:
+        return default
+    
+    try:
+        value = int(sys.argv[sys.argv.index(name) + 1])
+    except (IndexError, ValueError):
+        value = 0
+    
+    if value <= 0:
+        print(f"❌ {name} requires a positive integer")
+        sys.exit(1)
+    return value
+
+def print_analysis(result):
+    """Print the analysis text, or the error response."""
+    if 'candidates' in result:
+        print("\n" + "="*50)
+        print("ANALYSIS RESULT:")
+        print("="*50)
+        print(result['candidates'][0]['content']['parts'][0]['text'])
+    else:
+        print("Error in analysis:", result)
+
+def main():
+    cache = None if '--no-cache' in sys.argv else AnalysisCache()
+    registry = None if '--no-reuse' in sys.argv else FileRegistry()
+    
+    if '--batch' in sys.argv:
+        source = sys.argv[sys.argv.index('--batch') + 1]
+        output_dir = sys.argv[sys.argv.index('--output') + 1] if '--output' in sys.argv else DEFAULT_OUTPUT_DIR
+        
+        paths = collect_videos(source)
+        print(f"Batch analyzing {len(paths)} videos from {source}")
+        _, failed = run_batch(
+            paths,
+            output_dir=output_dir,
+            upload_workers=_int_option('--upload-workers', DEFAULT_UPLOAD_WORKERS),
+            poll_workers=_int_option('--poll-workers', DEFAULT_POLL_WORKERS),
+            analyze_workers=_int_option('--analyze-workers', DEFAULT_ANALYZE_WORKERS),
+            cache=cache,
+            registry=registry
+        )
+        sys.exit(1 if failed else 0)
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    video_path = args[0] if args else VIDEO_PATH
+    
+    file_hash = hash_file(video_path) if cache or registry else None
+    
+    if cache:
+        key, result = cached_analysis(cache, file_hash)
+        if result is not None:
+            print("Cache hit: same video, prompt and model were analyzed before")
+            print_analysis(result)
+            cache.print_report()
+            return
+    
+    print("Starting upload...")
+    file_info = upload_or_reuse(video_path, registry, file_hash)
+    print(f"\nUpload complete! Response: {json.dumps(file_info, indent=2)}")
+
+    # Extract the file name from the response
+    if 'file' in file_info:
+        file_name = file_info['file']['name']
+        print(f"File name: {file_name}")
+    else:
+        print("Unexpected response format. Full response:")
+        print(json.dumps(file_info, indent=2))
+        sys.exit(1)
+
+    print("\nWaiting for processing...")
+    file_info = wait_for_file_processing(file_name)
+    print(f"File ready! URI: {file_info['uri']}")
+
+    print("\nAnalyzing video...")
+    result = analyze_video(file_info['uri'], file_info.get('mimeType', video_mime_type(video_path)))
+    if cache:
+        store_analysis(cache, key, result, file_hash)
+        cache.print_report()
+
+    # Print the analysis
+    print_analysis(result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Single-pass categorization engine shared by the video analysis status checkers.
+
+query_incomplete_videos.py, query_incomplete_videos_fixed.py,
+query_incomplete_videos_simple.py and query_videos_rest_fixed.py all sort
+videos into the same five buckets. They differ only in which data fields a
+'completed' analysis must have, which is expressed here as a CategoryRules
+value rather than four hand-written loops.
+
+Rows are kept as slotted VideoRow objects (a handful of scalars, no JSONB
+payloads, no per-row dict copies), and only for the categories the caller
+asks for; everything else is just counted.
+"""
+
+NO_ANALYSIS = 'no_analysis'
+PENDING = 'pending'
+FAILED = 'failed'
+INCOMPLETE_DATA = 'incomplete_data'
+COMPLETE = 'complete'
+
+CATEGORIES = (NO_ANALYSIS, PENDING, FAILED, INCOMPLETE_DATA, COMPLETE)
+ISSUE_CATEGORIES = (NO_ANALYSIS, PENDING, FAILED, INCOMPLETE_DATA)
+
+
+# Presence-only projection of video_analysis (see the video_analysis_presence view migration)
+PRESENCE_VIEW = 'video_analysis_presence'
+PRESENCE_SELECT = 'id,video_id,status,has_transcription,has_llm_response,has_video_analysis'
+
+
+def from_presence(record):
+    """Map a presence view row onto the analysis record shape (flags as values)."""
+    return {
+        'id': record.get('id'),
+        'video_id': record['video_id'],
+        'status': record.get('status'),
+        'updated_at': record.get('updated_at'),
+        'transcription': bool(record.get('has_transcription')),
+        'llm_response': bool(record.get('has_llm_response')),
+        'video_analysis': bool(record.get('has_video_analysis'))
+    }
+
+
+def has_data(value):
+    """Return True if a JSONB column (or presence flag) holds something other than null/{}."""
+    return bool(value) and value != {} and value != 'null'
+
+
+class CategoryRules:
+    """Which analysis statuses count as pending/failed and which fields 'completed' requires."""
+
+    __slots__ = ('pending_statuses', 'failed_statuses', 'required_fields')
+
+    def __init__(self, required_fields, pending_statuses=('pending', 'processing'), failed_statuses=('failed',)):
+        self.required_fields = tuple(required_fields)
+        self.pending_statuses = frozenset(pending_statuses)
+        self.failed_statuses = frozenset(failed_statuses)
+
+
+# Used by the psycopg2, fixed and simple checkers
+TRANSCRIPT_RULES = CategoryRules(required_fields=('transcription', 'llm_response'))
+# Used by the REST checker: a missing transcription is fine there
+LLM_RULES = CategoryRules(required_fields=('llm_response', 'video_analysis'))
+
+
+class VideoRow:
+    """Compact per-video record: the fields the reports print, plus presence flags."""
+
+    __slots__ = (
+        'id', 'project_id', 'original_name', 'file_path', 'status', 'created_at',
+        'has_analysis', 'analysis_id', 'analysis_status',
+        'has_transcription', 'has_llm_response', 'has_video_analysis'
+    )
+
+    def __init__(self, id, project_id, original_name, file_path, status, created_at,
+                 has_analysis=False, analysis_id=None, analysis_status=None,
+                 has_transcription=False, has_llm_response=False, has_video_analysis=False):
+        self.id = id
+        self.project_id = project_id
+        self.original_name = original_name
+        self.file_path = file_path
+        self.status = status
+        self.created_at = created_at
+        self.has_analysis = has_analysis
+        self.analysis_id = analysis_id
+        self.analysis_status = analysis_status
+        self.has_transcription = has_transcription
+        self.has_llm_response = has_llm_response
+        self.has_video_analysis = has_video_analysis
+
+    @classmethod
+    def from_records(cls, video, analysis=None):
+        """Build from a videos row dict and an optional video_analysis row dict.
+
+        Analysis values may be raw JSONB or presence booleans; either way only
+        the presence flags are kept.
+        """
+        if analysis is None:
+            return cls(
+                video['id'], video.get('project_id'), video.get('original_name'),
+                video.get('file_path'), video.get('status'), video.get('created_at')
+            )
+        return cls(
+            video['id'], video.get('project_id'), video.get('original_name'),
+            video.get('file_path'), video.get('status'), video.get('created_at'),
+            has_analysis=True,
+            analysis_id=analysis.get('id'),
+            analysis_status=analysis.get('status', 'unknown'),
+            has_transcription=has_data(analysis.get('transcription')),
+            has_llm_response=has_data(analysis.get('llm_response')),
+            has_video_analysis=has_data(analysis.get('video_analysis'))
+        )
+
+    def as_dict(self):
+        """Plain dict of all fields (JSON-serializable if the inputs were)."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def classify(row, rules):
+    """Return the category name for one row under the given rules."""
+    if not row.has_analysis:
+        return NO_ANALYSIS
+
+    status = row.analysis_status
+    if status in rules.pending_statuses:
+        return PENDING
+    if status in rules.failed_statuses:
+        return FAILED
+    if status == 'completed':
+        for field in rules.required_fields:
+            if not getattr(row, 'has_' + field):
+                return INCOMPLETE_DATA
+        return COMPLETE
+    # Unknown status
+    return INCOMPLETE_DATA
+
+
+class CategoryReport:
+    """Per-category counts, plus the rows of the categories that were kept."""
+
+    __slots__ = ('rules', 'counts', 'rows', 'kept')
+
+    def __init__(self, rules, keep=ISSUE_CATEGORIES):
+        self.rules = rules
+        self.counts = dict.fromkeys(CATEGORIES, 0)
+        self.kept = frozenset(keep)
+        self.rows = {category: [] for category in CATEGORIES if category in self.kept}
+
+    @classmethod
+    def from_counts(cls, rules, counts):
+        """Build a counts-only report (e.g. from a server-side aggregate)."""
+        report = cls(rules, keep=())
+        for category, count in counts.items():
+            report.counts[category] += count
+        return report
+
+    def add(self, row):
+        """Classify and record one row; returns its category."""
+        category = classify(row, self.rules)
+        self.counts[category] += 1
+        if category in self.kept:
+            self.rows[category].append(row)
+        return category
+
+    def consume(self, rows):
+        """Classify every row from an iterable (list or stream) in one pass."""
+        for row in rows:
+            self.add(row)
+        return self
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def issues(self):
+        return sum(self.counts[category] for category in ISSUE_CATEGORIES)
+
+    def rows_for(self, category):
+        """Rows kept for a category (empty if that category was only counted)."""
+        return self.rows.get(category, [])
+
+
+def categorize(rows, rules, keep=ISSUE_CATEGORIES):
+    """Convenience wrapper: build a CategoryReport from an iterable of rows."""
+    return CategoryReport(rules, keep).consume(rows)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Long-running worker that drains the video_analysis queue.
+
+The Vercel cron (src/app/api/cron/process-video-queue/route.ts) wakes once a
+minute, counts 'processing' rows and fetches `limit(slotsAvailable)` queued
+rows without locking them, so throughput is capped at one batch per tick and
+two overlapping ticks can dispatch the same row. This worker keeps `slots`
+jobs in flight continuously instead:
+
+- Each slot claims one row in a short transaction with
+  `SELECT ... FOR UPDATE SKIP LOCKED` and flips it to 'processing' before
+  committing, so any number of slots and replicas never claim the same row.
+- Claims skip the queue-position trigger, whose renumbering of every later
+  queued row would make concurrent claims serialize or deadlock; instead
+  the worker renumbers the queue every few seconds with
+  compact_queue_positions() (20250716000000_defer_queue_position_renumber.sql).
+- The Lambda is then called outside the transaction with the same payload
+  the cron sends; as with the cron, the Lambda marks the row completed.
+- A call that was rejected (4xx/5xx) or never connected requeues the row at
+  the tail with retry_count + 1, or marks it 'failed' once retry_count
+  reaches the row's max_retries.
+- A 504, read timeout or connection dropped after sending is left
+  'processing': the Lambda may be running the job, and requeueing would
+  double-dispatch.
+
+Every replica adds `slots` to the total concurrency. Disable the cron while
+workers run, since its unlocked select can still pick rows a worker claimed.
+
+Usage:
+    python video_queue_worker.py [--slots N] [--poll SECONDS] [--drain]
+
+Environment Variables:
+    DATABASE_URL  Postgres connection string (as for query_incomplete_videos.py)
+"""
+
+import asyncio
+import os
+import random
+import signal
+import sys
+import time
+
+try:
+    import psycopg2
+    import psycopg2.errors
+except ImportError:
+    print("Error: psycopg2 not installed. Install with: pip install psycopg2-binary")
+    sys.exit(1)
+
+import httpx
+
+# Matches MAX_CONCURRENT_PROCESSING in src/app/api/cron/process-video-queue/route.ts
+DEFAULT_SLOTS = 3
+DEFAULT_POLL_SECONDS = 5.0
+# How stale the queue positions shown in UploadQueueStatus may get; every
+# compaction briefly locks the whole queue, so claims skip it meanwhile
+COMPACT_SECONDS = 5.0
+LAMBDA_URL = "https://3jmprxblzk.execute-api.us-east-1.amazonaws.com/default/TranscribeAudio"
+LAMBDA_TIMEOUT_SECONDS = 60.0
+
+# Leave renumbering the rows behind the claimed one to compact_queue_positions()
+DEFER_RENUMBER_SQL = "SET LOCAL video_queue.defer_renumber = 'on'"
+
+# Claim the head of the queue; rows another transaction holds are skipped, not waited on
+CLAIM_SQL = """
+UPDATE video_analysis va
+SET
+    status = 'processing',
+    processing_started_at = NOW(),
+    processing_completed_at = NULL
+FROM (
+    SELECT id
+    FROM video_analysis
+    WHERE status = 'queued'
+      AND NOT COALESCE(is_converting, false)
+    ORDER BY queue_position NULLS LAST, queued_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+) next_job
+WHERE va.id = next_job.id
+RETURNING va.id, va.video_id, va.project_id, va.retry_count, va.max_retries
+"""
+
+# SKIP LOCKED also skips rows a compaction (or the cron's trigger) holds, so an
+# empty claim only means an empty queue if nothing claimable is left at all
+QUEUED_SQL = """
+SELECT EXISTS (
+    SELECT 1 FROM video_analysis
+    WHERE status = 'queued' AND NOT COALESCE(is_converting, false)
+)
+"""
+
+COMPACT_SQL = "SELECT compact_queue_positions()"
+
+STORYBOARD_SQL = "SELECT text_content FROM storyboard_content WHERE project_id = %s LIMIT 1"
+
+REQUEUE_SQL = """
+UPDATE video_analysis
+SET
+    status = 'queued',
+    queue_position = get_next_queue_position(),
+    retry_count = %s,
+    error_message = %s
+WHERE id = %s AND status = 'processing'
+"""
+
+FAIL_SQL = """
+UPDATE video_analysis
+SET
+    status = 'failed',
+    retry_count = %s,
+    error_message = %s,
+    processing_completed_at = NOW()
+WHERE id = %s AND status = 'processing'
+"""
+
+
+class Job:
+    """One claimed video_analysis row."""
+
+    __slots__ = ('id', 'video_id', 'project_id', 'retry_count', 'max_retries', 'storyboard')
+
+    def __init__(self, id, video_id, project_id, retry_count, max_retries, storyboard=None):
+        self.id = id
+        self.video_id = video_id
+        self.project_id = project_id
+        self.retry_count = retry_count or 0
+        self.max_retries = max_retries if max_retries is not None else 3
+        self.storyboard = storyboard
+
+
+class QueueWorker:
+    """Keep `slots` queue jobs in flight, each slot with its own connection."""
+
+    def __init__(self, database_url=None, slots=DEFAULT_SLOTS, poll_seconds=DEFAULT_POLL_SECONDS,
+                 dispatch=None, name=None):
+        """
+        `dispatch(job)` is an async callable returning (success, message);
+        it defaults to calling the TranscribeAudio Lambda. A success of None
+        means the outcome is unknown and the row is left 'processing'.
+        """
+        self.database_url = database_url or os.getenv('DATABASE_URL')
+        if not self.database_url:
+            raise ValueError("DATABASE_URL environment variable must be set or passed as parameter")
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+
+        self.slots = slots
+        self.poll_seconds = poll_seconds
+        self.dispatch = dispatch or self.call_lambda
+        self.name = name or f"worker-{os.getpid()}"
+        self.client = None
+        self.stopping = False
+        self.stats = {'claimed': 0, 'dispatched': 0, 'requeued': 0, 'failed': 0, 'unknown': 0, 'conflicts': 0}
+
+    # Database calls are blocking; they run in a thread, one connection per slot
+
+    def _claim(self, conn):
+        """Claim the next queued job; None if the queue is empty, False if every queued row is locked."""
+        try:
+            with conn.cursor() as cur:
+                cur.execute(DEFER_RENUMBER_SQL)
+                cur.execute(CLAIM_SQL)
+                row = cur.fetchone()
+                if row is None:
+                    cur.execute(QUEUED_SQL)
+                    contended = cur.fetchone()[0]
+                    conn.commit()
+                    return False if contended else None
+                job = Job(*row)
+                cur.execute(STORYBOARD_SQL, (job.project_id,))
+                storyboard = cur.fetchone()
+                job.storyboard = storyboard[0] if storyboard else None
+            conn.commit()
+            return job
+        except (psycopg2.errors.DeadlockDetected, psycopg2.errors.LockNotAvailable,
+                psycopg2.errors.SerializationFailure):
+            # Without the deferral migration (or with the cron running) the trigger
+            # locks every later queued row, so two claims can collide; the loser
+            # rolls back and tries again
+            conn.rollback()
+            return False
+
+    def _compact(self, conn):
+        """Renumber the queued rows 1..n; returns how many positions changed."""
+        with conn.cursor() as cur:
+            cur.execute(COMPACT_SQL)
+            renumbered = cur.fetchone()[0]
+        conn.commit()
+        return renumbered
+
+    def _reset(self, conn):
+        """Roll back after an error, reconnecting if the connection was lost."""
+        if not conn.closed:
+            try:
+                conn.rollback()
+                return conn
+            except psycopg2.Error:
+                conn.close()
+        try:
+            return psycopg2.connect(self.database_url)
+        except psycopg2.Error as e:
+            print(f"❌ [{self.name}] reconnect failed: {e}")
+            return conn
+
+    def _finish_failure(self, conn, job, message):
+        """Requeue a failed job, or mark it failed once it is out of retries."""
+        retry_count = job.retry_count + 1
+        with conn.cursor() as cur:
+            if retry_count >= job.max_retries:
+                cur.execute(FAIL_SQL, (retry_count, f"Lambda invocation failed after {retry_count} attempts: {message}", job.id))
+                outcome = 'failed'
+            else:
+                cur.execute(REQUEUE_SQL, (retry_count, f"Lambda invocation failed, will retry: {message}", job.id))
+                outcome = 'requeued'
+        conn.commit()
+        return outcome
+
+    async def call_lambda(self, job):
+        """Send the cron's queue_processor payload for one job.
+
+        Returns (True, message) if the Lambda accepted it, (False, message)
+        if it was rejected or never sent, and (None, message) if the outcome
+        is unknown.
+        """
+        payload = {
+            'video_id': job.video_id,
+            'project_id': job.project_id,
+            'additional_context': '',
+            'storyboard_content': job.storyboard or '',
+            'has_storyboard': job.storyboard is not None,
+            'trigger_source': 'queue_processor',
+            'retry_count': job.retry_count
+        }
+        try:
+            response = await self.client.post(LAMBDA_URL, json=payload)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            # Nothing was sent, so the row can go back in the queue
+            return False, f"{type(e).__name__}: {e}"
+        except httpx.HTTPError as e:
+            # Read timeout, dropped connection...: the Lambda may already be running it
+            return None, f"{type(e).__name__} after sending ({e}); Lambda may be running it"
+
+        if response.status_code == 200:
+            return True, "Lambda triggered"
+        if response.status_code == 504:
+            return None, "API Gateway timed out; Lambda still running"
+        return False, f"HTTP {response.status_code}: {response.text[:500]}"
+
+    async def _slot(self, index, drain):
+        """Claim, dispatch and settle jobs until stopped (or the queue is empty with drain)."""
+        conn = await asyncio.to_thread(psycopg2.connect, self.database_url)
+        try:
+            while not self.stopping:
+                try:
+                    job = await asyncio.to_thread(self._claim, conn)
+                except psycopg2.Error as e:
+                    print(f"❌ [{self.name}/{index}] claim failed: {e}")
+                    await asyncio.sleep(self.poll_seconds)
+                    conn = await asyncio.to_thread(self._reset, conn)
+                    continue
+
+                if job is False:
+                    self.stats['conflicts'] += 1
+                    await asyncio.sleep(random.uniform(0, 0.05))
+                    continue
+                if job is None:
+                    if drain:
+                        return
+                    # Jitter so idle replicas do not poll in lockstep
+                    await asyncio.sleep(self.poll_seconds * random.uniform(0.5, 1.5))
+                    continue
+
+                self.stats['claimed'] += 1
+                try:
+                    success, message = await self.dispatch(job)
+                except Exception as e:
+                    success, message = False, f"Unexpected error: {e}"
+                if success:
+                    self.stats['dispatched'] += 1
+                    print(f"✅ [{self.name}/{index}] {job.video_id}: {message}")
+                elif success is None:
+                    self.stats['unknown'] += 1
+                    print(f"⏳ [{self.name}/{index}] {job.video_id}: {message}")
+                else:
+                    try:
+                        outcome = await asyncio.to_thread(self._finish_failure, conn, job, message)
+                    except psycopg2.Error as e:
+                        # The row stays 'processing'; processing_started_at shows how long
+                        print(f"❌ [{self.name}/{index}] {job.video_id}: could not record failure ({e})")
+                        conn = await asyncio.to_thread(self._reset, conn)
+                        continue
+                    self.stats[outcome] += 1
+                    print(f"{'↻' if outcome == 'requeued' else '❌'} [{self.name}/{index}] {job.video_id}: {message} ({outcome})")
+        finally:
+            await asyncio.to_thread(conn.close)
+
+    async def _compactor(self, done):
+        """Keep queue positions current for the UI until the slots are done."""
+        conn = await asyncio.to_thread(psycopg2.connect, self.database_url)
+        try:
+            while not done.is_set():
+                try:
+                    await asyncio.wait_for(done.wait(), COMPACT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await asyncio.to_thread(self._compact, conn)
+                except psycopg2.errors.UndefinedFunction:
+                    # Claims still renumber through the trigger, as before the migration
+                    print(f"⚠️  [{self.name}] compact_queue_positions() not found; "
+                          "apply 20250716000000_defer_queue_position_renumber.sql")
+                    return
+                except psycopg2.Error as e:
+                    print(f"❌ [{self.name}] queue compaction failed: {e}")
+                    conn = await asyncio.to_thread(self._reset, conn)
+        finally:
+            await asyncio.to_thread(conn.close)
+
+    def stop(self):
+        """Finish the jobs in flight, then exit."""
+        if not self.stopping:
+            print(f"\n⏹️  [{self.name}] Stopping after the jobs in flight...")
+        self.stopping = True
+
+    async def run(self, drain=False):
+        """Run all slots; with drain, return once the queue is empty."""
+        started = time.monotonic()
+        async with httpx.AsyncClient(timeout=LAMBDA_TIMEOUT_SECONDS) as client:
+            self.client = client
+            done = asyncio.Event()
+            compactor = asyncio.create_task(self._compactor(done))
+            try:
+                await asyncio.gather(*(self._slot(index, drain) for index in range(self.slots)))
+            finally:
+                done.set()
+                await compactor
+        self.stats['elapsed_seconds'] = time.monotonic() - started
+        return self.stats
+
+
+def print_stats(stats):
+    elapsed = stats.get('elapsed_seconds', 0)
+    rate = stats['claimed'] / elapsed * 60 if elapsed > 0 else 0.0
+    print("\n📊 Queue worker summary")
+    print(f"   Claimed: {stats['claimed']} ({rate:.1f} jobs/minute over {elapsed:.1f}s)")
+    print(f"   ✅ Dispatched: {stats['dispatched']}  ⏳ Unknown: {stats['unknown']}  "
+          f"↻ Requeued: {stats['requeued']}  ❌ Failed: {stats['failed']}")
+    print(f"   Claim conflicts retried: {stats['conflicts']}")
+
+
+def _number_option(name, default, cast=int):
+    """Read a positive number option like `--slots 5` from argv."""
+    if name not in sys.argv:
+        return default
+    try:
+        value = cast(sys.argv[sys.argv.index(name) + 1])
+    except (IndexError, ValueError):
+        value = 0
+    if value <= 0:
+        print(f"❌ {name} expects a positive number")
+        sys.exit(1)
+    return value
+
+
+async def _main(worker, drain):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    return await worker.run(drain)
+
+
+def main():
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print(__doc__)
+        return
+
+    slots = _number_option('--slots', DEFAULT_SLOTS)
+    poll_seconds = _number_option('--poll', DEFAULT_POLL_SECONDS, float)
+    drain = '--drain' in sys.argv
+
+    try:
+        worker = QueueWorker(slots=slots, poll_seconds=poll_seconds)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"🚀 Queue worker {worker.name}: {slots} slots, polling every {poll_seconds:g}s when idle"
+          f"{' (exits when the queue is empty)' if drain else ''}")
+    print_stats(asyncio.run(_main(worker, drain)))
+
+
+if __name__ == "__main__":
+    main()